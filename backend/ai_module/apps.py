@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class AiModuleConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'ai_module'
+
+    def ready(self):
+        # Map the published AI snapshot here so a preloading master (gunicorn
+        # --preload) shares it with the workers it forks
+        from . import artifacts
+        artifacts.preload()
@@ -0,0 +1,316 @@
+"""
+Shared, memory-mapped snapshot of the analyzer artifacts.
+
+`manage.py publish_ai_snapshot` compiles the keyword vocabularies, stopword
+table and category model weights into one versioned, read-only file under
+AI_SNAPSHOT['PATH'] and points the CURRENT file at it with an atomic rename.
+
+Every process maps the file with mmap instead of building private copies.
+Read-only, file-backed pages live in the OS page cache, so all workers share
+them. This holds whether the workers are forked from a master that loaded the
+snapshot in AppConfig.ready (gunicorn --preload) or spawned fresh
+(uvicorn --workers). Readers look at CURRENT at most every CHECK_INTERVAL
+seconds and swap to a newly published snapshot without a restart. The old
+mapping stays valid for as long as it is referenced.
+
+File layout: MAGIC, an 8-byte little-endian header length, a JSON header
+({'version', 'meta', 'arrays': {name: {dtype, shape, offset}}}), then each
+array's raw bytes, aligned to ALIGNMENT.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from django.conf import settings
+from .optional import optional_import
+
+SNAPSHOT_FORMAT = 1
+MAGIC = b'AISNAP01'
+ALIGNMENT = 64
+POINTER = 'CURRENT'
+
+
+def get_config():
+    config = getattr(settings, 'AI_SNAPSHOT', {})
+    return {
+        'PATH': str(config.get('PATH', os.path.join(settings.BASE_DIR, 'var', 'ai_snapshot'))),
+        'CHECK_INTERVAL': config.get('CHECK_INTERVAL', 5),
+        'KEEP': config.get('KEEP', 3),
+        'ENABLED': config.get('ENABLED', True),
+    }
+
+
+class Snapshot:
+    """A mapped snapshot file; arrays are zero-copy read-only views of the mapping"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not an AI snapshot")
+        (length,) = struct.unpack_from('<Q', self._map, len(MAGIC))
+        start = len(MAGIC) + 8
+        header = json.loads(self._map[start:start + length].decode('utf-8'))
+        if header['format'] != SNAPSHOT_FORMAT:
+            raise ValueError(f"Unsupported AI snapshot format {header['format']}")
+        self.version = header['version']
+        self.meta = header['meta']
+        self._layout = header['arrays']
+        self._keyword_matcher = None
+        self._stopwords = None
+        self._category_model = None
+        self._category_model_loaded = False
+
+    def array(self, name):
+        np = optional_import('numpy')
+        spec = self._layout[name]
+        count = 1
+        for size in spec['shape']:
+            count *= size
+        return np.frombuffer(
+            self._map, dtype=np.dtype(spec['dtype']), count=count, offset=spec['offset']
+        ).reshape(spec['shape'])
+
+    # Derived objects are built once per snapshot (and per process unless the
+    # snapshot was preloaded before forking)
+
+    @property
+    def keyword_matcher(self):
+        if self._keyword_matcher is None:
+            from .keywords import KeywordMatcher
+            self._keyword_matcher = KeywordMatcher(self.meta['vocabularies'])
+        return self._keyword_matcher
+
+    @property
+    def stopwords(self):
+        if self._stopwords is None:
+            self._stopwords = frozenset(self.meta['stopwords'])
+        return self._stopwords
+
+    @property
+    def category_model(self):
+        if not self._category_model_loaded:
+            info = self.meta.get('category_model')
+            if info is not None and optional_import('numpy') is not None:
+                from .classifier import CategoryModel
+                self._category_model = CategoryModel.for_inference(
+                    info['category_ids'],
+                    info['category_names'],
+                    self.array('category_log_prior'),
+                    self.array('category_log_likelihood'),
+                    info.get('trained_until', 0.0),
+                )
+            self._category_model_loaded = True
+        return self._category_model
+
+    def warm(self):
+        """Build the derived objects now, e.g. in a master process before it forks"""
+        self.keyword_matcher
+        self.stopwords
+        self.category_model
+
+
+# --- building and publishing --------------------------------------------------
+
+def build_contents(vocabularies=None):
+    """Collect the current analyzer artifacts as (meta, arrays)"""
+    from . import classifier
+    from .keywords import VOCABULARIES
+    from .services import ANALYZER_VERSION, STOPWORDS
+
+    meta = {
+        'analyzer_version': ANALYZER_VERSION,
+        'vocabularies': vocabularies or VOCABULARIES,
+        'stopwords': sorted(STOPWORDS),
+    }
+    arrays = {}
+
+    path = classifier.get_config()['PATH']
+    if optional_import('numpy') is not None and os.path.exists(path):
+        model = classifier.CategoryModel.load(path)
+        meta['category_model'] = {
+            'category_ids': [int(category_id) for category_id in model.category_ids],
+            'category_names': model.category_names,
+            'trained_until': model.trained_until,
+        }
+        arrays['category_log_prior'] = model.log_prior
+        arrays['category_log_likelihood'] = model.log_likelihood
+    return meta, arrays
+
+
+def write_snapshot(path, version, meta, arrays):
+    """Write a snapshot file to path (not atomic; see publish)"""
+    np = optional_import('numpy')
+    layout = {}
+    blobs = []
+    offset = 0
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        offset = -(-offset // ALIGNMENT) * ALIGNMENT
+        layout[name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+        blobs.append((offset, array))
+        offset += array.nbytes
+
+    # Array offsets depend on the header size, which depends on the offsets
+    base = 0
+    while True:
+        arrays_layout = {
+            name: dict(spec, offset=spec['offset'] + base) for name, spec in layout.items()
+        }
+        header = {'format': SNAPSHOT_FORMAT, 'version': version, 'meta': meta, 'arrays': arrays_layout}
+        encoded = json.dumps(header).encode('utf-8')
+        needed = -(-(len(MAGIC) + 8 + len(encoded)) // ALIGNMENT) * ALIGNMENT
+        if needed <= base:
+            break
+        base = needed
+
+    with open(path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<Q', len(encoded)))
+        f.write(encoded)
+        for relative, array in blobs:
+            f.seek(base + relative)
+            f.write(array.tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def publish(vocabularies=None):
+    """Build and publish a new snapshot; returns its version.
+
+    The version is a digest of the contents, so republishing unchanged
+    artifacts keeps the current version (and the insight cache keys).
+    """
+    config = get_config()
+    meta, arrays = build_contents(vocabularies)
+
+    digest = hashlib.sha256(json.dumps(meta, sort_keys=True).encode('utf-8'))
+    for name in sorted(arrays):
+        digest.update(name.encode('utf-8'))
+        digest.update(arrays[name].tobytes())
+    version = digest.hexdigest()[:16]
+
+    os.makedirs(config['PATH'], exist_ok=True)
+    filename = f"snapshot-{version}.bin"
+    path = os.path.join(config['PATH'], filename)
+    if not os.path.exists(path):
+        temp = f"{path}.tmp"
+        write_snapshot(temp, version, meta, arrays)
+        os.replace(temp, path)
+    else:
+        os.utime(path)
+
+    # Readers only ever see a complete file: CURRENT flips with one rename
+    pointer = os.path.join(config['PATH'], POINTER)
+    with open(f"{pointer}.tmp", 'w') as f:
+        f.write(filename)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(f"{pointer}.tmp", pointer)
+
+    _prune(config['PATH'], filename, config['KEEP'])
+    return version
+
+
+def _prune(directory, current, keep):
+    snapshots = sorted(
+        (name for name in os.listdir(directory) if name.startswith('snapshot-') and name.endswith('.bin')),
+        key=lambda name: os.path.getmtime(os.path.join(directory, name)),
+        reverse=True
+    )
+    for name in snapshots[max(keep, 1):]:
+        if name == current:
+            continue
+        try:
+            # Processes still mapping the file keep their pages until they swap
+            os.remove(os.path.join(directory, name))
+        except OSError as e:
+            print(f"Error pruning AI snapshot {name}: {e}")
+
+
+# --- process-wide current snapshot -------------------------------------------
+
+_snapshot = None
+_checked_at = None
+_lock = threading.Lock()
+
+
+def _reset_lock_after_fork():
+    # A thread of the parent may have held the lock while it forked
+    global _lock
+    _lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_lock_after_fork)
+
+
+def current():
+    """The published snapshot for this process, or None when there is none"""
+    global _snapshot, _checked_at
+    config = get_config()
+    if not config['ENABLED']:
+        return None
+
+    now = time.monotonic()
+    if _checked_at is not None and now - _checked_at < config['CHECK_INTERVAL']:
+        return _snapshot
+
+    with _lock:
+        if _checked_at is not None and now - _checked_at < config['CHECK_INTERVAL']:
+            return _snapshot
+        try:
+            with open(os.path.join(config['PATH'], POINTER)) as f:
+                filename = f.read().strip()
+        except FileNotFoundError:
+            filename = None
+
+        # Without a pointer there is nothing newer to swap to; keep what is mapped
+        if filename and (_snapshot is None or os.path.basename(_snapshot.path) != filename):
+            try:
+                snapshot = Snapshot(os.path.join(config['PATH'], filename))
+                snapshot.warm()
+                _snapshot = snapshot
+            except Exception as e:
+                # Keep serving the previous snapshot rather than none at all
+                print(f"Error loading AI snapshot {filename}: {e}")
+        _checked_at = now
+    return _snapshot
+
+
+def preload():
+    """Map the published snapshot and build its derived objects up front"""
+    global _checked_at
+    _checked_at = None
+    return current()
+
+
+def version():
+    snapshot = current()
+    return snapshot.version if snapshot is not None else None
+
+
+def keyword_matcher():
+    snapshot = current()
+    if snapshot is not None:
+        return snapshot.keyword_matcher
+    from .keywords import keyword_matcher as default_matcher
+    return default_matcher
+
+
+def stopwords():
+    snapshot = current()
+    if snapshot is not None:
+        return snapshot.stopwords
+    from .services import STOPWORDS
+    return STOPWORDS
+
+
+def category_model():
+    snapshot = current()
+    return snapshot.category_model if snapshot is not None else None
@@ -0,0 +1,137 @@
+import copy
+import hashlib
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from django.conf import settings
+
+
+def normalize_text(text):
+    """Normalize text for its cache key; the analyzer still sees the original text"""
+    return unicodedata.normalize('NFC', text).strip()
+
+
+class InsightCache:
+    """Memoizes context insights by a hash of the normalized text and analyzer version.
+
+    The 'local' backend is a per-process LRU with optional TTL. The 'django'
+    backend stores entries in one of Django's configured caches so several
+    workers can share hits; eviction is then left to that cache. Hit and miss
+    counters are always tracked per process.
+    """
+
+    def __init__(self, backend='local', max_entries=1024, ttl=None, cache_alias='default', key_prefix='ai-insights'):
+        self.backend = backend
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.cache_alias = cache_alias
+        self.key_prefix = key_prefix
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls):
+        config = getattr(settings, 'AI_INSIGHT_CACHE', {})
+        return cls(
+            backend=config.get('BACKEND', 'local'),
+            max_entries=config.get('MAX_ENTRIES', 1024),
+            ttl=config.get('TTL'),
+            cache_alias=config.get('CACHE_ALIAS', 'default'),
+        )
+
+    def make_key(self, text, version):
+        digest = hashlib.sha256(normalize_text(text).encode('utf-8')).hexdigest()
+        return f"{self.key_prefix}:{version}:{digest}"
+
+    def get_or_compute(self, text, version, compute):
+        """Return cached insights for text, calling compute(text) on a miss"""
+        key = self.make_key(text, version)
+
+        value = self._get(key)
+        if value is not None:
+            with self._lock:
+                self.hits += 1
+            return value
+
+        with self._lock:
+            self.misses += 1
+        value = compute(text)
+        self._set(key, value)
+        return copy.deepcopy(value)
+
+    def get_or_compute_many(self, texts, version, compute_many):
+        """get_or_compute for several texts; compute_many(texts) runs once over the distinct misses"""
+        keys = [self.make_key(text, version) for text in texts]
+        found = {}
+        missing = {}
+        for text, key in zip(texts, keys):
+            if key in found or key in missing:
+                continue
+            value = self._get(key)
+            if value is not None:
+                found[key] = value
+            else:
+                missing[key] = text
+
+        with self._lock:
+            self.misses += len(missing)
+            self.hits += len(keys) - len(missing)
+        if missing:
+            for key, value in zip(missing, compute_many(list(missing.values()))):
+                self._set(key, value)
+                found[key] = value
+        return [copy.deepcopy(found[key]) for key in keys]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'backend': self.backend,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'size': len(self._entries) if self.backend == 'local' else None,
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def _get(self, key):
+        if self.backend == 'django':
+            return self._django_cache().get(key)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        # Hand out copies so callers can't mutate the cached insights
+        return copy.deepcopy(value)
+
+    def _set(self, key, value):
+        if self.backend == 'django':
+            self._django_cache().set(key, value, timeout=self.ttl)
+            return
+
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _django_cache(self):
+        from django.core.cache import caches
+        return caches[self.cache_alias]
@@ -0,0 +1,268 @@
+"""
+Multinomial naive Bayes category classifier over hashed text features.
+
+Trained from existing Task -> Category assignments by
+`manage.py train_category_model` and saved as a compressed .npz
+(AI_CATEGORY_MODEL['PATH']). The file keeps raw feature counts per category,
+so `--incremental` training only adds tasks categorized (Task.categorized_at)
+since the last run and new categories simply get a new row. A task moved to
+another category is then counted under both until the next full retrain. Each process loads the model and
+reloads it when the file changes (checked at most every CHECK_INTERVAL
+seconds), or maps it from the shared AI snapshot (ai_module.artifacts) when one is
+published; prediction hashes a few dozen features and sums a handful of log
+probabilities per category.
+"""
+
+import os
+import threading
+import time
+import zlib
+from django.conf import settings
+from . import artifacts
+from .optional import optional_import
+
+MODEL_FORMAT = 2
+
+
+def get_config():
+    config = getattr(settings, 'AI_CATEGORY_MODEL', {})
+    return {
+        'PATH': str(config.get('PATH', os.path.join(settings.BASE_DIR, 'var', 'category_model.npz'))),
+        'FEATURES': config.get('FEATURES', 2 ** 15),
+        'ALPHA': config.get('ALPHA', 1.0),
+        'MIN_PROBABILITY': config.get('MIN_PROBABILITY', 0.2),
+        'CHECK_INTERVAL': config.get('CHECK_INTERVAL', 5),
+    }
+
+
+def hashed_features(text, num_features):
+    """Hashed word and word-bigram counts of text as (indices, counts) arrays"""
+    from .services import STOPWORDS, WORD_PATTERN
+    np = optional_import('numpy')
+
+    words = [word.lower() for word in WORD_PATTERN.findall(text or '')]
+    words = [word for word in words if word not in STOPWORDS]
+    tokens = words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+
+    counts = {}
+    for token in tokens:
+        index = zlib.crc32(token.encode('utf-8')) % num_features
+        counts[index] = counts.get(index, 0) + 1
+    return np.fromiter(counts.keys(), dtype=np.int64, count=len(counts)), \
+        np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+
+
+class CategoryModel:
+    """Naive Bayes counts plus the log probabilities derived from them"""
+
+    def __init__(self, category_ids, category_names, feature_counts, document_counts,
+                 trained_until=0.0, alpha=1.0):
+        np = optional_import('numpy')
+        self.category_ids = np.asarray(category_ids, dtype=np.int64)
+        self.category_names = [str(name) for name in category_names]
+        self.feature_counts = np.asarray(feature_counts, dtype=np.float32)
+        self.document_counts = np.asarray(document_counts, dtype=np.float32)
+        # Timestamp of the newest categorization included in the counts (0 before any training)
+        self.trained_until = float(trained_until)
+        self.alpha = float(alpha)
+        self._prepare()
+
+    @property
+    def num_features(self):
+        return self.log_likelihood.shape[1]
+
+    @classmethod
+    def empty(cls, num_features, alpha=1.0):
+        np = optional_import('numpy')
+        return cls([], [], np.zeros((0, num_features), dtype=np.float32), [], alpha=alpha)
+
+    @classmethod
+    def for_inference(cls, category_ids, category_names, log_prior, log_likelihood, trained_until=0.0):
+        """A prediction-only model over precomputed (e.g. memory-mapped) log probabilities"""
+        np = optional_import('numpy')
+        model = cls.__new__(cls)
+        model.category_ids = np.asarray(category_ids, dtype=np.int64)
+        model.category_names = [str(name) for name in category_names]
+        model.feature_counts = None
+        model.document_counts = None
+        model.trained_until = float(trained_until)
+        model.alpha = None
+        model.log_prior = log_prior
+        model.log_likelihood = log_likelihood
+        model._unseen_log_likelihood = None
+        return model
+
+    def _prepare(self):
+        np = optional_import('numpy')
+        if not len(self.category_ids):
+            self.log_prior = np.zeros(0, dtype=np.float32)
+            self.log_likelihood = np.zeros((0, self.feature_counts.shape[1]), dtype=np.float32)
+            self._unseen_log_likelihood = None
+            return
+        # Laplace-smoothed priors so categories without tasks yet stay predictable
+        priors = self.document_counts + 1.0
+        self.log_prior = np.log(priors / priors.sum()).astype(np.float32)
+        smoothed = self.feature_counts + self.alpha
+        self.log_likelihood = np.log(smoothed / smoothed.sum(axis=1, keepdims=True)).astype(np.float32)
+        self._unseen_log_likelihood = None
+
+    # --- training ---------------------------------------------------------
+
+    def sync_categories(self, categories):
+        """Add rows for new categories and refresh names; `categories` is [(id, name)]"""
+        np = optional_import('numpy')
+        positions = {int(category_id): row for row, category_id in enumerate(self.category_ids)}
+        new = [(category_id, name) for category_id, name in categories if category_id not in positions]
+        for category_id, name in categories:
+            if category_id in positions:
+                self.category_names[positions[category_id]] = name
+        if new:
+            self.category_ids = np.concatenate([self.category_ids, np.array([c for c, _ in new], dtype=np.int64)])
+            self.category_names.extend(name for _, name in new)
+            self.feature_counts = np.vstack([
+                self.feature_counts, np.zeros((len(new), self.num_features), dtype=np.float32)
+            ])
+            self.document_counts = np.concatenate([self.document_counts, np.zeros(len(new), dtype=np.float32)])
+
+    def partial_fit(self, examples):
+        """Add (text, category_id) examples to the counts"""
+        positions = {int(category_id): row for row, category_id in enumerate(self.category_ids)}
+        for text, category_id in examples:
+            row = positions.get(category_id)
+            if row is None:
+                continue
+            indices, counts = hashed_features(text, self.num_features)
+            self.feature_counts[row, indices] += counts
+            self.document_counts[row] += 1
+        self._prepare()
+
+    # --- inference --------------------------------------------------------
+
+    def predict_proba(self, text):
+        """Return [(category_name, probability)] for every category, most likely first.
+
+        Empty when no feature of text was seen in training: the ranking would
+        then only repeat the category priors.
+        """
+        np = optional_import('numpy')
+        if not len(self.category_ids):
+            return []
+        indices, counts = hashed_features(text, self.num_features)
+        if not self.seen(indices).any():
+            return []
+        scores = self.log_prior + self.log_likelihood[:, indices] @ counts
+        scores = np.exp(scores - scores.max())
+        probabilities = scores / scores.sum()
+        order = np.argsort(probabilities)[::-1]
+        return [(self.category_names[i], float(probabilities[i])) for i in order]
+
+    def seen(self, indices):
+        """Boolean mask of the feature indices that occurred in some training example"""
+        if self._unseen_log_likelihood is None:
+            # Features never counted in a row all share its smoothed minimum
+            self._unseen_log_likelihood = self.log_likelihood.min(axis=1)
+        return (self.log_likelihood[:, indices] > self._unseen_log_likelihood[:, None]).any(axis=0)
+
+    def predict(self, text, top=3, min_probability=0.0):
+        return [
+            name for name, probability in self.predict_proba(text)[:top]
+            if probability >= min_probability
+        ]
+
+    # --- persistence ------------------------------------------------------
+
+    def to_arrays(self):
+        np = optional_import('numpy')
+        return {
+            'format': np.array(MODEL_FORMAT),
+            'category_ids': self.category_ids,
+            'category_names': np.array(self.category_names, dtype=str),
+            'feature_counts': self.feature_counts,
+            'document_counts': self.document_counts,
+            'trained_until': np.array(self.trained_until),
+            'alpha': np.array(self.alpha),
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        if int(arrays['format']) != MODEL_FORMAT:
+            raise ValueError(f"Unsupported category model format {int(arrays['format'])}")
+        return cls(
+            arrays['category_ids'],
+            arrays['category_names'].tolist(),
+            arrays['feature_counts'],
+            arrays['document_counts'],
+            float(arrays['trained_until']),
+            float(arrays['alpha']),
+        )
+
+    def save(self, path):
+        np = optional_import('numpy')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp = f"{path}.tmp.npz"
+        np.savez_compressed(temp, **self.to_arrays())
+        os.replace(temp, path)
+
+    @classmethod
+    def load(cls, path):
+        np = optional_import('numpy')
+        with np.load(path) as arrays:
+            return cls.from_arrays(arrays)
+
+
+_model = None
+# mtime of the file _model was loaded from, and when the file was last looked at
+_model_mtime = None
+_checked_at = None
+_model_lock = threading.Lock()
+
+
+def get_model():
+    """The trained model for this process, or None when none has been trained
+
+    A model in the published AI snapshot wins over the .npz file so that
+    workers share its weights instead of each loading a private copy.
+    """
+    global _model, _model_mtime, _checked_at
+    shared = artifacts.category_model()
+    if shared is not None:
+        return shared
+
+    config = get_config()
+    now = time.monotonic()
+    if _checked_at is not None and now - _checked_at < config['CHECK_INTERVAL']:
+        return _model
+
+    with _model_lock:
+        if _checked_at is not None and now - _checked_at < config['CHECK_INTERVAL']:
+            return _model
+        try:
+            mtime = os.path.getmtime(config['PATH'])
+        except OSError:
+            mtime = None
+        # A model trained after startup is picked up; a vanished file keeps the loaded one
+        if mtime is not None and mtime != _model_mtime and optional_import('numpy') is not None:
+            try:
+                _model = CategoryModel.load(config['PATH'])
+            except Exception as e:
+                print(f"Error loading category model: {e}")
+            _model_mtime = mtime
+        _checked_at = now
+    return _model
+
+
+def reset_model():
+    """Forget the loaded model so the next prediction reloads it from disk"""
+    global _model, _model_mtime, _checked_at
+    with _model_lock:
+        _model = None
+        _model_mtime = None
+        _checked_at = None
+
+
+def suggest(title, description, top=3):
+    """Category names predicted for a task, or None when no model is available"""
+    model = get_model()
+    if model is None or not len(model.category_ids):
+        return None
+    return model.predict(f"{title} {description}", top, get_config()['MIN_PROBABILITY'])
@@ -0,0 +1,210 @@
+"""
+Near-duplicate task detection with MinHash and locality-sensitive hashing.
+
+Each task's title and description are reduced to character 4-shingles of
+their normalized words and summarized by a NUM_PERM-value MinHash signature
+(ai_module.TaskSignature). The signature is cut into BANDS bands of ROWS
+values and every band is hashed to a bucket key (ai_module.TaskBucket). Two
+tasks become candidates when they share any bucket, which for BANDS=16,
+ROWS=4 happens with probability ~0.5 at Jaccard 0.5 and >0.99 at 0.8.
+Candidates are confirmed by comparing signatures, so a lookup reads a handful
+of bucket rows instead of comparing against every task.
+
+Titles get a second signature in their own buckets, so title-only text (e.g.
+a suggested task) is compared with titles rather than with whole tasks.
+
+Changing NUM_PERM, BANDS or ROWS invalidates stored signatures; rebuild with
+`manage.py rebuild_task_index`.
+"""
+
+import hashlib
+import random
+import zlib
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from .scoring import OPEN_STATUSES
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 4
+
+# Task fields whose change requires a new signature
+INDEXED_FIELDS = frozenset(['title', 'description'])
+
+_PRIME = (1 << 61) - 1
+_rng = random.Random(20240601)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+
+def get_config():
+    config = getattr(settings, 'AI_DEDUPE', {})
+    return {
+        'THRESHOLD': config.get('THRESHOLD', 0.7),
+        'MAX_CANDIDATES': config.get('MAX_CANDIDATES', 200),
+    }
+
+
+def shingles(text):
+    """Character shingles of the lowercased, stopword-free words of text"""
+    from .services import STOPWORDS, WORD_PATTERN
+    
+    words = [word.lower() for word in WORD_PATTERN.findall(text or '')]
+    normalized = ' '.join(word for word in words if word not in STOPWORDS)
+    if len(normalized) <= SHINGLE_SIZE:
+        return {normalized} if normalized else set()
+    return {normalized[i:i + SHINGLE_SIZE] for i in range(len(normalized) - SHINGLE_SIZE + 1)}
+
+
+def minhash(text):
+    """MinHash signature of text, or None when it has no words to compare"""
+    hashes = [zlib.crc32(shingle.encode('utf-8')) for shingle in shingles(text)]
+    if not hashes:
+        return None
+    return [min((a * value + b) % _PRIME for value in hashes) for a, b in _PERMUTATIONS]
+
+
+def band_keys(signature, scope='task'):
+    """One signed 64-bit bucket key per band; `scope` keeps title and task buckets apart"""
+    keys = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS:(band + 1) * ROWS]
+        digest = hashlib.blake2b(repr((scope, band, rows)).encode('utf-8'), digest_size=8).digest()
+        keys.append(int.from_bytes(digest, 'big', signed=True))
+    return keys
+
+
+def similarity(first, second):
+    """Estimated Jaccard similarity of two signatures"""
+    return sum(1 for a, b in zip(first, second) if a == b) / NUM_PERM
+
+
+def task_text(title, description):
+    return f"{title} {description or ''}"
+
+
+def index_tasks(tasks):
+    """Store signatures and bucket keys for the given tasks, replacing older ones"""
+    from .models import TaskBucket, TaskSignature
+    
+    tasks = list(tasks)
+    signatures = []
+    buckets = []
+    for task in tasks:
+        signature = minhash(task_text(task.title, task.description))
+        if signature is None:
+            continue
+        title_signature = minhash(task.title) or signature
+        signatures.append(TaskSignature(task_id=task.id, signature=signature, title_signature=title_signature))
+        buckets.extend(TaskBucket(key=key, task_id=task.id) for key in band_keys(signature))
+        buckets.extend(TaskBucket(key=key, task_id=task.id) for key in band_keys(title_signature, 'title'))
+    
+    task_ids = [task.id for task in tasks]
+    with transaction.atomic():
+        TaskSignature.objects.filter(task_id__in=task_ids).delete()
+        TaskBucket.objects.filter(task_id__in=task_ids).delete()
+        TaskSignature.objects.bulk_create(signatures, batch_size=1000)
+        TaskBucket.objects.bulk_create(buckets, batch_size=1000)
+    return len(signatures)
+
+
+def find_duplicates(title, description='', threshold=None, exclude_id=None, statuses=OPEN_STATUSES, limit=5):
+    """Return up to `limit` (task_id, similarity) pairs for tasks that look like this text.
+    
+    Without a description only task titles are compared.
+    """
+    from .models import TaskBucket, TaskSignature
+    
+    config = get_config()
+    threshold = config['THRESHOLD'] if threshold is None else threshold
+    scope = 'task' if (description or '').strip() else 'title'
+    signature = minhash(task_text(title, description))
+    if signature is None:
+        return []
+    
+    rows = TaskBucket.objects.filter(key__in=band_keys(signature, scope))
+    if statuses:
+        rows = rows.filter(task__status__in=statuses)
+    if exclude_id is not None:
+        rows = rows.exclude(task_id=exclude_id)
+    # Tasks sharing more bands are likelier matches, so they survive the cap
+    candidate_ids = list(
+        rows.values('task_id').annotate(shared=Count('id'))
+        .order_by('-shared', 'task_id')
+        .values_list('task_id', flat=True)[:config['MAX_CANDIDATES']]
+    )
+    signature_field = 'signature' if scope == 'task' else 'title_signature'
+    candidates = TaskSignature.objects.filter(task_id__in=candidate_ids).values_list('task_id', signature_field)
+    
+    matches = [
+        (task_id, similarity(signature, other))
+        for task_id, other in candidates
+    ]
+    matches = [match for match in matches if match[1] >= threshold]
+    matches.sort(key=lambda match: (-match[1], match[0]))
+    return matches[:limit]
+
+
+def duplicate_groups(threshold=None, statuses=None):
+    """Cluster indexed tasks into near-duplicate groups, comparing only tasks that share a bucket.
+    
+    Whole-task signatures decide; pairs met through title buckets are checked
+    the same way. Pairs already in one group are not compared again, and
+    inside a bucket each task is compared with at most MAX_CANDIDATES tasks
+    before it, so an oversized bucket (e.g. boilerplate text) costs linear
+    rather than quadratic time. Returns a list of groups, each a sorted list
+    of task ids, largest first.
+    """
+    from .models import TaskBucket, TaskSignature
+    
+    config = get_config()
+    threshold = config['THRESHOLD'] if threshold is None else threshold
+    
+    shared_keys = (
+        TaskBucket.objects.values('key')
+        .annotate(size=Count('id'))
+        .filter(size__gt=1)
+        .values('key')
+    )
+    rows = TaskBucket.objects.filter(key__in=shared_keys)
+    if statuses:
+        rows = rows.filter(task__status__in=statuses)
+    
+    buckets = {}
+    for key, task_id in rows.values_list('key', 'task_id').iterator(chunk_size=5000):
+        buckets.setdefault(key, []).append(task_id)
+    
+    task_ids = {task_id for members in buckets.values() for task_id in members}
+    signatures = dict(
+        TaskSignature.objects.filter(task_id__in=task_ids).values_list('task_id', 'signature')
+    ) if task_ids else {}
+    
+    parent = {}
+    
+    def find(task_id):
+        parent.setdefault(task_id, task_id)
+        while parent[task_id] != task_id:
+            parent[task_id] = parent[parent[task_id]]
+            task_id = parent[task_id]
+        return task_id
+    
+    rejected = set()
+    for members in buckets.values():
+        members = sorted(members)
+        for i, second in enumerate(members):
+            for first in members[max(0, i - config['MAX_CANDIDATES']):i]:
+                if find(first) == find(second) or (first, second) in rejected:
+                    continue
+                if similarity(signatures[first], signatures[second]) >= threshold:
+                    parent[find(second)] = find(first)
+                else:
+                    rejected.add((first, second))
+    
+    groups = {}
+    for task_id in parent:
+        groups.setdefault(find(task_id), []).append(task_id)
+    return sorted(
+        (sorted(group) for group in groups.values() if len(group) > 1),
+        key=lambda group: (-len(group), group[0])
+    )
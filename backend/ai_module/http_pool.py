@@ -0,0 +1,104 @@
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from asgiref.sync import sync_to_async
+
+
+class ProviderBusy(Exception):
+    """Raised when no concurrency slot frees up within the queue timeout.
+
+    The wait is local, so it says nothing about the provider's health and is
+    kept out of circuit breaker and latency accounting.
+    """
+
+
+class ConcurrencyLimiter:
+    """Caps in-flight requests to one provider; callers queue for a free slot.
+
+    slot(timeout) yields what is left of timeout after the queue wait (None
+    when no timeout was given), so the request itself fits the same budget.
+    """
+
+    def __init__(self, max_concurrency, queue_timeout=30.0):
+        self.max_concurrency = max_concurrency
+        self.queue_timeout = queue_timeout
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.waiting = 0
+
+    @contextmanager
+    def slot(self, timeout=None):
+        remaining = self._acquire(timeout)
+        try:
+            yield remaining
+        finally:
+            self._release()
+
+    @asynccontextmanager
+    async def aslot(self, timeout=None):
+        """slot() for coroutines: waits for the semaphore off the event loop"""
+        remaining = await sync_to_async(self._acquire, thread_sensitive=False)(timeout)
+        try:
+            yield remaining
+        finally:
+            self._release()
+
+    def _acquire(self, timeout):
+        wait_for = self.queue_timeout if timeout is None else min(timeout, self.queue_timeout)
+        started = time.monotonic()
+        with self._lock:
+            self.waiting += 1
+        acquired = self._semaphore.acquire(timeout=wait_for)
+        with self._lock:
+            self.waiting -= 1
+            if acquired:
+                self.in_flight += 1
+        if not acquired:
+            raise ProviderBusy(f"No free slot within {wait_for:.1f}s ({self.max_concurrency} in flight)")
+        if timeout is None:
+            return None
+        return max(timeout - (time.monotonic() - started), 0.001)
+
+    def _release(self):
+        with self._lock:
+            self.in_flight -= 1
+        self._semaphore.release()
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'max_concurrency': self.max_concurrency,
+                'in_flight': self.in_flight,
+                'waiting': self.waiting,
+            }
+
+
+def build_session(pool_size):
+    """A keep-alive requests session whose connection pool holds `pool_size` sockets per host"""
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def build_httpx_client(pool_size):
+    """A keep-alive httpx client for the OpenAI/Anthropic SDKs"""
+    import httpx
+
+    return httpx.Client(
+        limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+    )
+
+
+def build_async_httpx_client(pool_size):
+    """An httpx client for streaming calls made from async views"""
+    import httpx
+
+    return httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+    )
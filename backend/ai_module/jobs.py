@@ -0,0 +1,213 @@
+"""
+Deferred AI enhancement of task descriptions.
+
+The Task table is the queue: a task waiting for enhancement has
+enhancement_status='pending'. Workers claim a task with a conditional UPDATE
+('pending' -> 'processing'), so any number of threads or processes can drain
+the queue without handing the same task out twice.
+
+Workers claim up to AI_BATCH_ENHANCEMENT['MAX_TASKS'] tasks per pass and send
+them to the LLM as packed multi-task prompts (see
+AITaskManager.enhance_task_descriptions_batch).
+
+AI_ENHANCEMENT_BACKEND selects who drains it:
+  'thread' - an in-process thread pool, scheduled when the creating transaction commits
+  'worker' - only the process_enhancements management command
+  'sync'   - inline in the request (the pre-queue behaviour)
+"""
+
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_backend():
+    return getattr(settings, 'AI_ENHANCEMENT_BACKEND', 'thread')
+
+
+def enqueue_enhancement(task, context_data=None):
+    """Mark a saved task as pending enhancement and schedule it per the configured backend"""
+    from tasks.models import Task
+
+    if context_data:
+        task.context_insights['enhancement_context'] = context_data
+    task.enhancement_status = 'pending'
+    task.save(update_fields=['enhancement_status', 'context_insights'])
+
+    if get_backend() == 'sync':
+        claimed = Task.objects.filter(id=task.id, enhancement_status='pending').update(
+            enhancement_status='processing', updated_at=timezone.now()
+        )
+        if claimed:
+            run_enhancement(task)
+    else:
+        _schedule()
+
+
+def enqueue_enhancements(queryset, context_data=None):
+    """Mark many tasks as pending enhancement; returns how many were queued.
+    
+    Tasks already pending or processing are left alone. The 'sync' backend
+    enhances exactly the tasks queued here, in packed batches, and leaves the
+    rest of the queue to the workers.
+    """
+    sync = get_backend() == 'sync'
+    queryset = queryset.exclude(enhancement_status__in=['pending', 'processing'])
+    if context_data:
+        tasks = list(queryset.only('id', 'context_insights'))
+        for task in tasks:
+            task.context_insights['enhancement_context'] = context_data
+            task.enhancement_status = 'pending'
+        queued = len(tasks)
+        task_ids = [task.id for task in tasks]
+        queryset.model.objects.bulk_update(tasks, ['context_insights', 'enhancement_status'])
+    else:
+        task_ids = list(queryset.values_list('id', flat=True)) if sync else None
+        queued = queryset.update(enhancement_status='pending', updated_at=timezone.now())
+
+    if queued:
+        if sync:
+            process_pending_enhancements(task_ids=task_ids)
+        else:
+            _schedule()
+    return queued
+
+
+def claim_enhancements(limit, task_ids=None):
+    """Atomically take up to `limit` of the oldest pending tasks, optionally only among task_ids"""
+    from tasks.models import Task
+
+    pending = Task.objects.filter(enhancement_status='pending')
+    if task_ids is not None:
+        pending = pending.filter(id__in=task_ids)
+    candidate_ids = list(pending.order_by('created_at').values_list('id', flat=True)[:limit * 2])
+    claimed_ids = []
+    for task_id in candidate_ids:
+        # The conditional update is the lock: only one worker sees a row count of 1
+        claimed = Task.objects.filter(id=task_id, enhancement_status='pending').update(
+            enhancement_status='processing', updated_at=timezone.now()
+        )
+        if claimed:
+            claimed_ids.append(task_id)
+            if len(claimed_ids) >= limit:
+                break
+    return list(Task.objects.filter(id__in=claimed_ids).order_by('created_at'))
+
+
+def claim_next_enhancement():
+    """Atomically take the oldest pending task, or return None when the queue is empty"""
+    claimed = claim_enhancements(1)
+    return claimed[0] if claimed else None
+
+
+def run_enhancement(task):
+    """Enhance a claimed task and record the outcome"""
+    from .services import ai_service
+
+    context_data = task.context_insights.pop('enhancement_context', None)
+    try:
+        task.ai_enhanced_description = ai_service.enhance_task_description(
+            task.title, task.description, context_data
+        )
+        task.enhancement_status = 'completed'
+    except Exception as e:
+        print(f"Error enhancing task {task.id}: {e}")
+        task.enhancement_status = 'failed'
+
+    task.save(update_fields=['ai_enhanced_description', 'enhancement_status', 'context_insights'])
+    return task
+
+
+def run_enhancements(tasks):
+    """Enhance claimed tasks in packed batches and record each outcome"""
+    from .services import ai_service
+
+    # Tasks sharing the same enhancement context can share a prompt
+    groups = {}
+    for task in tasks:
+        context_data = task.context_insights.pop('enhancement_context', None)
+        key = json.dumps(context_data, sort_keys=True, default=str)
+        groups.setdefault(key, (context_data, []))[1].append(task)
+
+    for context_data, group in groups.values():
+        try:
+            results = ai_service.enhance_task_descriptions_batch(group, context_data)
+        except Exception as e:
+            print(f"Error enhancing batch of {len(group)} tasks: {e}")
+            results = {}
+
+        for task in group:
+            enhanced = results.get(task.id)
+            if enhanced is not None:
+                task.ai_enhanced_description = enhanced
+                task.enhancement_status = 'completed'
+            else:
+                task.enhancement_status = 'failed'
+            task.save(update_fields=['ai_enhanced_description', 'enhancement_status', 'context_insights'])
+    return tasks
+
+
+def process_pending_enhancements(limit=None, task_ids=None):
+    """Drain pending enhancements, or only those among task_ids; returns how many tasks were processed"""
+    batch_size = getattr(settings, 'AI_BATCH_ENHANCEMENT', {}).get('MAX_TASKS', 20)
+    if task_ids is not None:
+        # Claim a batch-sized slice of the ids at a time, so each query stays small
+        processed = 0
+        for start in range(0, len(task_ids), batch_size):
+            tasks = claim_enhancements(batch_size, task_ids[start:start + batch_size])
+            if tasks:
+                run_enhancements(tasks)
+                processed += len(tasks)
+        return processed
+
+    processed = 0
+    while limit is None or processed < limit:
+        claim = batch_size if limit is None else min(batch_size, limit - processed)
+        tasks = claim_enhancements(claim)
+        if not tasks:
+            break
+        run_enhancements(tasks)
+        processed += len(tasks)
+    return processed
+
+
+def requeue_stale_enhancements(older_than):
+    """Return tasks stuck in 'processing' (e.g. after a crash) to the queue"""
+    from tasks.models import Task
+
+    return Task.objects.filter(
+        enhancement_status='processing',
+        updated_at__lt=timezone.now() - older_than
+    ).update(enhancement_status='pending')
+
+
+def _schedule():
+    if get_backend() == 'thread':
+        transaction.on_commit(lambda: _get_executor().submit(_drain_in_thread))
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'AI_ENHANCEMENT_WORKERS', 2),
+                thread_name_prefix='ai-enhancement'
+            )
+        return _executor
+
+
+def _drain_in_thread():
+    close_old_connections()
+    try:
+        process_pending_enhancements()
+    except Exception as e:
+        print(f"Error draining enhancement queue: {e}")
+    finally:
+        close_old_connections()
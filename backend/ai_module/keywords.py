@@ -0,0 +1,84 @@
+import re
+
+# Keyword vocabularies used by AITaskManager, grouped by the kind of hit they produce
+CATEGORY_KEYWORDS = {
+    'work': ['meeting', 'project', 'deadline', 'client', 'presentation', 'report'],
+    'personal': ['doctor', 'appointment', 'family', 'friend', 'personal'],
+    'learning': ['study', 'course', 'tutorial', 'learn', 'practice', 'skill'],
+    'health': ['exercise', 'gym', 'workout', 'health', 'medical', 'therapy'],
+    'finance': ['budget', 'payment', 'invoice', 'tax', 'banking', 'investment'],
+    'home': ['clean', 'repair', 'maintenance', 'groceries', 'cooking', 'household']
+}
+
+URGENCY_PHRASES = {
+    'urgent': [
+        'urgent', 'asap', 'immediately', 'deadline', 'due today',
+        'emergency', 'critical', 'important', 'priority', 'rush'
+    ]
+}
+
+COMPLEXITY_INDICATORS = {
+    'simple': ['call', 'email', 'buy', 'send', 'check', 'remind'],
+    'moderate': ['plan', 'organize', 'prepare', 'create', 'design', 'write'],
+    'complex': ['analyze', 'develop', 'implement', 'research', 'strategic', 'comprehensive'],
+    'very_complex': ['architecture', 'framework', 'system', 'integration', 'optimization']
+}
+
+SENTIMENT_WORDS = {
+    'positive': ['good', 'great', 'excellent', 'amazing', 'wonderful', 'happy', 'success'],
+    'negative': ['bad', 'terrible', 'awful', 'horrible', 'sad', 'failure', 'problem']
+}
+
+VOCABULARIES = {
+    'category': CATEGORY_KEYWORDS,
+    'urgency': URGENCY_PHRASES,
+    'complexity': COMPLEXITY_INDICATORS,
+    'sentiment': SENTIMENT_WORDS,
+}
+
+
+class KeywordMatcher:
+    """Single-pass matcher over several keyword vocabularies.
+
+    All terms are compiled into one alternation anchored on word boundaries, so
+    a text is scanned once no matter how many vocabularies are registered.
+    """
+
+    def __init__(self, vocabularies):
+        self.vocabularies = vocabularies
+        # term -> [(group, label, position)] so a term shared by several
+        # vocabularies (e.g. 'deadline') is reported to each of them
+        self._targets = {}
+        for group, labels in vocabularies.items():
+            for label, terms in labels.items():
+                for position, term in enumerate(terms):
+                    self._targets.setdefault(term.lower(), []).append((group, label, position))
+
+        # Longest terms first so multi-word phrases win over their prefixes
+        terms = sorted(self._targets, key=len, reverse=True)
+        self._pattern = re.compile(
+            r'(?<!\w)(?:' + '|'.join(re.escape(term) for term in terms) + r')(?!\w)'
+        )
+
+    def scan(self, text):
+        """Return {group: {label: [terms]}} for every vocabulary term found in text.
+
+        Terms are listed in vocabulary order and labels keep their declaration
+        order; groups and labels without hits are present but empty.
+        """
+        found = {}
+        for term in set(self._pattern.findall(text.lower())):
+            for group, label, position in self._targets[term]:
+                found.setdefault((group, label), []).append((position, term))
+
+        hits = {}
+        for group, labels in self.vocabularies.items():
+            hits[group] = {}
+            for label in labels:
+                matches = found.get((group, label))
+                hits[group][label] = [term for _, term in sorted(matches)] if matches else []
+        return hits
+
+
+# Built once at import time and shared by every AITaskManager
+keyword_matcher = KeywordMatcher(VOCABULARIES)
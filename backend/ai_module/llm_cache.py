@@ -0,0 +1,101 @@
+import hashlib
+import json
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+
+def prompt_fingerprint(messages):
+    """Stable hash of the chat messages sent to a provider"""
+    return hashlib.sha256(json.dumps(messages, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class LLMResponseCache:
+    """DB-backed cache of LLM completions.
+
+    Entries are keyed by provider, model, prompt fingerprint and generation
+    parameters. The table is bounded by MAX_ENTRIES: the least recently used
+    rows are evicted after each insert. invalidate() drops rows for a
+    provider and/or model, e.g. after a model upgrade.
+    """
+
+    def __init__(self, enabled=True, max_entries=5000):
+        self.enabled = enabled
+        self.max_entries = max_entries
+
+    @classmethod
+    def from_settings(cls):
+        config = getattr(settings, 'AI_LLM_CACHE', {})
+        return cls(
+            enabled=config.get('ENABLED', True),
+            max_entries=config.get('MAX_ENTRIES', 5000),
+        )
+
+    def make_key(self, provider, model, prompt_hash, params):
+        payload = json.dumps([provider, model, prompt_hash, params], sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, provider, model, messages, params):
+        """Return the cached completion text, or None"""
+        if not self.enabled:
+            return None
+        from .models import LLMResponse
+
+        key = self.make_key(provider, model, prompt_fingerprint(messages), params)
+        try:
+            entry = LLMResponse.objects.filter(key=key).only('id', 'response').first()
+            if entry is None:
+                return None
+            LLMResponse.objects.filter(id=entry.id).update(
+                hit_count=F('hit_count') + 1, last_used_at=timezone.now()
+            )
+            return entry.response
+        except Exception as e:
+            print(f"LLM cache read error: {e}")
+            return None
+
+    def set(self, provider, model, messages, params, response):
+        if not self.enabled:
+            return
+        from .models import LLMResponse
+
+        prompt_hash = prompt_fingerprint(messages)
+        key = self.make_key(provider, model, prompt_hash, params)
+        try:
+            LLMResponse.objects.update_or_create(
+                key=key,
+                defaults={
+                    'provider': provider,
+                    'model': model,
+                    'prompt_hash': prompt_hash,
+                    'params': params,
+                    'response': response,
+                    'last_used_at': timezone.now(),
+                }
+            )
+            self.evict()
+        except Exception as e:
+            print(f"LLM cache write error: {e}")
+
+    def evict(self):
+        """Delete least recently used entries beyond max_entries"""
+        from .models import LLMResponse
+
+        excess = LLMResponse.objects.count() - self.max_entries
+        if excess > 0:
+            stale_ids = list(
+                LLMResponse.objects.order_by('last_used_at').values_list('id', flat=True)[:excess]
+            )
+            LLMResponse.objects.filter(id__in=stale_ids).delete()
+
+    def invalidate(self, provider=None, model=None):
+        """Drop cached completions for a provider and/or model; returns the number removed"""
+        from .models import LLMResponse
+
+        entries = LLMResponse.objects.all()
+        if provider:
+            entries = entries.filter(provider=provider)
+        if model:
+            entries = entries.filter(model=model)
+        deleted, _ = entries.delete()
+        return deleted
@@ -0,0 +1,82 @@
+import json
+import os
+import subprocess
+import sys
+from statistics import median
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# Modules every web/worker process imports while booting
+APP_MODULES = ['tasks.views', 'context.views', 'ai_module.views', 'tasks.serializers', 'context.serializers']
+
+# Libraries ai_module defers until first use
+DEFERRED_MODULES = ['openai', 'anthropic', 'httpx', 'requests', 'numpy', 'textblob', 'sklearn']
+
+PROBE = """
+import importlib, json, os, sys, time
+started = time.perf_counter()
+import django
+django.setup()
+setup_done = time.perf_counter()
+for name in {app_modules!r}:
+    importlib.import_module(name)
+apps_done = time.perf_counter()
+loaded = [name for name in {deferred_modules!r} if name in sys.modules]
+deferred = 0.0
+for name in {deferred_modules!r}:
+    if name in sys.modules:
+        continue
+    before = time.perf_counter()
+    try:
+        importlib.import_module(name)
+    except ImportError:
+        continue
+    deferred += time.perf_counter() - before
+print(json.dumps({{
+    'setup': setup_done - started,
+    'apps': apps_done - setup_done,
+    'deferred': deferred,
+    'loaded_at_startup': loaded,
+}}))
+"""
+
+class Command(BaseCommand):
+    help = 'Measure cold-start import time of the app modules in fresh interpreters'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--runs',
+            type=int,
+            default=5,
+            help='Number of fresh interpreters to start'
+        )
+
+    def handle(self, *args, **options):
+        probe = PROBE.format(app_modules=APP_MODULES, deferred_modules=DEFERRED_MODULES)
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'smart_todo.settings'))
+
+        results = []
+        for _ in range(options['runs']):
+            output = subprocess.run(
+                [sys.executable, '-c', probe],
+                cwd=settings.BASE_DIR,
+                env=env,
+                capture_output=True,
+                text=True,
+                check=True
+            ).stdout
+            results.append(json.loads(output.strip().splitlines()[-1]))
+
+        setup = median(result['setup'] for result in results) * 1000
+        apps = median(result['apps'] for result in results) * 1000
+        deferred = median(result['deferred'] for result in results) * 1000
+        loaded = results[-1]['loaded_at_startup']
+
+        self.stdout.write(f'django.setup():           {setup:8.1f} ms')
+        self.stdout.write(f'App module imports:       {apps:8.1f} ms')
+        self.stdout.write(f'Deferred libraries:       {deferred:8.1f} ms (paid on first use)')
+        self.stdout.write(f'Eager-import equivalent:  {setup + apps + deferred:8.1f} ms')
+        self.stdout.write(f'Loaded at startup:        {", ".join(loaded) or "none"}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Cold start {setup + apps:.1f} ms (median of {options["runs"]} runs)'
+        ))
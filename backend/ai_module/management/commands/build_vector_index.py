@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand, CommandError
+from ai_module import vector_index
+from ai_module.optional import optional_import
+from ai_module.scoring import OPEN_STATUSES
+from context.models import ContextEntry
+from tasks.models import Task
+
+class Command(BaseCommand):
+    help = 'Compact the semantic search index, or rebuild it from the database with --rebuild'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Re-embed every open task and context entry instead of compacting the delta'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Documents embedded per batch when rebuilding'
+        )
+
+    def handle(self, *args, **options):
+        if optional_import('numpy') is None:
+            raise CommandError('NumPy is required for the vector index')
+
+        index = vector_index.get_index()
+        documents = self._documents(index, options['batch_size']) if options['rebuild'] else None
+        count = index.compact(documents)
+
+        stats = index.stats()
+        self.stdout.write(
+            f"Version {stats['version']}: {stats['main_rows']} rows in {stats['partitions']} partitions"
+        )
+        self.stdout.write(self.style.SUCCESS(f'Vector index holds {count} documents'))
+
+    def _documents(self, index, batch_size):
+        """Yield (keys, vectors) chunks for every open task and context entry"""
+        tasks = Task.objects.filter(status__in=OPEN_STATUSES).only('id', 'title', 'description', 'tags').order_by('id')
+        batch = []
+        for task in tasks.iterator(chunk_size=batch_size):
+            batch.append(task)
+            if len(batch) >= batch_size:
+                yield self._chunk('task', batch, [vector_index.task_document(task) for task in batch], index)
+                batch = []
+        if batch:
+            yield self._chunk('task', batch, [vector_index.task_document(task) for task in batch], index)
+
+        entries = ContextEntry.objects.only('id', 'content').order_by('id')
+        batch = []
+        for entry in entries.iterator(chunk_size=batch_size):
+            batch.append(entry)
+            if len(batch) >= batch_size:
+                yield self._chunk('context', batch, [entry.content for entry in batch], index)
+                batch = []
+        if batch:
+            yield self._chunk('context', batch, [entry.content for entry in batch], index)
+
+    def _chunk(self, kind, objects, texts, index):
+        np = optional_import('numpy')
+        keys = np.array([vector_index.make_key(kind, obj.id) for obj in objects], dtype=np.int64)
+        return keys, vector_index.embed(texts, index.dim)
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from ai_module.llm_cache import LLMResponseCache
+
+class Command(BaseCommand):
+    help = 'Invalidate cached LLM completions, optionally for one provider or model'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--provider', help='Only clear entries from this provider (openai, anthropic, lm_studio)')
+        parser.add_argument('--model', help='Only clear entries produced by this model')
+
+    def handle(self, *args, **options):
+        deleted = LLMResponseCache.from_settings().invalidate(
+            provider=options['provider'],
+            model=options['model']
+        )
+        self.stdout.write(self.style.SUCCESS(f'Removed {deleted} cached completions'))
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+from ai_module.dedupe import duplicate_groups
+from ai_module.scoring import OPEN_STATUSES
+from tasks.models import Task
+
+class Command(BaseCommand):
+    help = 'Report groups of near-duplicate tasks found through the LSH index'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            help='Minimum estimated Jaccard similarity (defaults to AI_DEDUPE THRESHOLD)'
+        )
+        parser.add_argument(
+            '--include-closed',
+            action='store_true',
+            help='Also consider completed and cancelled tasks'
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=50,
+            help='Maximum number of groups to print'
+        )
+
+    def handle(self, *args, **options):
+        statuses = None if options['include_closed'] else OPEN_STATUSES
+        groups = duplicate_groups(options['threshold'], statuses)
+
+        shown = groups[:options['limit']]
+        titles = dict(
+            Task.objects.filter(id__in=[task_id for group in shown for task_id in group])
+            .values_list('id', 'title')
+        )
+        for number, group in enumerate(shown, 1):
+            self.stdout.write(f'Group {number} ({len(group)} tasks):')
+            for task_id in group:
+                self.stdout.write(f'  #{task_id} {titles.get(task_id, "")}')
+
+        duplicates = sum(len(group) - 1 for group in groups)
+        self.stdout.write(self.style.SUCCESS(
+            f'Found {len(groups)} duplicate groups ({duplicates} redundant tasks)'
+        ))
@@ -0,0 +1,36 @@
+import json
+import os
+from django.core.management.base import BaseCommand, CommandError
+from ai_module import artifacts
+from ai_module.keywords import VOCABULARIES
+
+class Command(BaseCommand):
+    help = 'Compile the analyzer artifacts into a shared snapshot and publish it to all workers'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--vocabularies',
+            help='JSON file of {group: {label: [terms]}} overriding the built-in keyword vocabularies'
+        )
+
+    def handle(self, *args, **options):
+        vocabularies = None
+        if options['vocabularies']:
+            try:
+                with open(options['vocabularies']) as f:
+                    overrides = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Could not read vocabularies: {e}")
+            missing = set(VOCABULARIES) - set(overrides)
+            if missing:
+                raise CommandError(f"Vocabulary groups missing: {', '.join(sorted(missing))}")
+            vocabularies = overrides
+
+        version = artifacts.publish(vocabularies)
+        snapshot = artifacts.preload()
+        size = os.path.getsize(snapshot.path)
+        model = snapshot.category_model
+        self.stdout.write(f'Keyword terms:     {sum(len(terms) for labels in snapshot.meta["vocabularies"].values() for terms in labels.values())}')
+        self.stdout.write(f'Stopwords:         {len(snapshot.stopwords)}')
+        self.stdout.write(f'Category model:    {f"{len(model.category_ids)} categories" if model is not None else "none trained"}')
+        self.stdout.write(self.style.SUCCESS(f'Published AI snapshot {version} ({size / 1024:.1f} KiB)'))
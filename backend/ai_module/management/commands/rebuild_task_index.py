@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+from ai_module import dedupe, text_index
+from ai_module.models import TaskBucket, TaskSignature, TaskTerm
+from tasks.models import Task
+
+class Command(BaseCommand):
+    help = 'Rebuild the TF-IDF (related tasks) and MinHash/LSH (near-duplicate) task indexes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Tasks indexed per batch'
+        )
+
+    def handle(self, *args, **options):
+        TaskTerm.objects.all().delete()
+        TaskSignature.objects.all().delete()
+        TaskBucket.objects.all().delete()
+
+        # The TF-IDF index skips tasks that are not open; dedupe covers every task
+        tasks = Task.objects.only('id', 'title', 'description', 'status').order_by('id')
+        indexed = 0
+        postings = 0
+        signatures = 0
+        batch = []
+        for task in tasks.iterator(chunk_size=options['batch_size']):
+            batch.append(task)
+            if len(batch) >= options['batch_size']:
+                postings += text_index.index_tasks(batch)
+                signatures += dedupe.index_tasks(batch)
+                indexed += len(batch)
+                batch = []
+        if batch:
+            postings += text_index.index_tasks(batch)
+            signatures += dedupe.index_tasks(batch)
+            indexed += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Indexed {indexed} tasks ({postings} postings, {signatures} signatures)'
+        ))
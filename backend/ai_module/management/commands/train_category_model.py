@@ -0,0 +1,73 @@
+from datetime import datetime, timezone as dt_timezone
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from ai_module import artifacts, classifier
+from ai_module.optional import optional_import
+from tasks.models import Category, Task
+
+class Command(BaseCommand):
+    help = 'Train the naive Bayes category classifier from existing task categories'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Only add tasks categorized since the last training run to the saved model'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Tasks read per batch'
+        )
+
+    def handle(self, *args, **options):
+        if optional_import('numpy') is None:
+            raise CommandError('NumPy is required to train the category model')
+
+        config = classifier.get_config()
+        model = None
+        if options['incremental']:
+            try:
+                model = classifier.CategoryModel.load(config['PATH'])
+            except FileNotFoundError:
+                self.stdout.write('No saved model yet, training from scratch')
+            except ValueError as e:
+                self.stdout.write(f'{e}, training from scratch')
+        if model is None:
+            model = classifier.CategoryModel.empty(config['FEATURES'], config['ALPHA'])
+
+        model.sync_categories(list(Category.objects.order_by('id').values_list('id', 'name')))
+
+        # Tasks categorized after this run starts are left for the next one
+        trained_until = timezone.now()
+        tasks = Task.objects.filter(category__isnull=False, categorized_at__lte=trained_until)
+        if model.trained_until:
+            tasks = tasks.filter(
+                categorized_at__gt=datetime.fromtimestamp(model.trained_until, tz=dt_timezone.utc)
+            )
+        tasks = tasks.order_by('categorized_at', 'id').values_list('title', 'description', 'category_id')
+        trained = 0
+        batch = []
+        for title, description, category_id in tasks.iterator(chunk_size=options['batch_size']):
+            batch.append((f"{title} {description}", category_id))
+            if len(batch) >= options['batch_size']:
+                model.partial_fit(batch)
+                trained += len(batch)
+                batch = []
+        if batch:
+            model.partial_fit(batch)
+            trained += len(batch)
+        model.trained_until = trained_until.timestamp()
+
+        model.save(config['PATH'])
+        classifier.reset_model()
+
+        # Workers read the model from the shared snapshot once one is published
+        snapshot = artifacts.preload()
+        if snapshot is not None:
+            version = artifacts.publish(snapshot.meta['vocabularies'])
+            self.stdout.write(f'Republished AI snapshot {version}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Trained on {trained} tasks across {len(model.category_ids)} categories'
+        ))
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.5 on 2026-10-17 04:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_module', '0001_initial'),
+        ('tasks', '0003_task_enhancement_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64)),
+                ('weight', models.FloatField()),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='index_terms', to='tasks.task')),
+            ],
+            options={
+                'unique_together': {('term', 'task')},
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.5 on 2026-10-17 04:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_module', '0002_taskterm'),
+        ('tasks', '0003_task_enhancement_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.BigIntegerField(db_index=True)),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lsh_buckets', to='tasks.task')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TaskSignature',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('signature', models.JSONField(default=list)),
+                ('title_signature', models.JSONField(default=list)),
+                ('task', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='minhash', to='tasks.task')),
+            ],
+        ),
+    ]
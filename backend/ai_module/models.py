@@ -1,3 +1,51 @@
 from django.db import models
+from django.utils import timezone
 
-# Create your models here.
+class LLMResponse(models.Model):
+    """Cached LLM completion keyed by provider, model, prompt and generation parameters"""
+    key = models.CharField(max_length=64, unique=True)
+    provider = models.CharField(max_length=20)
+    model = models.CharField(max_length=100)
+    prompt_hash = models.CharField(max_length=64)
+    params = models.JSONField(default=dict, blank=True)
+    response = models.TextField()
+    hit_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(default=timezone.now, db_index=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['provider', 'model']),
+        ]
+    
+    def __str__(self):
+        return f"{self.provider}/{self.model} - {self.prompt_hash[:12]}"
+
+class TaskTerm(models.Model):
+    """Posting in the TF-IDF inverted index over open tasks: one row per (term, task)"""
+    term = models.CharField(max_length=64)
+    task = models.ForeignKey('tasks.Task', on_delete=models.CASCADE, related_name='index_terms')
+    weight = models.FloatField()  # length-normalized log term frequency
+    
+    class Meta:
+        unique_together = ['term', 'task']
+    
+    def __str__(self):
+        return f"{self.term} -> {self.task_id} ({self.weight:.3f})"
+
+class TaskSignature(models.Model):
+    """MinHash signature of a task's title and description, for near-duplicate lookups"""
+    task = models.OneToOneField('tasks.Task', on_delete=models.CASCADE, related_name='minhash')
+    signature = models.JSONField(default=list)
+    title_signature = models.JSONField(default=list)
+    
+    def __str__(self):
+        return f"Signature for task {self.task_id}"
+
+class TaskBucket(models.Model):
+    """LSH band bucket membership: tasks sharing a key agree on every row of one band"""
+    key = models.BigIntegerField(db_index=True)
+    task = models.ForeignKey('tasks.Task', on_delete=models.CASCADE, related_name='lsh_buckets')
+    
+    def __str__(self):
+        return f"{self.key} -> {self.task_id}"
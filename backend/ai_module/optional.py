@@ -0,0 +1,15 @@
+import importlib
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def optional_import(name):
+    """Import a module on first use; returns None when it is not installed.
+
+    Heavy or optional libraries (provider SDKs, NumPy, TextBlob) go through
+    here so importing ai_module doesn't pay for them until they are needed.
+    """
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
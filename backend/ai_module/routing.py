@@ -0,0 +1,213 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from statistics import median
+from .http_pool import ProviderBusy
+
+
+class ProviderUnavailable(Exception):
+    """Raised when no provider could produce a result within the request deadline"""
+
+
+class CircuitBreaker:
+    """Per-provider circuit breaker.
+
+    Closed: calls flow. After `failure_threshold` consecutive failures the
+    circuit opens and calls are refused until `reset_timeout` seconds have
+    passed; then a single probe call is let through (half-open). A successful
+    probe closes the circuit, a failed one re-opens it.
+    """
+
+    def __init__(self, failure_threshold=3, reset_timeout=60.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if self.clock() - self.opened_at >= self.reset_timeout:
+            return 'half_open'
+        return 'open'
+
+    def allow(self):
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half_open' and not self.probing:
+                self.probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.probing or self.failures >= self.failure_threshold:
+                self.opened_at = self.clock()
+            self.probing = False
+
+
+class ProviderStats:
+    """Rolling latency and error rate over the last `window` calls"""
+
+    def __init__(self, window=50):
+        self.calls = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, latency, ok):
+        with self._lock:
+            self.calls.append((latency, ok))
+
+    @property
+    def error_rate(self):
+        with self._lock:
+            if not self.calls:
+                return 0.0
+            return sum(1 for _, ok in self.calls if not ok) / len(self.calls)
+
+    @property
+    def median_latency(self):
+        with self._lock:
+            latencies = [latency for latency, ok in self.calls if ok]
+        return median(latencies) if latencies else None
+
+
+class ProviderRouter:
+    """Routes a request across LLM providers by observed health and latency.
+
+    Providers are tried best-first: lowest rolling error rate, then lowest
+    median latency, then configured order. Providers with an open circuit are
+    skipped. A failed provider fails over to the next one while the per-request
+    deadline allows. With `hedge_after` set, a second provider is started when
+    the first has not answered within that many seconds and the first result
+    wins.
+    """
+
+    def __init__(self, order, deadline=30.0, hedge_after=None, failure_threshold=3,
+                 reset_timeout=60.0, window=50, max_workers=8):
+        self.order = list(order)
+        self.deadline = deadline
+        self.hedge_after = hedge_after
+        self.breakers = {
+            name: CircuitBreaker(failure_threshold, reset_timeout) for name in self.order
+        }
+        self.stats = {name: ProviderStats(window) for name in self.order}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='ai-provider')
+
+    def ranked_providers(self, available=None):
+        """Providers in the order they should be tried, excluding open circuits"""
+        names = [name for name in self.order if available is None or name in available]
+        latencies = {name: self.stats[name].median_latency for name in names}
+        # Providers without successful calls yet rank as typical, not as fastest
+        observed = [latency for latency in latencies.values() if latency is not None]
+        prior = median(observed) if observed else 0.0
+        names.sort(key=lambda name: (
+            self.stats[name].error_rate,
+            prior if latencies[name] is None else latencies[name],
+            self.order.index(name),
+        ))
+        return [name for name in names if self.breakers[name].state != 'open']
+
+    def call(self, request, available=None):
+        """Run request(provider, timeout) on the best provider and return its result.
+
+        Raises ProviderUnavailable when every candidate failed or the
+        deadline passed first.
+        """
+        deadline = time.monotonic() + self.deadline
+        candidates = iter(self.ranked_providers(available))
+        pending = {}
+        errors = []
+        hedged = False
+
+        def launch_next():
+            for name in candidates:
+                if self.breakers[name].allow():
+                    remaining = deadline - time.monotonic()
+                    pending[self._executor.submit(self._timed_call, name, request, remaining)] = name
+                    return True
+            return False
+
+        launch_next()
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+
+            can_hedge = self.hedge_after is not None and not hedged and len(pending) == 1
+            done, _ = wait(
+                pending,
+                timeout=min(remaining, self.hedge_after) if can_hedge else remaining,
+                return_when=FIRST_COMPLETED
+            )
+
+            if not done:
+                if can_hedge:
+                    hedged = True
+                    launch_next()
+                continue
+
+            for future in done:
+                name = pending.pop(future)
+                try:
+                    return future.result()
+                except Exception as e:
+                    errors.append(f"{name}: {e}")
+
+            if not pending:
+                launch_next()
+
+        if pending:
+            errors.extend(f"{name}: deadline exceeded" for name in pending.values())
+        raise ProviderUnavailable('; '.join(errors) or 'No AI provider available')
+
+    def snapshot(self):
+        """Current breaker state and rolling stats per provider"""
+        return {
+            name: {
+                'state': self.breakers[name].state,
+                'consecutive_failures': self.breakers[name].failures,
+                'error_rate': round(self.stats[name].error_rate, 4),
+                'median_latency': self.stats[name].median_latency,
+                'calls': len(self.stats[name].calls),
+            }
+            for name in self.order
+        }
+
+    def allow(self, name):
+        """Whether the breaker lets a call through to `name` right now"""
+        return self.breakers[name].allow()
+
+    def record(self, name, latency, ok):
+        """Feed the outcome of a call made outside call() (e.g. a stream) into the stats"""
+        self.stats[name].record(latency, ok)
+        if ok:
+            self.breakers[name].record_success()
+        else:
+            self.breakers[name].record_failure()
+
+    def _timed_call(self, name, request, timeout):
+        started = time.monotonic()
+        try:
+            result = request(name, max(timeout, 0.001))
+        except ProviderBusy:
+            # Our own queue was full; the provider was never asked
+            raise
+        except Exception:
+            self.record(name, time.monotonic() - started, False)
+            raise
+        self.record(name, time.monotonic() - started, True)
+        return result
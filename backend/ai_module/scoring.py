@@ -0,0 +1,192 @@
+from datetime import datetime, timedelta
+from django.db.models import Case, FloatField, Q, QuerySet, Value, When
+from django.db.models.functions import Cast, Greatest, Least
+from django.utils import timezone
+from .optional import optional_import
+
+# Priority score factors shared by the per-task and columnar scorers
+BASE_SCORE = 0.5
+DEADLINE_BONUSES = [(1, 0.3), (3, 0.2), (7, 0.1)]  # (max days until deadline, bonus)
+KEYWORD_WEIGHT = 0.05
+KEYWORD_CAP = 0.2
+PRIORITY_WEIGHTS = {'low': -0.1, 'medium': 0, 'high': 0.2, 'urgent': 0.4}
+AGE_WEIGHT = 0.01
+AGE_CAP = 0.1
+
+SCORE_FIELDS = ('id', 'deadline', 'priority', 'created_at', 'title', 'description')
+
+OPEN_STATUSES = ['pending', 'in_progress']
+
+DAY_US = 24 * 60 * 60 * 1000000
+ONE_US = timedelta(microseconds=1)
+
+
+def numpy_available():
+    return optional_import('numpy') is not None
+
+
+def task_rows(tasks):
+    """Return (id, deadline, priority, created_at, title, description) rows for tasks"""
+    if isinstance(tasks, QuerySet):
+        # Scores are keyed by id, so skip the default ordering
+        return list(tasks.order_by().values_list(*SCORE_FIELDS))
+    return [
+        (task.id, task.deadline, task.priority, task.created_at, task.title, task.description)
+        for task in tasks
+    ]
+
+
+def score_task_rows(rows, context_keywords=None, now=None):
+    """Score task rows column-wise with NumPy.
+
+    Produces exactly the scores of AITaskManager._calculate_priority_score
+    (clamped to [0, 1]), evaluated against a single `now`.
+    """
+    if not rows:
+        return {}
+    np = optional_import('numpy')
+    now = now or timezone.now()
+    epoch = datetime(1970, 1, 1, tzinfo=now.tzinfo)
+    now_us = (now - epoch) // ONE_US
+
+    ids, deadlines, priorities, created, titles, descriptions = zip(*rows)
+    count = len(ids)
+
+    # Factor 1: Deadline proximity, bucketed on whole days like timedelta.days
+    has_deadline = np.fromiter((deadline is not None for deadline in deadlines), dtype=bool, count=count)
+    deadline_us = np.fromiter(
+        ((deadline - epoch) // ONE_US if deadline is not None else now_us for deadline in deadlines),
+        dtype=np.int64, count=count
+    )
+    days_until_deadline = (deadline_us - now_us) // DAY_US
+    deadline_bonus = np.select(
+        [has_deadline & (days_until_deadline <= days) for days, _ in DEADLINE_BONUSES],
+        [bonus for _, bonus in DEADLINE_BONUSES],
+        default=0.0
+    )
+
+    # Factor 2: Context keywords, via a (tasks x keywords) term matrix
+    keyword_bonus = np.zeros(count)
+    if context_keywords:
+        texts = [f"{title} {description}".lower() for title, description in zip(titles, descriptions)]
+        term_matrix = np.empty((count, len(context_keywords)), dtype=bool)
+        for column, keyword in enumerate(context_keywords):
+            term_matrix[:, column] = np.fromiter((keyword in text for text in texts), dtype=bool, count=count)
+        keyword_bonus = np.minimum(KEYWORD_CAP, term_matrix.sum(axis=1) * KEYWORD_WEIGHT)
+
+    # Factor 3: Manual priority setting
+    priority_bonus = np.fromiter((PRIORITY_WEIGHTS.get(priority, 0) for priority in priorities), dtype=float, count=count)
+
+    # Factor 4: Task age
+    created_us = np.fromiter(((created_at - epoch) // ONE_US for created_at in created), dtype=np.int64, count=count)
+    days_old = (now_us - created_us) // DAY_US
+    age_bonus = np.minimum(AGE_CAP, days_old * AGE_WEIGHT)
+
+    # Accumulate in the same order as the per-task scorer so floats match exactly
+    scores = np.full(count, BASE_SCORE)
+    scores += deadline_bonus
+    scores += keyword_bonus
+    scores += priority_bonus
+    scores += age_bonus
+    scores = np.clip(scores, 0.0, 1.0)
+
+    return dict(zip(ids, scores.tolist()))
+
+
+def _float(value):
+    """A double-precision literal; PostgreSQL would otherwise type bare decimals as numeric"""
+    return Cast(Value(float(value)), FloatField())
+
+
+def next_score_change(deadline, created_at, now=None):
+    """Return the first moment after `now` at which a time-based score term changes.
+    
+    The deadline term steps when the whole days left drop to 7, 3 and 1, and the
+    age term steps on every whole day of age until it reaches its cap. Between
+    those instants the score is constant. Returns None when no step is pending.
+    """
+    now = now or timezone.now()
+    candidates = []
+
+    if deadline is not None:
+        for max_days, _ in DEADLINE_BONUSES:
+            # days <= max_days first holds just after deadline - (max_days + 1) days
+            step = deadline - timedelta(days=max_days + 1) + ONE_US
+            if step > now:
+                candidates.append(step)
+
+    if created_at is not None:
+        days_old = (now - created_at).days
+        if days_old < round(AGE_CAP / AGE_WEIGHT):
+            candidates.append(created_at + timedelta(days=days_old + 1))
+
+    return min(candidates) if candidates else None
+
+
+def priority_score_expression(now=None, context_keywords=None):
+    """Build a database expression equal to the clamped per-task priority score.
+
+    Whole-day buckets are rewritten as timestamp comparisons against `now`
+    (days <= n  <=>  delta < n + 1 days), so no database-specific date
+    arithmetic is needed. The keyword term is computed in SQL from
+    `context_keywords`, so the expression's size depends only on the number
+    of keywords, never on the number of tasks.
+    """
+    now = now or timezone.now()
+
+    # Factor 1: Deadline proximity (NULL deadlines fall through to 0)
+    deadline_term = Case(
+        *[
+            When(deadline__lt=now + timedelta(days=max_days + 1), then=_float(bonus))
+            for max_days, bonus in DEADLINE_BONUSES
+        ],
+        default=_float(0.0),
+        output_field=FloatField()
+    )
+
+    # Factor 2: Keywords in task vs context
+    if context_keywords:
+        keyword_matches = sum(
+            (
+                Case(
+                    When(Q(title__icontains=keyword) | Q(description__icontains=keyword), then=Value(1)),
+                    default=Value(0)
+                )
+                for keyword in context_keywords
+            ),
+            Value(0)
+        )
+        keyword_term = Least(_float(KEYWORD_CAP), keyword_matches * _float(KEYWORD_WEIGHT))
+    else:
+        keyword_term = _float(0.0)
+
+    # Factor 3: Manual priority setting
+    priority_term = Case(
+        *[When(priority=priority, then=_float(weight)) for priority, weight in PRIORITY_WEIGHTS.items()],
+        default=_float(0.0),
+        output_field=FloatField()
+    )
+
+    # Factor 4: Task age, one bucket per whole day until the cap is reached
+    # (tasks stamped after `now` get no age term)
+    max_age_days = round(AGE_CAP / AGE_WEIGHT)
+    age_term = Case(
+        *[
+            When(created_at__lte=now - timedelta(days=days), then=_float(min(AGE_CAP, days * AGE_WEIGHT)))
+            for days in range(max_age_days, -1, -1)
+        ],
+        default=_float(0.0),
+        output_field=FloatField()
+    )
+
+    score = _float(BASE_SCORE) + deadline_term + keyword_term + priority_term + age_term
+    return Least(Greatest(score, _float(0.0)), _float(1.0))
+
+
+def recompute_priority_scores(queryset=None, context_keywords=None, now=None):
+    """Recompute priority_score for open tasks with a single UPDATE; returns the row count"""
+    if queryset is None:
+        from tasks.models import Task
+        queryset = Task.objects.filter(status__in=OPEN_STATUSES)
+
+    return queryset.update(priority_score=priority_score_expression(now, context_keywords))
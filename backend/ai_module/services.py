@@ -1,55 +1,196 @@
-import openai
-import anthropic
-import requests
 import json
 from datetime import datetime, timedelta
+from threading import Lock
 from django.conf import settings
 from django.utils import timezone
 import re
+from collections import Counter
+from .cache import InsightCache
+from .llm_cache import LLMResponseCache
+from .optional import optional_import
+from .routing import ProviderRouter
+from .http_pool import ConcurrencyLimiter, build_httpx_client, build_session
+from . import artifacts, classifier, scoring
 
-# Try to import optional dependencies
-try:
-    from textblob import TextBlob
-    TEXTBLOB_AVAILABLE = True
-except ImportError:
-    TEXTBLOB_AVAILABLE = False
+# Provider SDKs and TextBlob are imported on first use (see optional_import)
+# so that importing this module stays cheap for commands and workers.
+
+# Bump whenever analysis output changes so cached insights are not reused
+ANALYZER_VERSION = 1
+
+# Text analysis tables shared by every analysis call
+WORD_PATTERN = re.compile(r'\b[A-Za-z]{3,}\b')
+
+STOPWORDS = frozenset(['the', 'and', 'for', 'are', 'but', 'not', 'you', 'all', 'can', 'had', 'her', 'was', 'one', 'our', 'out', 'day', 'get', 'has', 'him', 'his', 'how', 'its', 'may', 'new', 'now', 'old', 'see', 'two', 'who', 'boy', 'did', 'has', 'let', 'put', 'say', 'she', 'too', 'use'])
+
+TASK_PATTERNS = [
+    re.compile(r'need to (.+?)(?:\.|$)', re.IGNORECASE),
+    re.compile(r'have to (.+?)(?:\.|$)', re.IGNORECASE),
+    re.compile(r'should (.+?)(?:\.|$)', re.IGNORECASE),
+    re.compile(r'must (.+?)(?:\.|$)', re.IGNORECASE),
+    re.compile(r'remember to (.+?)(?:\.|$)', re.IGNORECASE)
+]
+
+TIME_PATTERNS = [
+    re.compile(r'(\d{1,2}:\d{2})', re.IGNORECASE),  # Time format
+    re.compile(r'(today|tomorrow|next week|this week)', re.IGNORECASE),
+    re.compile(r'(monday|tuesday|wednesday|thursday|friday|saturday|sunday)', re.IGNORECASE),
+    re.compile(r'(\d{1,2}\/\d{1,2}\/\d{2,4})', re.IGNORECASE)  # Date format
+]
+
+def keyword_sentiments(positive_counts, negative_counts):
+    """Keyword-count sentiment per text, computed column-wise when NumPy is available"""
+    np = optional_import('numpy')
+    if np is None:
+        return [
+            0.0 if positive == 0 and negative == 0 else
+            0.5 if negative == 0 else
+            -0.5 if positive == 0 else
+            (positive - negative) / (positive + negative)
+            for positive, negative in zip(positive_counts, negative_counts)
+        ]
+    
+    positive = np.asarray(positive_counts, dtype=float)
+    negative = np.asarray(negative_counts, dtype=float)
+    total = positive + negative
+    ratio = (positive - negative) / np.where(total > 0, total, 1.0)
+    return np.select(
+        [total == 0, negative == 0, positive == 0],
+        [0.0, 0.5, -0.5],
+        default=ratio
+    ).tolist()
 
-try:
-    from sklearn.feature_extraction.text import TfidfVectorizer
-    from sklearn.metrics.pairwise import cosine_similarity
-    import numpy as np
-    SKLEARN_AVAILABLE = True
-except ImportError:
-    SKLEARN_AVAILABLE = False
 
 class AITaskManager:
     def __init__(self):
-        self.openai_client = None
-        self.anthropic_client = None
+        self.openai_api_key = getattr(settings, 'OPENAI_API_KEY', None)
+        self.anthropic_api_key = getattr(settings, 'ANTHROPIC_API_KEY', None)
         self.lm_studio_url = getattr(settings, 'LM_STUDIO_BASE_URL', None)
-        
-        if getattr(settings, 'OPENAI_API_KEY', None):
-            self.openai_client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
-        
-        if getattr(settings, 'ANTHROPIC_API_KEY', None):
-            self.anthropic_client = anthropic.Client(api_key=settings.ANTHROPIC_API_KEY)
+        self.insight_cache = InsightCache.from_settings()
+        self.llm_cache = LLMResponseCache.from_settings()
+        self.openai_model = getattr(settings, 'OPENAI_MODEL', 'gpt-3.5-turbo')
+        self.anthropic_model = getattr(settings, 'ANTHROPIC_MODEL', 'claude-3-sonnet-20240229')
+        self.lm_studio_model = getattr(settings, 'LM_STUDIO_MODEL', 'local-model')
+        
+        # Shared keep-alive connection pools and per-provider concurrency caps
+        http_config = getattr(settings, 'AI_HTTP', {})
+        pool_size = http_config.get('POOL_SIZE', 10)
+        concurrency = http_config.get('CONCURRENCY', {})
+        self.limiters = {
+            provider: ConcurrencyLimiter(
+                concurrency.get(provider, default_limit),
+                http_config.get('QUEUE_TIMEOUT', 30.0)
+            )
+            for provider, default_limit in [('openai', 16), ('anthropic', 16), ('lm_studio', 2)]
+        }
+        self.pool_size = pool_size
+        
+        # SDK clients and HTTP sessions are built on first use
+        self._clients = {}
+        self._clients_lock = Lock()
+        
+        router_config = getattr(settings, 'AI_PROVIDER_ROUTER', {})
+        self.provider_router = ProviderRouter(
+            order=router_config.get('ORDER', ['openai', 'anthropic', 'lm_studio']),
+            deadline=router_config.get('DEADLINE', 30.0),
+            hedge_after=router_config.get('HEDGE_AFTER'),
+            failure_threshold=router_config.get('FAILURE_THRESHOLD', 3),
+            reset_timeout=router_config.get('RESET_TIMEOUT', 60.0),
+            window=router_config.get('WINDOW', 50),
+        )
+    
+    @property
+    def openai_client(self):
+        if not self.openai_api_key:
+            return None
+        return self._get_client('openai', lambda: optional_import('openai').OpenAI(
+            api_key=self.openai_api_key,
+            base_url=getattr(settings, 'OPENAI_BASE_URL', None),
+            http_client=build_httpx_client(self.pool_size)
+        ))
+    
+    @openai_client.setter
+    def openai_client(self, client):
+        self._clients['openai'] = client
+    
+    @property
+    def anthropic_client(self):
+        if not self.anthropic_api_key:
+            return None
+        return self._get_client('anthropic', lambda: optional_import('anthropic').Client(
+            api_key=self.anthropic_api_key,
+            base_url=getattr(settings, 'ANTHROPIC_BASE_URL', None),
+            http_client=build_httpx_client(self.pool_size)
+        ))
+    
+    @anthropic_client.setter
+    def anthropic_client(self, client):
+        self._clients['anthropic'] = client
+    
+    @property
+    def lm_studio_session(self):
+        return self._get_client('lm_studio', lambda: build_session(self.pool_size))
+    
+    def _get_client(self, name, build):
+        """Return the named client, building it once even under concurrent first use"""
+        client = self._clients.get(name)
+        if client is None:
+            with self._clients_lock:
+                client = self._clients.get(name)
+                if client is None:
+                    client = self._clients[name] = build()
+        return client
     
     def analyze_context(self, context_entries):
         """Analyze daily context for task insights"""
         combined_text = " ".join([entry.content for entry in context_entries])
+        return self.insight_cache.get_or_compute(combined_text, self._analyzer_version(), self._analyze_text)
+    
+    def analyze_context_batch(self, context_entries):
+        """Analyze each context entry on its own and return one insights dict per entry
         
-        insights = {
-            'sentiment': self._analyze_sentiment(combined_text),
-            'keywords': self._extract_keywords(combined_text),
-            'urgency_indicators': self._detect_urgency(combined_text),
-            'task_suggestions': self._suggest_tasks_from_context(combined_text),
-            'time_indicators': self._extract_time_indicators(combined_text)
-        }
-        
-        return insights
+        Equal to [analyze_context([entry]) for entry in context_entries], but the
+        cache is consulted for the whole batch, repeated texts are analyzed once,
+        and the misses share one lowercase/tokenize pass, the stopword and
+        matcher lookups, and a vectorized keyword-sentiment fallback.
+        """
+        texts = [entry.content for entry in context_entries]
+        return self.insight_cache.get_or_compute_many(texts, self._analyzer_version(), self._analyze_texts)
+    
+    def _analyzer_version(self):
+        """Insight cache version, including the AI snapshot the vocabularies come from"""
+        snapshot_version = artifacts.version()
+        return f"{ANALYZER_VERSION}.{snapshot_version}" if snapshot_version else ANALYZER_VERSION
+    
+    def _analyze_text(self, text):
+        """Run every context analysis pass over a single text"""
+        return self._analyze_texts([text])[0]
+    
+    def _analyze_texts(self, texts):
+        """Run every context analysis pass over each text, sharing the per-batch work"""
+        matcher = artifacts.keyword_matcher()
+        stopwords = artifacts.stopwords()
+        lowered = [text.lower() for text in texts]
+        hits = [matcher.scan(text_lower) for text_lower in lowered]
+        sentiments = self._analyze_sentiments(texts, hits)
+        
+        return [
+            {
+                'sentiment': sentiment,
+                'keywords': self._extract_keywords(text_lower, stopwords),
+                'urgency_indicators': self._detect_urgency(text_lower, text_hits),
+                'task_suggestions': self._suggest_tasks_from_context(text),
+                'time_indicators': self._extract_time_indicators(text)
+            }
+            for text, text_lower, text_hits, sentiment in zip(texts, lowered, hits, sentiments)
+        ]
     
     def prioritize_tasks(self, tasks, context_data=None):
         """Calculate priority scores for tasks based on AI analysis"""
+        if scoring.numpy_available():
+            context_keywords = context_data.get('keywords', []) if context_data else []
+            return scoring.score_task_rows(scoring.task_rows(tasks), context_keywords)
+        
         priority_scores = {}
         
         for task in tasks:
@@ -91,142 +232,270 @@ class AITaskManager:
         return suggested_deadline
     
     def enhance_task_description(self, title, description, context_data=None):
-        """Enhance task description with AI-powered insights"""
+        """Enhance task description with AI-powered insights
+        
+        Raises ProviderUnavailable when no provider answered, so queued jobs
+        can record the failure; request handlers fall back to the original text.
+        """
+        enhancers = {
+            'openai': self._enhance_with_openai,
+            'anthropic': self._enhance_with_anthropic,
+            'lm_studio': self._enhance_with_lm_studio,
+        }
+        
+        return self.provider_router.call(
+            lambda provider, timeout: enhancers[provider](title, description, context_data, timeout),
+            available=self.available_providers()
+        )
+    
+    def enhance_task_descriptions_batch(self, tasks, context_data=None):
+        """Enhance many tasks with as few LLM calls as the token budget allows
+        
+        Tasks are packed into batches that fit the prompt and output token
+        budgets, each batch is sent as one JSON-in/JSON-out prompt, and the
+        answers are split back per task. Tasks missing from a batch answer are
+        retried on their own; a batch no provider could answer is not retried.
+        Returns {task_id: enhanced description or None}
+        where None marks a task that could not be enhanced.
+        """
+        results = {}
+        for batch in self._pack_enhancement_batches(tasks):
+            if len(batch) == 1:
+                results.update(self._enhance_individually(batch, context_data))
+                continue
+            
+            try:
+                enhanced = self._enhance_batch(batch, context_data)
+            except Exception as e:
+                # Every provider already failed this batch; don't retry it task by task
+                print(f"Error enhancing batch of {len(batch)} tasks: {e}")
+                results.update({task.id: None for task in batch})
+                continue
+            
+            results.update(enhanced)
+            missing = [task for task in batch if task.id not in enhanced]
+            results.update(self._enhance_individually(missing, context_data))
+        
+        return results
+    
+    def _pack_enhancement_batches(self, tasks):
+        """Split tasks into batches that fit the configured token budgets"""
+        config = getattr(settings, 'AI_BATCH_ENHANCEMENT', {})
+        prompt_budget = config.get('PROMPT_TOKEN_BUDGET', 3000)
+        output_per_task = config.get('OUTPUT_TOKENS_PER_TASK', 200)
+        max_tasks = min(
+            config.get('MAX_TASKS', 20),
+            max(1, config.get('MAX_OUTPUT_TOKENS', 4000) // output_per_task)
+        )
+        
+        batches = []
+        batch = []
+        batch_tokens = 0
+        for task in tasks:
+            # Rough estimate: ~4 characters per token plus JSON framing
+            task_tokens = (len(task.title) + len(task.description or '')) // 4 + 20
+            if batch and (batch_tokens + task_tokens > prompt_budget or len(batch) >= max_tasks):
+                batches.append(batch)
+                batch = []
+                batch_tokens = 0
+            batch.append(task)
+            batch_tokens += task_tokens
+        if batch:
+            batches.append(batch)
+        return batches
+    
+    def _enhance_batch(self, tasks, context_data):
+        """Send one prompt for several tasks and return {task_id: description} for the answers found"""
+        context_info = ""
+        if context_data:
+            context_info = f"Context: {context_data.get('keywords', [])}"
+        
+        items = [
+            {"id": task.id, "title": task.title, "description": task.description or ""}
+            for task in tasks
+        ]
+        prompt = f"""
+        Enhance each of these task descriptions to be more actionable and detailed.
+        For every task provide clear steps or approach, relevant context
+        considerations and potential challenges or dependencies. Keep each one
+        concise but comprehensive.
+        {context_info}
+        
+        Tasks (JSON):
+        {json.dumps(items)}
+        
+        Respond with JSON only, in the form:
+        {{"items": [{{"id": <task id>, "description": "<enhanced description>"}}]}}
+        """
+        
+        messages = [
+            {"role": "user", "content": prompt}
+        ]
+        output_per_task = getattr(settings, 'AI_BATCH_ENHANCEMENT', {}).get('OUTPUT_TOKENS_PER_TASK', 200)
+        params = {"max_tokens": output_per_task * len(tasks), "temperature": 0.7}
+        completers = {
+            'openai': self._complete_with_openai,
+            'anthropic': self._complete_with_anthropic,
+            'lm_studio': self._complete_with_lm_studio,
+        }
+        
+        content = self.provider_router.call(
+            lambda provider, timeout: completers[provider](messages, params, timeout),
+            available=self.available_providers()
+        )
+        return self._parse_batch_response(content, {task.id for task in tasks})
+    
+    def _parse_batch_response(self, content, task_ids):
+        """Extract {task_id: description} from a batch answer, skipping malformed items"""
+        start = content.find('{')
+        end = content.rfind('}')
+        if start == -1 or end < start:
+            return {}
+        
         try:
-            if self.openai_client:
-                return self._enhance_with_openai(title, description, context_data)
-            elif self.anthropic_client:
-                return self._enhance_with_anthropic(title, description, context_data)
-            else:
-                return self._enhance_with_lm_studio(title, description, context_data)
-        except Exception as e:
-            print(f"Error enhancing task description: {e}")
-            return description
-    
-    def suggest_categories(self, title, description):
-        """Suggest appropriate categories for tasks"""
-        text = f"{title} {description}".lower()
-        
-        category_keywords = {
-            'work': ['meeting', 'project', 'deadline', 'client', 'presentation', 'report'],
-            'personal': ['doctor', 'appointment', 'family', 'friend', 'personal'],
-            'learning': ['study', 'course', 'tutorial', 'learn', 'practice', 'skill'],
-            'health': ['exercise', 'gym', 'workout', 'health', 'medical', 'therapy'],
-            'finance': ['budget', 'payment', 'invoice', 'tax', 'banking', 'investment'],
-            'home': ['clean', 'repair', 'maintenance', 'groceries', 'cooking', 'household']
+            payload = json.loads(content[start:end + 1])
+        except ValueError:
+            return {}
+        
+        enhanced = {}
+        for item in payload.get('items', []) if isinstance(payload, dict) else []:
+            if not isinstance(item, dict):
+                continue
+            try:
+                task_id = int(item.get('id'))
+            except (TypeError, ValueError):
+                continue
+            text = item.get('description')
+            if task_id in task_ids and isinstance(text, str) and text.strip():
+                enhanced[task_id] = text.strip()
+        return enhanced
+    
+    def _enhance_individually(self, tasks, context_data):
+        """Enhance tasks one prompt at a time; None marks a failure"""
+        enhancers = {
+            'openai': self._enhance_with_openai,
+            'anthropic': self._enhance_with_anthropic,
+            'lm_studio': self._enhance_with_lm_studio,
         }
         
-        suggestions = []
-        for category, keywords in category_keywords.items():
-            if any(keyword in text for keyword in keywords):
-                suggestions.append(category)
+        results = {}
+        for task in tasks:
+            try:
+                results[task.id] = self.provider_router.call(
+                    lambda provider, timeout: enhancers[provider](task.title, task.description, context_data, timeout),
+                    available=self.available_providers()
+                )
+            except Exception as e:
+                print(f"Error enhancing task {task.id}: {e}")
+                results[task.id] = None
+        return results
+    
+    def available_providers(self):
+        """Providers that are configured in this process"""
+        providers = []
+        if self.openai_api_key:
+            providers.append('openai')
+        if self.anthropic_api_key:
+            providers.append('anthropic')
+        if self.lm_studio_url:
+            providers.append('lm_studio')
+        return providers
+    
+    def scan_keywords(self, text):
+        """Scan text once for category, urgency, complexity and sentiment keywords"""
+        return artifacts.keyword_matcher().scan(text)
+    
+    def suggest_categories(self, title, description, hits=None):
+        """Suggest appropriate categories for tasks"""
+        # Prefer the classifier trained on existing Task -> Category assignments
+        predicted = classifier.suggest(title, description)
+        if predicted is not None:
+            return predicted
+        
+        if hits is None:
+            hits = self.scan_keywords(f"{title} {description}")
+        
+        suggestions = [category for category, terms in hits['category'].items() if terms]
         
         return suggestions[:3]  # Return top 3 suggestions
     
-    def _analyze_sentiment(self, text):
+    def _analyze_sentiment(self, text, hits=None):
         """Analyze sentiment of the context"""
-        if TEXTBLOB_AVAILABLE:
-            try:
-                blob = TextBlob(text)
-                return blob.sentiment.polarity
-            except:
-                pass
+        if hits is None:
+            hits = self.scan_keywords(text)
+        return self._analyze_sentiments([text], [hits])[0]
+    
+    def _analyze_sentiments(self, texts, hits):
+        """Sentiment of each text: TextBlob polarity, else the keyword fallback"""
+        sentiments = [None] * len(texts)
+        textblob = optional_import('textblob')
+        if textblob is not None:
+            for i, text in enumerate(texts):
+                try:
+                    sentiments[i] = textblob.TextBlob(text).sentiment.polarity
+                except Exception:
+                    pass
         
         # Fallback sentiment analysis using simple keyword matching
-        positive_words = ['good', 'great', 'excellent', 'amazing', 'wonderful', 'happy', 'success']
-        negative_words = ['bad', 'terrible', 'awful', 'horrible', 'sad', 'failure', 'problem']
-        
-        text_lower = text.lower()
-        positive_count = sum(1 for word in positive_words if word in text_lower)
-        negative_count = sum(1 for word in negative_words if word in text_lower)
-        
-        if positive_count == 0 and negative_count == 0:
-            return 0.0
-        elif negative_count == 0:
-            return 0.5
-        elif positive_count == 0:
-            return -0.5
-        else:
-            return (positive_count - negative_count) / (positive_count + negative_count)
+        fallback = [i for i, sentiment in enumerate(sentiments) if sentiment is None]
+        if fallback:
+            positive = [len(hits[i]['sentiment']['positive']) for i in fallback]
+            negative = [len(hits[i]['sentiment']['negative']) for i in fallback]
+            for i, sentiment in zip(fallback, keyword_sentiments(positive, negative)):
+                sentiments[i] = sentiment
+        return sentiments
     
-    def _extract_keywords(self, text):
+    def _extract_keywords(self, text, stopwords=None):
         """Extract important keywords from context"""
         # Simple keyword extraction using basic NLP
-        words = re.findall(r'\b[A-Za-z]{3,}\b', text.lower())
+        words = WORD_PATTERN.findall(text.lower())
         
         # Filter out common words
-        stopwords = set(['the', 'and', 'for', 'are', 'but', 'not', 'you', 'all', 'can', 'had', 'her', 'was', 'one', 'our', 'out', 'day', 'get', 'has', 'him', 'his', 'how', 'its', 'may', 'new', 'now', 'old', 'see', 'two', 'who', 'boy', 'did', 'has', 'let', 'put', 'say', 'she', 'too', 'use'])
-        
+        if stopwords is None:
+            stopwords = artifacts.stopwords()
         keywords = [word for word in words if word not in stopwords and len(word) > 3]
         
         # Count frequency and return top keywords
-        from collections import Counter
         word_counts = Counter(keywords)
         return [word for word, count in word_counts.most_common(10)]
     
-    def _detect_urgency(self, text):
+    def _detect_urgency(self, text, hits=None):
         """Detect urgency indicators in context"""
-        urgency_phrases = [
-            'urgent', 'asap', 'immediately', 'deadline', 'due today',
-            'emergency', 'critical', 'important', 'priority', 'rush'
-        ]
+        if hits is None:
+            hits = self.scan_keywords(text)
         
-        found_indicators = []
-        text_lower = text.lower()
-        
-        for phrase in urgency_phrases:
-            if phrase in text_lower:
-                found_indicators.append(phrase)
-        
-        return found_indicators
+        return list(hits['urgency']['urgent'])
     
     def _suggest_tasks_from_context(self, text):
         """Extract potential tasks from context"""
         # Pattern matching for task-like phrases
-        task_patterns = [
-            r'need to (.+?)(?:\.|$)',
-            r'have to (.+?)(?:\.|$)',
-            r'should (.+?)(?:\.|$)',
-            r'must (.+?)(?:\.|$)',
-            r'remember to (.+?)(?:\.|$)'
-        ]
-        
         suggested_tasks = []
-        for pattern in task_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
+        for pattern in TASK_PATTERNS:
+            matches = pattern.findall(text)
             suggested_tasks.extend(matches[:3])  # Limit suggestions
         
         return suggested_tasks
     
     def _extract_time_indicators(self, text):
         """Extract time-related information from context"""
-        time_patterns = [
-            r'(\d{1,2}:\d{2})',  # Time format
-            r'(today|tomorrow|next week|this week)',
-            r'(monday|tuesday|wednesday|thursday|friday|saturday|sunday)',
-            r'(\d{1,2}\/\d{1,2}\/\d{2,4})'  # Date format
-        ]
-        
         time_indicators = []
-        for pattern in time_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
+        for pattern in TIME_PATTERNS:
+            matches = pattern.findall(text)
             time_indicators.extend(matches)
         
         return time_indicators
     
     def _calculate_priority_score(self, task, context_data):
         """Calculate priority score based on multiple factors"""
-        score = 0.5  # Base score
+        score = scoring.BASE_SCORE  # Base score
         
         # Factor 1: Deadline proximity
         if task.deadline:
             days_until_deadline = (task.deadline - timezone.now()).days
-            if days_until_deadline <= 1:
-                score += 0.3
-            elif days_until_deadline <= 3:
-                score += 0.2
-            elif days_until_deadline <= 7:
-                score += 0.1
+            for max_days, bonus in scoring.DEADLINE_BONUSES:
+                if days_until_deadline <= max_days:
+                    score += bonus
+                    break
         
         # Factor 2: Keywords in task vs context
         if context_data:
@@ -234,33 +503,27 @@ class AITaskManager:
             context_keywords = context_data.get('keywords', [])
             
             keyword_matches = sum(1 for keyword in context_keywords if keyword in task_text)
-            score += min(0.2, keyword_matches * 0.05)
+            score += min(scoring.KEYWORD_CAP, keyword_matches * scoring.KEYWORD_WEIGHT)
         
         # Factor 3: Manual priority setting
-        priority_weights = {'low': -0.1, 'medium': 0, 'high': 0.2, 'urgent': 0.4}
-        score += priority_weights.get(task.priority, 0)
+        score += scoring.PRIORITY_WEIGHTS.get(task.priority, 0)
         
         # Factor 4: Task age (older tasks get slight priority boost)
         days_old = (timezone.now() - task.created_at).days
-        score += min(0.1, days_old * 0.01)
+        score += min(scoring.AGE_CAP, days_old * scoring.AGE_WEIGHT)
         
         return score
     
-    def _assess_task_complexity(self, title, description):
+    def _assess_task_complexity(self, title, description, hits=None):
         """Assess task complexity based on content analysis"""
-        text = f"{title} {description}".lower()
-        
-        complexity_indicators = {
-            'simple': ['call', 'email', 'buy', 'send', 'check', 'remind'],
-            'moderate': ['plan', 'organize', 'prepare', 'create', 'design', 'write'],
-            'complex': ['analyze', 'develop', 'implement', 'research', 'strategic', 'comprehensive'],
-            'very_complex': ['architecture', 'framework', 'system', 'integration', 'optimization']
-        }
+        text = f"{title} {description}"
+        if hits is None:
+            hits = self.scan_keywords(text)
         
         scores = {'simple': 0.2, 'moderate': 0.4, 'complex': 0.7, 'very_complex': 0.9}
         
-        for level, indicators in complexity_indicators.items():
-            if any(indicator in text for indicator in indicators):
+        for level, indicators in hits['complexity'].items():
+            if indicators:
                 return scores[level]
         
         # Default complexity based on text length
@@ -287,8 +550,13 @@ class AITaskManager:
         
         return min(1.0, urgency_score)
     
-    def _enhance_with_openai(self, title, description, context_data):
-        """Enhance task description using OpenAI"""
+    def _enhance_with_openai(self, title, description, context_data, timeout=None):
+        """Enhance task description using OpenAI (raises on failure)"""
+        messages, params = self._openai_enhancement_request(title, description, context_data)
+        return self._complete_with_openai(messages, params, timeout)
+    
+    def _openai_enhancement_request(self, title, description, context_data):
+        """Build the OpenAI messages and parameters for an enhancement"""
         context_info = ""
         if context_data:
             context_info = f"Context: {context_data.get('keywords', [])}"
@@ -308,23 +576,37 @@ class AITaskManager:
         Keep it concise but comprehensive.
         """
         
-        try:
-            response = self.openai_client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a productivity assistant that helps enhance task descriptions."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=200,
-                temperature=0.7
+        messages = [
+            {"role": "system", "content": "You are a productivity assistant that helps enhance task descriptions."},
+            {"role": "user", "content": prompt}
+        ]
+        params = {"max_tokens": 200, "temperature": 0.7}
+        return messages, params
+    
+    def _complete_with_openai(self, messages, params, timeout=None):
+        """Run a chat completion on OpenAI through the LLM cache (raises on failure)"""
+        cached = self.llm_cache.get('openai', self.openai_model, messages, params)
+        if cached is not None:
+            return cached
+        
+        with self.limiters['openai'].slot(timeout) as remaining:
+            client = self.openai_client.with_options(timeout=remaining) if remaining else self.openai_client
+            response = client.chat.completions.create(
+                model=self.openai_model,
+                messages=messages,
+                **params
             )
-            return response.choices[0].message.content
-        except Exception as e:
-            print(f"OpenAI API error: {e}")
-            return description
+        content = response.choices[0].message.content
+        self.llm_cache.set('openai', self.openai_model, messages, params, content)
+        return content
     
-    def _enhance_with_anthropic(self, title, description, context_data):
-        """Enhance task description using Anthropic Claude"""
+    def _enhance_with_anthropic(self, title, description, context_data, timeout=None):
+        """Enhance task description using Anthropic Claude (raises on failure)"""
+        messages, params = self._anthropic_enhancement_request(title, description, context_data)
+        return self._complete_with_anthropic(messages, params, timeout)
+    
+    def _anthropic_enhancement_request(self, title, description, context_data):
+        """Build the Anthropic messages and parameters for an enhancement"""
         context_info = ""
         if context_data:
             context_info = f"Context: {context_data.get('keywords', [])}"
@@ -339,24 +621,36 @@ class AITaskManager:
         Provide a more detailed, actionable description.
         """
         
-        try:
-            response = self.anthropic_client.messages.create(
-                model="claude-3-sonnet-20240229",
-                max_tokens=200,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ]
+        messages = [
+            {"role": "user", "content": prompt}
+        ]
+        params = {"max_tokens": 200}
+        return messages, params
+    
+    def _complete_with_anthropic(self, messages, params, timeout=None):
+        """Run a message completion on Anthropic through the LLM cache (raises on failure)"""
+        cached = self.llm_cache.get('anthropic', self.anthropic_model, messages, params)
+        if cached is not None:
+            return cached
+        
+        with self.limiters['anthropic'].slot(timeout) as remaining:
+            client = self.anthropic_client.with_options(timeout=remaining) if remaining else self.anthropic_client
+            response = client.messages.create(
+                model=self.anthropic_model,
+                messages=messages,
+                **params
             )
-            return response.content[0].text
-        except Exception as e:
-            print(f"Anthropic API error: {e}")
-            return description
-    
-    def _enhance_with_lm_studio(self, title, description, context_data):
-        """Enhance task description using LM Studio local model"""
-        if not self.lm_studio_url:
-            return description
-            
+        content = response.content[0].text
+        self.llm_cache.set('anthropic', self.anthropic_model, messages, params, content)
+        return content
+    
+    def _enhance_with_lm_studio(self, title, description, context_data, timeout=None):
+        """Enhance task description using LM Studio local model (raises on failure)"""
+        messages, params = self._lm_studio_enhancement_request(title, description, context_data)
+        return self._complete_with_lm_studio(messages, params, timeout)
+    
+    def _lm_studio_enhancement_request(self, title, description, context_data):
+        """Build the LM Studio messages and parameters for an enhancement"""
         context_info = ""
         if context_data:
             context_info = f"Context: {context_data.get('keywords', [])}"
@@ -371,27 +665,33 @@ class AITaskManager:
         Provide a better description:
         """
         
-        try:
-            response = requests.post(
+        messages = [
+            {"role": "user", "content": prompt}
+        ]
+        params = {"max_tokens": 200, "temperature": 0.7}
+        return messages, params
+    
+    def _complete_with_lm_studio(self, messages, params, timeout=None):
+        """Run a chat completion on LM Studio through the LLM cache (raises on failure)"""
+        cached = self.llm_cache.get('lm_studio', self.lm_studio_model, messages, params)
+        if cached is not None:
+            return cached
+        
+        with self.limiters['lm_studio'].slot(timeout) as remaining:
+            response = self.lm_studio_session.post(
                 f"{self.lm_studio_url}/v1/chat/completions",
                 json={
-                    "model": "local-model",
-                    "messages": [
-                        {"role": "user", "content": prompt}
-                    ],
-                    "max_tokens": 200,
-                    "temperature": 0.7
+                    "model": self.lm_studio_model,
+                    "messages": messages,
+                    **params
                 },
-                timeout=30
+                timeout=min(30, remaining) if remaining else 30
             )
-            
-            if response.status_code == 200:
-                return response.json()['choices'][0]['message']['content']
-            else:
-                return description
-        except Exception as e:
-            print(f"LM Studio error: {e}")
-            return description
+        response.raise_for_status()
+        
+        content = response.json()['choices'][0]['message']['content']
+        self.llm_cache.set('lm_studio', self.lm_studio_model, messages, params, content)
+        return content
 
 # Initialize AI service
 ai_service = AITaskManager()
@@ -0,0 +1,172 @@
+"""
+Token streaming for task description enhancement.
+
+stream_enhancement() is an async generator of text deltas. It uses the same
+prompts, LLM cache, concurrency caps and provider ranking as
+AITaskManager.enhance_task_description, but reads each provider's streaming
+API (OpenAI/Anthropic SDK streams, LM Studio server-sent events). A provider
+that fails before its first token fails over to the next one; once text has
+been sent the stream is committed to that provider.
+
+All streams on an event loop share one pooled httpx.AsyncClient (async
+clients cannot cross loops). One router deadline covers the whole request:
+each provider tried is given only what is left of it, after its queue wait,
+as its timeout.
+"""
+
+import asyncio
+import json
+import time
+import weakref
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from .http_pool import ProviderBusy, build_async_httpx_client
+from .optional import optional_import
+from .routing import ProviderUnavailable
+
+# The shared async HTTP client of each event loop, dropped with its loop
+_async_clients = weakref.WeakKeyDictionary()
+
+
+async def stream_enhancement(title, description, context_data=None, manager=None):
+    """Yield the enhanced description of a task chunk by chunk.
+
+    Raises ProviderUnavailable when no provider answers before the deadline,
+    matching enhance_task_description.
+    """
+    if manager is None:
+        from .services import ai_service as manager
+
+    streamers = {
+        'openai': _stream_openai,
+        'anthropic': _stream_anthropic,
+        'lm_studio': _stream_lm_studio,
+    }
+    router = manager.provider_router
+    deadline = time.monotonic() + router.deadline
+    errors = []
+
+    for provider in router.ranked_providers(manager.available_providers()):
+        request_builder = getattr(manager, f'_{provider}_enhancement_request')
+        messages, params = request_builder(title, description, context_data)
+        model = _model_for(manager, provider)
+
+        cached = await sync_to_async(manager.llm_cache.get)(provider, model, messages, params)
+        if cached is not None:
+            yield cached
+            return
+        if not router.allow(provider):
+            continue
+
+        started = time.monotonic()
+        if started >= deadline:
+            errors.append(f"{provider}: deadline exceeded")
+            break
+        chunks = []
+        try:
+            async with manager.limiters[provider].aslot(deadline - started) as remaining:
+                async for chunk in streamers[provider](manager, messages, params, remaining):
+                    chunks.append(chunk)
+                    yield chunk
+        except ProviderBusy as e:
+            # A local queue timeout, not a provider failure
+            errors.append(f"{provider}: {e}")
+            continue
+        except Exception as e:
+            router.record(provider, time.monotonic() - started, False)
+            if chunks:
+                raise
+            errors.append(f"{provider}: {e}")
+            continue
+
+        router.record(provider, time.monotonic() - started, True)
+        await sync_to_async(manager.llm_cache.set)(provider, model, messages, params, ''.join(chunks))
+        return
+
+    raise ProviderUnavailable('; '.join(errors) or 'No AI provider available')
+
+
+def format_event(event, data):
+    """Encode one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _model_for(manager, provider):
+    return {
+        'openai': manager.openai_model,
+        'anthropic': manager.anthropic_model,
+        'lm_studio': manager.lm_studio_model,
+    }[provider]
+
+
+def _pool_size():
+    return getattr(settings, 'AI_HTTP', {}).get('POOL_SIZE', 10)
+
+
+def async_http_client():
+    """The pooled httpx.AsyncClient shared by every stream on the running event loop"""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = _async_clients[loop] = build_async_httpx_client(_pool_size())
+    return client
+
+
+async def _stream_openai(manager, messages, params, timeout):
+    client = optional_import('openai').AsyncOpenAI(
+        api_key=manager.openai_api_key,
+        base_url=getattr(settings, 'OPENAI_BASE_URL', None),
+        http_client=async_http_client(),
+        timeout=timeout
+    )
+    stream = await client.chat.completions.create(
+        model=manager.openai_model,
+        messages=messages,
+        stream=True,
+        **params
+    )
+    async for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+
+async def _stream_anthropic(manager, messages, params, timeout):
+    client = optional_import('anthropic').AsyncAnthropic(
+        api_key=manager.anthropic_api_key,
+        base_url=getattr(settings, 'ANTHROPIC_BASE_URL', None),
+        http_client=async_http_client(),
+        timeout=timeout
+    )
+    async with client.messages.stream(
+        model=manager.anthropic_model,
+        messages=messages,
+        **params
+    ) as stream:
+        async for text in stream.text_stream:
+            if text:
+                yield text
+
+
+async def _stream_lm_studio(manager, messages, params, timeout):
+    async with async_http_client().stream(
+        'POST',
+        f"{manager.lm_studio_url}/v1/chat/completions",
+        json={
+            "model": manager.lm_studio_model,
+            "messages": messages,
+            "stream": True,
+            **params
+        },
+        timeout=timeout
+    ) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if not line.startswith('data:'):
+                continue
+            data = line[len('data:'):].strip()
+            if data == '[DONE]':
+                break
+            choices = json.loads(data).get('choices') or [{}]
+            content = choices[0].get('delta', {}).get('content')
+            if content:
+                yield content
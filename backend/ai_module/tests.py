@@ -1,3 +1,722 @@
-from django.test import TestCase
+import os
+import random
+import shutil
+import tempfile
+import time
+from datetime import timedelta
+from io import StringIO
+from types import SimpleNamespace
+from unittest import mock
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from context.models import ContextEntry
+from tasks.models import Category, Task
+from . import artifacts, classifier, dedupe, jobs, scoring, services, streaming, vector_index
+from .cache import InsightCache
+from .http_pool import ConcurrencyLimiter, ProviderBusy
+from .keywords import KeywordMatcher
+from .llm_cache import LLMResponseCache
+from .models import LLMResponse
+from .routing import CircuitBreaker, ProviderRouter, ProviderUnavailable
+from .services import ai_service
+from .window_analysis import analyze_window
 
-# Create your tests here.
+
+class VectorIndexCompactionTests(SimpleTestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.path, ignore_errors=True)
+        self.index = vector_index.VectorIndex(path=self.path, dim=32, nlist=2, max_delta_rows=100)
+    
+    def add_documents(self, first, count):
+        ids = range(first, first + count)
+        keys = [vector_index.make_key('task', task_id) for task_id in ids]
+        self.index.add(keys, vector_index.embed([f'document {task_id} word{task_id}' for task_id in ids], 32))
+    
+    def wait_for_compaction(self):
+        if self.index._compaction_thread is not None:
+            self.index._compaction_thread.join(10)
+    
+    def test_delta_is_compacted_once_it_passes_the_threshold(self):
+        self.add_documents(0, 100)
+        self.assertEqual(self.index.stats()['version'], 0)
+        self.add_documents(100, 60)
+        self.wait_for_compaction()
+        stats = self.index.stats()
+        self.assertEqual((stats['version'], stats['main_rows'], stats['delta_rows']), (1, 160, 0))
+    
+    def test_compaction_at_full_partition_count_reuses_centroids(self):
+        self.add_documents(0, 150)
+        self.wait_for_compaction()
+        centroids = self.index._current()['main']['centroids'].copy()
+        self.add_documents(150, 101)
+        self.wait_for_compaction()
+        state = self.index._current()
+        self.assertEqual(state['version'], 2)
+        self.assertTrue((state['main']['centroids'] == centroids).all())
+        self.assertEqual(self.index.search(vector_index.embed(['document 200 word200'], 32)[0], k=1)[0][:2], ('task', 200))
+
+
+class EnhancementOutageTests(TestCase):
+    def test_provider_outage_marks_the_job_failed(self):
+        task = Task.objects.create(title='Plan offsite', description='Pick a venue', enhancement_status='processing')
+        with mock.patch.object(ai_service, 'available_providers', return_value=[]):
+            jobs.run_enhancement(task)
+        task.refresh_from_db()
+        self.assertEqual(task.enhancement_status, 'failed')
+        self.assertEqual(task.ai_enhanced_description, '')
+    
+    def test_request_path_falls_back_to_the_original_description(self):
+        task = Task.objects.create(title='Plan offsite', description='Pick a venue')
+        with mock.patch.object(ai_service, 'available_providers', return_value=[]):
+            response = self.client.post(f'/api/v1/tasks/tasks/{task.id}/enhance_description/')
+        self.assertEqual(response.data['ai_enhanced_description'], 'Pick a venue')
+        self.assertEqual(response.data['enhancement_status'], 'failed')
+    
+    def test_stream_outage_marks_the_task_failed(self):
+        task = Task.objects.create(title='Plan offsite', description='Pick a venue')
+        url = f'/api/v1/tasks/tasks/{task.id}/enhance_description/stream/'
+        self.assertEqual(self.client.get(url).status_code, 405)
+        with mock.patch.object(ai_service, 'available_providers', return_value=[]):
+            response = self.client.post(url)
+            body = async_to_sync(self._read)(response.streaming_content)
+        self.assertIn('event: error', body)
+        self.assertNotIn('event: done', body)
+        task.refresh_from_db()
+        self.assertEqual(task.enhancement_status, 'failed')
+        self.assertEqual(task.ai_enhanced_description, 'Pick a venue')
+    
+    async def _read(self, content):
+        return ''.join([chunk.decode() async for chunk in content])
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=self.clock)
+    
+    def test_opens_after_consecutive_failures(self):
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, 'closed')
+        self.breaker.record_success()
+        self.breaker.record_failure()
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, 'open')
+        self.assertFalse(self.breaker.allow())
+    
+    def test_half_open_lets_one_probe_through(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.clock.now = 10
+        self.assertEqual(self.breaker.state, 'half_open')
+        self.assertTrue(self.breaker.allow())
+        self.assertFalse(self.breaker.allow())
+    
+    def test_probe_success_closes_and_probe_failure_reopens(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.clock.now = 10
+        self.breaker.allow()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, 'open')
+        
+        self.clock.now = 20
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, 'closed')
+        self.assertTrue(self.breaker.allow())
+
+
+class ProviderRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = ProviderRouter(order=['openai', 'anthropic', 'lm_studio'], deadline=5, failure_threshold=1)
+    
+    def test_fails_over_in_ranked_order(self):
+        tried = []
+        
+        def request(provider, timeout):
+            tried.append(provider)
+            if provider != 'lm_studio':
+                raise ConnectionError('down')
+            return f'answer from {provider}'
+        
+        self.assertEqual(self.router.call(request), 'answer from lm_studio')
+        self.assertEqual(tried, ['openai', 'anthropic', 'lm_studio'])
+        # Both failed providers tripped their breakers and are skipped next time
+        self.assertEqual(self.router.ranked_providers(), ['lm_studio'])
+    
+    def test_raises_when_every_provider_fails(self):
+        def request(provider, timeout):
+            raise ConnectionError('down')
+        
+        with self.assertRaises(ProviderUnavailable):
+            self.router.call(request, available=['openai', 'anthropic'])
+    
+    def test_ranks_by_error_rate_then_latency(self):
+        self.router.stats['openai'].record(0.1, False)
+        self.router.stats['anthropic'].record(2.0, True)
+        self.router.stats['lm_studio'].record(0.5, True)
+        self.assertEqual(self.router.ranked_providers(), ['lm_studio', 'anthropic', 'openai'])
+    
+    def test_untried_provider_does_not_outrank_a_proven_fast_one(self):
+        self.router.stats['anthropic'].record(0.2, True)
+        self.router.stats['lm_studio'].record(3.0, True)
+        self.router.stats['lm_studio'].record(0.4, True)
+        # openai has no calls: it ranks at the median (0.2 and 1.7 -> 0.95), behind anthropic
+        self.assertEqual(self.router.ranked_providers(), ['anthropic', 'openai', 'lm_studio'])
+    
+    def test_local_queue_timeout_is_not_a_provider_failure(self):
+        def request(provider, timeout):
+            if provider == 'openai':
+                raise ProviderBusy('no free slot')
+            return f'answer from {provider}'
+        
+        self.assertEqual(self.router.call(request), 'answer from anthropic')
+        self.assertEqual(self.router.breakers['openai'].state, 'closed')
+        self.assertEqual(len(self.router.stats['openai'].calls), 0)
+
+
+class ConcurrencyLimiterTests(SimpleTestCase):
+    def test_queue_wait_comes_out_of_the_timeout(self):
+        limiter = ConcurrencyLimiter(1, queue_timeout=5)
+        with mock.patch('ai_module.http_pool.time.monotonic', side_effect=[100.0, 102.5]):
+            with limiter.slot(10) as remaining:
+                self.assertEqual(remaining, 7.5)
+        with limiter.slot() as remaining:
+            self.assertIsNone(remaining)
+    
+    def test_full_queue_raises_provider_busy(self):
+        limiter = ConcurrencyLimiter(1, queue_timeout=0.01)
+        with limiter.slot():
+            with self.assertRaises(ProviderBusy):
+                with limiter.slot():
+                    pass
+
+
+@override_settings(AI_ENHANCEMENT_BACKEND='sync')
+class SyncBulkEnhancementTests(TestCase):
+    def test_only_the_queued_tasks_are_processed(self):
+        other = Task.objects.create(title='Queued elsewhere', enhancement_status='pending')
+        mine = [Task.objects.create(title=f'Mine {i}') for i in range(3)]
+        
+        with mock.patch.object(ai_service, 'enhance_task_descriptions_batch',
+                               side_effect=lambda tasks, context: {task.id: 'Enhanced' for task in tasks}) as enhance:
+            queued = jobs.enqueue_enhancements(Task.objects.filter(id__in=[task.id for task in mine]))
+        
+        self.assertEqual(queued, 3)
+        self.assertEqual(sorted(task.id for call in enhance.call_args_list for task in call.args[0]), [task.id for task in mine])
+        other.refresh_from_db()
+        self.assertEqual(other.enhancement_status, 'pending')
+        self.assertEqual(set(Task.objects.filter(id__in=[task.id for task in mine]).values_list('enhancement_status', flat=True)), {'completed'})
+
+
+@override_settings(AI_ENHANCEMENT_BACKEND='worker')
+class EnhancementQueueTests(TestCase):
+    def enhance(self, tasks, context_data):
+        return {task.id: f'Enhanced: {task.title}' for task in tasks if 'fail' not in task.title}
+    
+    def test_create_returns_before_enhancement_and_a_worker_finishes_it(self):
+        with mock.patch.object(ai_service, 'enhance_task_description') as enhance_now:
+            response = self.client.post(
+                '/api/v1/tasks/tasks/',
+                {'title': 'Plan offsite', 'description': 'Pick a venue', 'enhance_with_ai': True},
+                content_type='application/json'
+            )
+        self.assertEqual(response.status_code, 201)
+        enhance_now.assert_not_called()
+        task = Task.objects.get(title='Plan offsite')
+        self.assertEqual(task.enhancement_status, 'pending')
+        
+        with mock.patch.object(ai_service, 'enhance_task_descriptions_batch', side_effect=self.enhance):
+            self.assertEqual(jobs.process_pending_enhancements(), 1)
+        task.refresh_from_db()
+        self.assertEqual((task.enhancement_status, task.ai_enhanced_description), ('completed', 'Enhanced: Plan offsite'))
+    
+    def test_claimed_tasks_are_not_handed_out_twice(self):
+        for title in ['First', 'Second', 'Third']:
+            jobs.enqueue_enhancement(Task.objects.create(title=title))
+        
+        first = jobs.claim_enhancements(2)
+        second = jobs.claim_enhancements(2)
+        self.assertEqual([task.title for task in first], ['First', 'Second'])
+        self.assertEqual([task.title for task in second], ['Third'])
+        self.assertIsNone(jobs.claim_next_enhancement())
+    
+    def test_failures_are_recorded_per_task_and_stale_claims_requeued(self):
+        ok = Task.objects.create(title='Write agenda')
+        bad = Task.objects.create(title='This will fail')
+        for task in [ok, bad]:
+            jobs.enqueue_enhancement(task)
+        with mock.patch.object(ai_service, 'enhance_task_descriptions_batch', side_effect=self.enhance):
+            jobs.process_pending_enhancements()
+        self.assertEqual(Task.objects.get(id=ok.id).enhancement_status, 'completed')
+        self.assertEqual(Task.objects.get(id=bad.id).enhancement_status, 'failed')
+        
+        # A worker died holding a claim
+        stuck = Task.objects.create(title='Stuck')
+        jobs.enqueue_enhancement(stuck)
+        jobs.claim_next_enhancement()
+        Task.objects.filter(id=stuck.id).update(updated_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(jobs.requeue_stale_enhancements(timedelta(minutes=10)), 1)
+        self.assertEqual(Task.objects.get(id=stuck.id).enhancement_status, 'pending')
+
+
+@override_settings(AI_CONTEXT_ANALYSIS={'MAX_ENTRIES': 100})
+class ContextWindowSamplingTests(TestCase):
+    def setUp(self):
+        # Interleaved imports: every email entry gets an id of the same parity
+        ContextEntry.objects.bulk_create([
+            ContextEntry(content=f'Meeting note {i}', source_type='email' if i % 2 else 'whatsapp')
+            for i in range(400)
+        ])
+    
+    def test_sampling_keeps_a_share_of_ids_with_one_residue(self):
+        _, summary = analyze_window(ContextEntry.objects.filter(source_type='email'))
+        self.assertEqual((summary['total_entries'], summary['sample_rate']), (200, 0.5))
+        self.assertGreater(summary['entries_analyzed'], 70)
+        self.assertLess(summary['entries_analyzed'], 130)
+    
+    def test_sample_flag_sent_as_text(self):
+        response = self.client.post(
+            '/api/v1/ai/context-analysis/', {'source_types': ['email'], 'sample': 'false'}, content_type='application/json'
+        )
+        self.assertEqual(response.data['period_summary']['entries_analyzed'], 200)
+
+
+class CategoryModelTrainingTests(TestCase):
+    def train(self, *args):
+        call_command('train_category_model', *args, stdout=StringIO())
+        classifier.reset_model()
+        return classifier.CategoryModel.load(classifier.get_config()['PATH'])
+
+    def test_incremental_training_learns_tasks_categorized_after_creation(self):
+        work = Category.objects.create(name='work')
+        Task.objects.create(title='Quarterly budget review', category=work)
+        task = Task.objects.create(title='Prepare sprint demo slides')
+        self.assertEqual(self.train().document_counts.tolist(), [1.0])
+
+        task.category = work
+        task.save()
+        self.assertIsNotNone(task.categorized_at)
+        self.assertEqual(self.train('--incremental').document_counts.tolist(), [2.0])
+
+        # Nothing new since the last run
+        self.assertEqual(self.train('--incremental').document_counts.tolist(), [2.0])
+
+    def test_no_suggestion_when_no_feature_was_seen(self):
+        work = Category.objects.create(name='work')
+        personal = Category.objects.create(name='personal')
+        Task.objects.create(title='Quarterly budget review', category=work)
+        Task.objects.create(title='Quarterly budget meeting', category=work)
+        Task.objects.create(title='Buy groceries', category=personal)
+        model = self.train()
+
+        self.assertEqual(model.predict('budget')[0], 'work')
+        self.assertEqual(model.predict('zebra xylophone'), [])
+        self.assertEqual(ai_service.suggest_categories('zebra xylophone', ''), [])
+
+
+class CategoryModelReloadTests(SimpleTestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.path, ignore_errors=True)
+        overrides = override_settings(AI_CATEGORY_MODEL={
+            'PATH': f'{self.path}/category_model.npz', 'FEATURES': 64, 'CHECK_INTERVAL': 0
+        })
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        patcher = mock.patch.object(artifacts, 'category_model', return_value=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        classifier.reset_model()
+        self.addCleanup(classifier.reset_model)
+    
+    def save_model(self, categories, mtime):
+        model = classifier.CategoryModel.empty(64)
+        model.sync_categories(categories)
+        model.save(classifier.get_config()['PATH'])
+        os.utime(classifier.get_config()['PATH'], (mtime, mtime))
+    
+    def test_model_trained_after_startup_is_picked_up(self):
+        self.assertIsNone(classifier.get_model())
+        self.save_model([(1, 'work')], 1000)
+        self.assertEqual(classifier.get_model().category_names, ['work'])
+    
+    def test_retrained_model_replaces_the_loaded_one(self):
+        self.save_model([(1, 'work')], 1000)
+        model = classifier.get_model()
+        self.assertIs(classifier.get_model(), model)
+        
+        self.save_model([(1, 'work'), (2, 'personal')], 2000)
+        self.assertEqual(classifier.get_model().category_names, ['work', 'personal'])
+    
+    def test_file_is_checked_at_most_every_interval(self):
+        config = dict(classifier.get_config(), CHECK_INTERVAL=60)
+        with override_settings(AI_CATEGORY_MODEL=config):
+            self.assertIsNone(classifier.get_model())
+            self.save_model([(1, 'work')], 1000)
+            self.assertIsNone(classifier.get_model())
+
+
+class PriorityScoreExpressionTests(TestCase):
+    WORDS = ['report', 'budget', 'meeting', 'urgent', 'client', 'deploy', 'review', 'slides', 'invoice', 'email']
+    
+    def test_sql_expression_matches_per_task_scorer(self):
+        rng = random.Random(7)
+        now = timezone.now()
+        for i in range(80):
+            deadline = None
+            if rng.random() < 0.8:
+                deadline = now + timedelta(seconds=rng.randint(-3 * 86400, 10 * 86400))
+            task = Task.objects.create(
+                title=' '.join(rng.sample(self.WORDS, 2)),
+                description=' '.join(rng.sample(self.WORDS, rng.randint(0, 4))),
+                priority=rng.choice(['low', 'medium', 'high', 'urgent']),
+                deadline=deadline,
+            )
+            # Ages straddle whole-day boundaries and the age cap
+            Task.objects.filter(id=task.id).update(created_at=now - timedelta(seconds=rng.randint(0, 15 * 86400)))
+        context_keywords = rng.sample(self.WORDS, 5)
+        
+        scoring.recompute_priority_scores(Task.objects.all(), context_keywords=context_keywords, now=now)
+        
+        with mock.patch.object(services.timezone, 'now', return_value=now):
+            for task in Task.objects.all():
+                expected = ai_service._calculate_priority_score(task, {'keywords': context_keywords})
+                self.assertAlmostEqual(task.priority_score, min(1.0, max(0.0, expected)), places=12, msg=task.id)
+
+
+class DuplicateDetectionTests(TestCase):
+    TEXT = 'Prepare the quarterly budget report for the finance team'
+    
+    @override_settings(AI_DEDUPE={'MAX_CANDIDATES': 1})
+    def test_capped_candidates_prefer_tasks_sharing_most_bands(self):
+        for suffix in ['by Monday', 'and send it round', 'with charts']:
+            Task.objects.create(title='Budget report', description=f'{self.TEXT} {suffix}')
+        exact = Task.objects.create(title='Budget report', description=self.TEXT)
+        
+        matches = dedupe.find_duplicates('Budget report', self.TEXT)
+        self.assertEqual(matches, [(exact.id, 1.0)])
+    
+    @override_settings(AI_DEDUPE={'MAX_CANDIDATES': 1})
+    def test_groups_survive_the_per_bucket_comparison_cap(self):
+        copies = [Task.objects.create(title='Budget report', description=self.TEXT) for _ in range(4)]
+        Task.objects.create(title='Buy groceries', description='Milk, eggs and bread')
+        
+        self.assertEqual(dedupe.duplicate_groups(), [[task.id for task in copies]])
+
+
+class StreamingEnhancementTests(SimpleTestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.manager = mock.Mock()
+        self.manager.provider_router = ProviderRouter(order=['openai', 'anthropic'], deadline=5)
+        self.manager.available_providers.return_value = ['openai', 'anthropic']
+        self.manager.limiters = {'openai': ConcurrencyLimiter(2), 'anthropic': ConcurrencyLimiter(2)}
+        self.manager.llm_cache.get.return_value = None
+        self.manager._openai_enhancement_request.return_value = ([], {})
+        self.manager._anthropic_enhancement_request.return_value = ([], {})
+    
+    def collect(self):
+        async def run():
+            return [chunk async for chunk in streaming.stream_enhancement('Plan offsite', 'Pick a venue', manager=self.manager)]
+        clock = mock.Mock(monotonic=self.clock)
+        with mock.patch.object(streaming, 'time', clock), mock.patch('ai_module.http_pool.time', clock):
+            return async_to_sync(run)()
+    
+    def test_failover_gets_what_is_left_of_one_deadline(self):
+        timeouts = {}
+        
+        async def slow_failure(manager, messages, params, timeout):
+            timeouts['openai'] = timeout
+            self.clock.now += 3
+            raise ConnectionError('reset')
+            yield
+        
+        async def answer(manager, messages, params, timeout):
+            timeouts['anthropic'] = timeout
+            yield 'Book the venue'
+        
+        with mock.patch.object(streaming, '_stream_openai', slow_failure), \
+                mock.patch.object(streaming, '_stream_anthropic', answer):
+            self.assertEqual(self.collect(), ['Book the venue'])
+        self.assertEqual(timeouts, {'openai': 5, 'anthropic': 2})
+    
+    def test_raises_once_the_deadline_passed(self):
+        async def hang_then_fail(manager, messages, params, timeout):
+            self.clock.now += 6
+            raise TimeoutError('read timed out')
+            yield
+        
+        with mock.patch.object(streaming, '_stream_openai', hang_then_fail), \
+                mock.patch.object(streaming, '_stream_anthropic', mock.Mock()) as anthropic:
+            with self.assertRaisesMessage(ProviderUnavailable, 'anthropic: deadline exceeded'):
+                self.collect()
+        anthropic.assert_not_called()
+    
+    def test_streams_on_one_loop_share_an_http_client(self):
+        async def clients():
+            return streaming.async_http_client(), streaming.async_http_client()
+        first, second = async_to_sync(clients)()
+        self.assertIs(first, second)
+
+
+class ColumnarScoringTests(SimpleTestCase):
+    WORDS = ['report', 'budget', 'meeting', 'urgent', 'client', 'deploy', 'review', 'slides', 'invoice', 'email']
+    
+    def test_matches_per_task_scorer_on_random_tasks(self):
+        rng = random.Random(11)
+        now = timezone.now()
+        tasks = []
+        for task_id in range(1, 501):
+            deadline = None
+            if rng.random() < 0.8:
+                # Whole-day offsets hit the bucket edges exactly; the rest land between them
+                seconds = rng.choice([rng.randint(-5, 10) * 86400, rng.randint(-5 * 86400, 10 * 86400)])
+                deadline = now + timedelta(seconds=seconds, microseconds=rng.choice([0, 1, -1]))
+            tasks.append(SimpleNamespace(
+                id=task_id,
+                title=' '.join(rng.sample(self.WORDS, 2)).title(),
+                description=' '.join(rng.sample(self.WORDS, rng.randint(0, 5))),
+                priority=rng.choice(['low', 'medium', 'high', 'urgent', 'unknown']),
+                deadline=deadline,
+                created_at=now - timedelta(seconds=rng.randint(0, 15 * 86400)),
+            ))
+        
+        for context_keywords in [[], rng.sample(self.WORDS, 3), self.WORDS]:
+            scores = scoring.score_task_rows(scoring.task_rows(tasks), context_keywords, now=now)
+            with mock.patch.object(services.timezone, 'now', return_value=now):
+                for task in tasks:
+                    expected = ai_service._calculate_priority_score(task, {'keywords': context_keywords})
+                    self.assertEqual(scores[task.id], min(1.0, max(0.0, expected)), msg=task)
+
+
+class KeywordMatcherTests(SimpleTestCase):
+    def setUp(self):
+        self.matcher = KeywordMatcher({
+            'urgency': {'urgent': ['urgent', 'due today', 'deadline']},
+            'category': {'work': ['deadline', 'report'], 'finance': ['tax']},
+        })
+    
+    def test_terms_match_only_on_word_boundaries(self):
+        hits = self.matcher.scan('Taxonomy reports are non-urgent? Submit the report.')
+        self.assertEqual(hits['category'], {'work': ['report'], 'finance': []})
+        # Hyphens and punctuation are boundaries; letters inside a longer word are not
+        self.assertEqual(hits['urgency'], {'urgent': ['urgent']})
+        self.assertEqual(self.matcher.scan('reporting overdue today')['category']['work'], [])
+    
+    def test_phrases_shared_terms_and_case(self):
+        hits = self.matcher.scan('DEADLINE moved: Due Today!')
+        self.assertEqual(hits['urgency']['urgent'], ['due today', 'deadline'])
+        self.assertEqual(hits['category']['work'], ['deadline'])
+    
+    def test_groups_and_labels_without_hits_are_empty(self):
+        self.assertEqual(self.matcher.scan(''), {
+            'urgency': {'urgent': []},
+            'category': {'work': [], 'finance': []},
+        })
+
+
+class InsightCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.computed = []
+    
+    def compute(self, text):
+        self.computed.append(text)
+        return {'keywords': [text]}
+    
+    def test_hits_return_copies_and_are_counted(self):
+        cache = InsightCache(max_entries=4)
+        first = cache.get_or_compute('ship it', 'v1', self.compute)
+        first['keywords'].append('mutated')
+        self.assertEqual(cache.get_or_compute('ship it', 'v1', self.compute), {'keywords': ['ship it']})
+        # A new analyzer version is a different key
+        cache.get_or_compute('ship it', 'v2', self.compute)
+        self.assertEqual(self.computed, ['ship it', 'ship it'])
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+        self.assertEqual(cache.stats()['hit_rate'], 0.3333)
+    
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = InsightCache(max_entries=2)
+        for text in ['a', 'b', 'a', 'c', 'a', 'b']:
+            cache.get_or_compute(text, 'v1', self.compute)
+        # 'b' was least recently used when 'c' arrived
+        self.assertEqual(self.computed, ['a', 'b', 'c', 'b'])
+    
+    def test_entries_expire_after_ttl(self):
+        cache = InsightCache(ttl=60)
+        with mock.patch('ai_module.cache.time.monotonic', side_effect=[0.0, 30.0, 61.0, 61.0]):
+            for _ in range(3):
+                cache.get_or_compute('ship it', 'v1', self.compute)
+        self.assertEqual(len(self.computed), 2)
+    
+    def test_analyzer_sees_the_original_text(self):
+        text = 'We need to call the venue  '
+        with mock.patch.object(ai_service, 'insight_cache', InsightCache()):
+            insights = ai_service.analyze_context([SimpleNamespace(content=text)])
+        self.assertEqual(insights, ai_service._analyze_text(text))
+        self.assertEqual(insights['task_suggestions'], ['call the venue  '])
+    
+    def test_django_backend_shares_entries_through_the_cache(self):
+        with self.settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'insights'}}):
+            writer = InsightCache(backend='django')
+            reader = InsightCache(backend='django')
+            writer.get_or_compute('ship it', 'v1', self.compute)
+            self.assertEqual(reader.get_or_compute('ship it', 'v1', self.compute), {'keywords': ['ship it']})
+        self.assertEqual(len(self.computed), 1)
+
+
+class LLMResponseCacheTests(TestCase):
+    MESSAGES = [{'role': 'user', 'content': 'Enhance: Plan offsite'}]
+    PARAMS = {'max_tokens': 200, 'temperature': 0.7}
+    
+    def setUp(self):
+        self.cache = LLMResponseCache(max_entries=2)
+    
+    def test_entries_are_keyed_by_provider_model_prompt_and_params(self):
+        self.cache.set('openai', 'gpt-4o', self.MESSAGES, self.PARAMS, 'Book a venue')
+        
+        self.assertEqual(self.cache.get('openai', 'gpt-4o', self.MESSAGES, dict(reversed(self.PARAMS.items()))), 'Book a venue')
+        self.assertIsNone(self.cache.get('openai', 'gpt-4o-mini', self.MESSAGES, self.PARAMS))
+        self.assertIsNone(self.cache.get('anthropic', 'gpt-4o', self.MESSAGES, self.PARAMS))
+        self.assertIsNone(self.cache.get('openai', 'gpt-4o', self.MESSAGES, {**self.PARAMS, 'temperature': 0}))
+        self.assertIsNone(self.cache.get('openai', 'gpt-4o', [{'role': 'user', 'content': 'Other'}], self.PARAMS))
+        self.assertEqual(LLMResponse.objects.get().hit_count, 1)
+    
+    def test_least_recently_used_entries_are_evicted(self):
+        for name in ['a', 'b']:
+            self.cache.set('openai', 'gpt-4o', [{'role': 'user', 'content': name}], self.PARAMS, name)
+        LLMResponse.objects.filter(response='a').update(last_used_at=timezone.now() - timedelta(minutes=5))
+        LLMResponse.objects.filter(response='b').update(last_used_at=timezone.now() - timedelta(minutes=1))
+        # Reading 'a' makes 'b' the least recently used
+        self.cache.get('openai', 'gpt-4o', [{'role': 'user', 'content': 'a'}], self.PARAMS)
+        self.cache.set('openai', 'gpt-4o', [{'role': 'user', 'content': 'c'}], self.PARAMS, 'c')
+        self.assertEqual(sorted(LLMResponse.objects.values_list('response', flat=True)), ['a', 'c'])
+    
+    def test_invalidate_by_model(self):
+        self.cache.set('openai', 'gpt-4o', self.MESSAGES, self.PARAMS, 'old')
+        self.cache.set('anthropic', 'claude', self.MESSAGES, self.PARAMS, 'kept')
+        self.assertEqual(self.cache.invalidate(model='gpt-4o'), 1)
+        self.assertEqual(list(LLMResponse.objects.values_list('response', flat=True)), ['kept'])
+    
+    def test_repeated_completion_skips_the_provider(self):
+        client = mock.Mock()
+        client.chat.completions.create.return_value.choices = [mock.Mock(message=mock.Mock(content='Book a venue'))]
+        with mock.patch.dict(ai_service._clients, {'openai': client}), \
+                mock.patch.object(ai_service, 'llm_cache', LLMResponseCache()):
+            for _ in range(2):
+                self.assertEqual(ai_service._complete_with_openai(self.MESSAGES, self.PARAMS), 'Book a venue')
+        client.chat.completions.create.assert_called_once()
+
+
+class ContextBatchAnalysisTests(SimpleTestCase):
+    TEXTS = [
+        'Urgent: need to send the invoice to the client by Friday.',
+        'Great meeting today, the project is a success!',
+        'Terrible day, the deploy was a failure and a problem. Remember to check logs',
+        'Great meeting today, the project is a success!',
+        '  Café budget review at 10:30 tomorrow  ',
+        '',
+    ]
+    
+    def test_batch_equals_per_entry_analysis(self):
+        entries = [SimpleNamespace(content=text) for text in self.TEXTS]
+        with mock.patch.object(ai_service, 'insight_cache', InsightCache()):
+            expected = [ai_service.analyze_context([entry]) for entry in entries]
+        with mock.patch.object(ai_service, 'insight_cache', InsightCache()) as cache:
+            self.assertEqual(ai_service.analyze_context_batch(entries), expected)
+            # The repeated text was analyzed once
+            self.assertEqual((cache.hits, cache.misses), (1, 5))
+    
+    def test_keyword_sentiment_fallback_matches_the_scalar_rules(self):
+        positive = [0, 3, 0, 2, 1, 5]
+        negative = [0, 0, 2, 2, 3, 1]
+        with mock.patch.object(services, 'optional_import', return_value=None):
+            scalar = services.keyword_sentiments(positive, negative)
+        self.assertEqual(scalar, [0.0, 0.5, -0.5, 0.0, -0.5, 4 / 6])
+        self.assertEqual(services.keyword_sentiments(positive, negative), scalar)
+
+
+class SnapshotArtifactTests(SimpleTestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.path, ignore_errors=True)
+        for name, value in [('_snapshot', None), ('_checked_at', None)]:
+            patcher = mock.patch.object(artifacts, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        overrides = override_settings(
+            AI_SNAPSHOT={'PATH': self.path, 'CHECK_INTERVAL': 0, 'KEEP': 2},
+            AI_CATEGORY_MODEL={'PATH': f'{self.path}/category_model.npz', 'FEATURES': 64},
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+    
+    def vocabularies(self, word):
+        return {'category': {'work': [word]}, 'urgency': {}, 'complexity': {}, 'sentiment': {}}
+    
+    def test_published_artifacts_round_trip(self):
+        model = classifier.CategoryModel.empty(64)
+        model.sync_categories([(1, 'work'), (2, 'personal')])
+        model.partial_fit([('quarterly budget review', 1), ('buy groceries', 2)])
+        model.save(classifier.get_config()['PATH'])
+        
+        version = artifacts.publish(self.vocabularies('budget'))
+        snapshot = artifacts.preload()
+        self.assertEqual(snapshot.version, version)
+        self.assertEqual(snapshot.meta['vocabularies'], self.vocabularies('budget'))
+        self.assertEqual(artifacts.stopwords(), services.STOPWORDS)
+        shared = artifacts.category_model()
+        self.assertEqual(shared.category_ids.tolist(), [1, 2])
+        self.assertTrue((shared.log_prior == model.log_prior).all())
+        self.assertTrue((shared.log_likelihood == model.log_likelihood).all())
+        self.assertEqual(shared.predict('budget review')[0], 'work')
+    
+    def test_readers_swap_to_a_newly_published_snapshot(self):
+        first = artifacts.publish(self.vocabularies('budget'))
+        self.assertEqual(artifacts.version(), first)
+        self.assertEqual(artifacts.publish(self.vocabularies('budget')), first)
+        
+        second = artifacts.publish(self.vocabularies('invoice'))
+        self.assertNotEqual(second, first)
+        self.assertEqual(artifacts.version(), second)
+        self.assertEqual(artifacts.keyword_matcher().scan('send the invoice')['category'], {'work': ['invoice']})
+    
+    def test_broken_or_missing_pointer_keeps_the_previous_snapshot(self):
+        version = artifacts.publish(self.vocabularies('budget'))
+        self.assertEqual(artifacts.version(), version)
+        pointer = f'{self.path}/{artifacts.POINTER}'
+        
+        with open(f'{self.path}/snapshot-broken.bin', 'wb') as f:
+            f.write(b'not a snapshot')
+        for target in ['snapshot-broken.bin', 'snapshot-missing.bin']:
+            with open(pointer, 'w') as f:
+                f.write(target)
+            with mock.patch('builtins.print'):
+                self.assertEqual(artifacts.version(), version)
+        
+        os.remove(pointer)
+        self.assertEqual(artifacts.version(), version)
+    
+    def test_publishing_prunes_all_but_the_newest_snapshots(self):
+        published = time.time() - 100
+        versions = []
+        for offset, word in enumerate(['budget', 'invoice', 'deploy', 'report']):
+            versions.append(artifacts.publish(self.vocabularies(word)))
+            # Publishes within one mtime tick would otherwise tie
+            os.utime(f'{self.path}/snapshot-{versions[-1]}.bin', (published + offset, published + offset))
+        
+        remaining = sorted(name for name in os.listdir(self.path) if name.startswith('snapshot-'))
+        self.assertEqual(remaining, sorted(f'snapshot-{version}.bin' for version in versions[-2:]))
+        self.assertEqual(artifacts.version(), versions[-1])
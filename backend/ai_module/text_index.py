@@ -0,0 +1,155 @@
+"""
+Incrementally maintained TF-IDF index over open tasks.
+
+Task vectors are stored as postings (ai_module.TaskTerm) using the lnc.ltc
+scheme: documents keep a length-normalized log term frequency with no IDF,
+so saving a task only rewrites that task's postings. IDF is applied on the
+query side from the posting counts at lookup time. A lookup reads only the
+postings of the query's highest-weight terms (via the term index) and ranks
+tasks with one aggregate query, so its cost follows those posting lists
+rather than the number of tasks.
+"""
+
+import math
+from collections import Counter
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Count, F, FloatField, Sum, Value, When
+from .scoring import OPEN_STATUSES
+
+# Task fields whose change requires re-indexing
+INDEXED_FIELDS = frozenset(['title', 'description', 'status'])
+
+MAX_TERM_LENGTH = 64
+
+# Bound the IN (...) lists sent to the database
+TERM_CHUNK_SIZE = 500
+
+
+def get_config():
+    config = getattr(settings, 'AI_RELATED_TASKS', {})
+    return {
+        'TOP_K': config.get('TOP_K', 5),
+        'MIN_SCORE': config.get('MIN_SCORE', 0.1),
+        'MAX_QUERY_TERMS': config.get('MAX_QUERY_TERMS', 20),
+    }
+
+
+def term_counts(text):
+    """Count index terms in text, using the same words and stopwords as context analysis"""
+    from .services import STOPWORDS, WORD_PATTERN
+    
+    words = (word.lower() for word in WORD_PATTERN.findall(text or ''))
+    return Counter(
+        word for word in words
+        if word not in STOPWORDS and len(word) <= MAX_TERM_LENGTH
+    )
+
+
+def document_vector(text):
+    """lnc weights: 1 + log(tf), cosine-normalized"""
+    weights = {term: 1 + math.log(count) for term, count in term_counts(text).items()}
+    return _normalize(weights)
+
+
+def index_tasks(tasks):
+    """Replace the postings of the given tasks; tasks that are not open are dropped"""
+    from .models import TaskTerm
+    
+    tasks = list(tasks)
+    postings = [
+        TaskTerm(term=term, task_id=task.id, weight=weight)
+        for task in tasks
+        if task.status in OPEN_STATUSES
+        for term, weight in document_vector(f"{task.title} {task.description}").items()
+    ]
+    with transaction.atomic():
+        TaskTerm.objects.filter(task_id__in=[task.id for task in tasks]).delete()
+        TaskTerm.objects.bulk_create(postings, batch_size=1000)
+    return len(postings)
+
+
+def find_related_tasks(texts, top_k=None, min_score=None):
+    """Return, for each text, up to top_k (task_id, cosine similarity) pairs, best first"""
+    from tasks.models import Task
+    from .models import TaskTerm
+    
+    config = get_config()
+    top_k = top_k or config['TOP_K']
+    min_score = config['MIN_SCORE'] if min_score is None else min_score
+    
+    queries = [term_counts(text) for text in texts]
+    terms = sorted(set().union(*queries))
+    if not terms:
+        return [[] for _ in texts]
+    
+    # Document frequencies for every query term in the batch, fetched once
+    doc_freq = {}
+    for start in range(0, len(terms), TERM_CHUNK_SIZE):
+        doc_freq.update(
+            TaskTerm.objects.filter(term__in=terms[start:start + TERM_CHUNK_SIZE])
+            .values_list('term')
+            .annotate(df=Count('id'))
+        )
+    if not doc_freq:
+        return [[] for _ in texts]
+    task_count = Task.objects.filter(status__in=OPEN_STATUSES).count()
+    
+    results = []
+    for counts in queries:
+        weights = _query_vector(counts, doc_freq, task_count, config['MAX_QUERY_TERMS'])
+        if not weights:
+            results.append([])
+            continue
+        
+        query_weight = Case(
+            *[When(term=term, then=Value(weight)) for term, weight in weights.items()],
+            default=Value(0.0),
+            output_field=FloatField()
+        )
+        matches = (
+            TaskTerm.objects.filter(term__in=list(weights))
+            .values('task_id')
+            .annotate(score=Sum(F('weight') * query_weight, output_field=FloatField()))
+            .filter(score__gte=min_score)
+            .order_by('-score', 'task_id')[:top_k]
+        )
+        results.append([(match['task_id'], match['score']) for match in matches])
+    return results
+
+
+def link_related_tasks(entries, top_k=None):
+    """Link each processed context entry to its most similar open tasks; returns links added"""
+    from context.models import ContextEntry
+    
+    entries = [entry for entry in entries if entry.processed]
+    if not entries:
+        return 0
+    
+    matches = find_related_tasks([entry.content for entry in entries], top_k=top_k)
+    Link = ContextEntry.related_tasks.through
+    links = [
+        Link(contextentry_id=entry.id, task_id=task_id)
+        for entry, related in zip(entries, matches)
+        for task_id, _ in related
+    ]
+    Link.objects.bulk_create(links, ignore_conflicts=True, batch_size=1000)
+    return len(links)
+
+
+def _query_vector(counts, doc_freq, task_count, max_terms):
+    """ltc weights: (1 + log tf) * log(1 + N / df), keeping the strongest terms, cosine-normalized"""
+    weights = {}
+    for term, count in counts.items():
+        df = doc_freq.get(term)
+        if df:
+            weights[term] = (1 + math.log(count)) * math.log(max(task_count, df) / df + 1)
+    strongest = sorted(weights.items(), key=lambda item: item[1], reverse=True)[:max_terms]
+    return _normalize(dict(strongest))
+
+
+def _normalize(weights):
+    norm = math.sqrt(sum(weight * weight for weight in weights.values()))
+    if not norm:
+        return {}
+    return {term: weight / norm for term, weight in weights.items()}
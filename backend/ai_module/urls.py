@@ -1,8 +1,11 @@
 from django.urls import path
-from .views import AITaskSuggestionsView, AITaskAnalysisView, AIContextAnalysisView
+from .views import AITaskSuggestionsView, AITaskAnalysisView, AIContextAnalysisView, AICacheStatsView, AIProviderStatsView, AISearchView
 
 urlpatterns = [
     path('task-suggestions/', AITaskSuggestionsView.as_view(), name='ai-task-suggestions'),
     path('task-analysis/', AITaskAnalysisView.as_view(), name='ai-task-analysis'),
     path('context-analysis/', AIContextAnalysisView.as_view(), name='ai-context-analysis'),
+    path('cache-stats/', AICacheStatsView.as_view(), name='ai-cache-stats'),
+    path('provider-stats/', AIProviderStatsView.as_view(), name='ai-provider-stats'),
+    path('search/', AISearchView.as_view(), name='ai-search'),
 ]
@@ -0,0 +1,499 @@
+"""
+Memory-mapped vector index for local semantic search over tasks and context entries.
+
+Texts are embedded offline with signed feature hashing (words, word bigrams
+and character 4-grams, sublinear tf, L2-normalized) into DIM float32 values,
+so no model download or network call is involved.
+
+On disk (AI_VECTOR_INDEX['PATH']):
+  manifest.json               current version, dimension and row counts
+  main-<v>.vectors.npy        compacted vectors, grouped by IVF partition
+  main-<v>.keys.npy           document key of each row
+  main-<v>.offsets.npy        row range of each partition
+  main-<v>.centroids.npy      partition centroids
+  delta-<v>.bin               append-only (key, vector) records since the last compaction
+
+Every file is opened with np.memmap/np.load(mmap_mode='r'), so all worker
+processes share the same page-cache pages instead of holding private copies.
+A query scores the NPROBE partitions whose centroids are closest, plus the
+whole delta, which keeps latency flat as the compacted part grows. Saves append
+one record to the delta; a later record for the same document supersedes
+earlier ones, and a zero vector marks a deletion. Compaction folds the delta
+into a new main version and switches the manifest atomically; readers pick up
+the new version on their next query. It runs in a background thread once the
+delta passes MAX_DELTA_ROWS records, which keeps the exhaustive delta scan
+bounded, and on demand with `manage.py build_vector_index`. Automatic
+compactions reuse the existing partition centroids once the partition count
+has reached NLIST, so they only reassign rows.
+"""
+
+import json
+import math
+import os
+import re
+import threading
+import zlib
+from contextlib import contextmanager
+from django.conf import settings
+from .optional import optional_import
+
+KIND_TASK = 0
+KIND_CONTEXT = 1
+KINDS = {'task': KIND_TASK, 'context': KIND_CONTEXT}
+
+# Task fields that feed the task document
+TASK_FIELDS = frozenset(['title', 'description', 'tags', 'status'])
+
+MANIFEST = 'manifest.json'
+LOCK_FILE = 'index.lock'
+COMPACT_LOCK_FILE = 'compact.lock'
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+
+def get_config():
+    config = getattr(settings, 'AI_VECTOR_INDEX', {})
+    return {
+        'PATH': str(config.get('PATH', os.path.join(settings.BASE_DIR, 'var', 'vector_index'))),
+        'DIM': config.get('DIM', 256),
+        'NLIST': config.get('NLIST', 1024),
+        'NPROBE': config.get('NPROBE', 8),
+        'MIN_SCORE': config.get('MIN_SCORE', 0.1),
+        'MAX_DELTA_ROWS': config.get('MAX_DELTA_ROWS', 20000),
+        'ENABLED': config.get('ENABLED', True),
+    }
+
+
+def make_key(kind, object_id):
+    return object_id * 2 + KINDS[kind]
+
+
+def split_key(key):
+    return ('task' if key % 2 == KIND_TASK else 'context'), key // 2
+
+
+def _features(text):
+    """Hashed features of text with their weights"""
+    from .services import STOPWORDS
+
+    words = [word for word in TOKEN_PATTERN.findall((text or '').lower()) if word not in STOPWORDS]
+    features = {}
+    for word in words:
+        features[word] = features.get(word, 0.0) + 1.0
+        if len(word) > 4:
+            for i in range(len(word) - 3):
+                gram = '#' + word[i:i + 4]
+                features[gram] = features.get(gram, 0.0) + 0.25
+    for first, second in zip(words, words[1:]):
+        bigram = first + ' ' + second
+        features[bigram] = features.get(bigram, 0.0) + 1.0
+    return features
+
+
+def embed(texts, dim=None):
+    """Embed texts as L2-normalized float32 rows (all-zero for texts without words)"""
+    np = optional_import('numpy')
+    dim = dim or get_config()['DIM']
+
+    matrix = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for feature, count in _features(text).items():
+            hashed = zlib.crc32(feature.encode('utf-8'))
+            weight = 1.0 + math.log(count) if count >= 1 else count
+            # The top hash bit picks the sign so colliding features tend to cancel out
+            matrix[row, hashed % dim] += weight if hashed & 0x80000000 else -weight
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+def task_document(task):
+    return f"{task.title} {task.description} {' '.join(str(tag) for tag in task.tags or [])}"
+
+
+class VectorIndex:
+    """Process-local handle on the shared on-disk index; reloads when the manifest changes"""
+
+    def __init__(self, path=None, dim=None, nprobe=None, nlist=None, min_score=None, max_delta_rows=None):
+        config = get_config()
+        self.path = path or config['PATH']
+        self.min_score = config['MIN_SCORE'] if min_score is None else min_score
+        self.dim = dim or config['DIM']
+        self.nprobe = nprobe or config['NPROBE']
+        self.nlist = nlist or config['NLIST']
+        self.max_delta_rows = max_delta_rows or config['MAX_DELTA_ROWS']
+        self._lock = threading.Lock()
+        self._compaction_thread = None
+        self._manifest_mtime = None
+        self._state = None
+
+    # --- layout -----------------------------------------------------------
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def _record_dtype(self):
+        np = optional_import('numpy')
+        return np.dtype([('key', '<i8'), ('vector', '<f4', (self.dim,))])
+
+    def _read_manifest(self):
+        try:
+            with open(self._file(MANIFEST)) as handle:
+                return json.load(handle)
+        except FileNotFoundError:
+            return {'version': 0, 'dim': self.dim, 'count': 0}
+
+    def _write_manifest(self, manifest):
+        temp = self._file(MANIFEST + '.tmp')
+        with open(temp, 'w') as handle:
+            json.dump(manifest, handle)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temp, self._file(MANIFEST))
+
+    @contextmanager
+    def _locked(self, exclusive, name=LOCK_FILE, blocking=True):
+        """Cross-process lock: appends share it, compaction's swap takes it exclusively.
+
+        With blocking=False, BlockingIOError is raised when the lock is held elsewhere.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        with open(self._file(name), 'a+b') as handle:
+            fcntl = optional_import('fcntl')
+            if fcntl is not None:
+                flags = fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
+                fcntl.flock(handle, flags if blocking else flags | fcntl.LOCK_NB)
+            else:
+                msvcrt = optional_import('msvcrt')
+                handle.seek(0)
+                try:
+                    msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
+                except OSError as e:
+                    if blocking:
+                        raise
+                    raise BlockingIOError(str(e))
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+                else:
+                    handle.seek(0)
+                    msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+    # --- writing ----------------------------------------------------------
+
+    def add(self, keys, vectors):
+        """Append documents to the delta; a later record for a key replaces earlier ones"""
+        np = optional_import('numpy')
+        records = np.empty(len(keys), dtype=self._record_dtype())
+        records['key'] = keys
+        records['vector'] = vectors
+
+        with self._locked(exclusive=False):
+            manifest = self._read_manifest()
+            delta_path = self._file(f"delta-{manifest['version']}.bin")
+            with open(delta_path, 'ab') as handle:
+                # Whole records in one write, so readers never see a torn key/vector pair
+                handle.write(records.tobytes())
+
+        if self._delta_rows(delta_path) > self.max_delta_rows:
+            self._compact_in_background()
+
+    def remove(self, keys):
+        """Mark documents as deleted (a zero vector never matches a query)"""
+        np = optional_import('numpy')
+        self.add(keys, np.zeros((len(keys), self.dim), dtype=np.float32))
+
+    def compact(self, documents=None):
+        """Fold the delta into a new main version and switch readers to it.
+
+        With `documents` (an iterable of (key, vector) chunks) the index is
+        rebuilt from them instead of from the current main and delta.
+        Returns the number of live rows in the new version.
+        """
+        # One compaction at a time; appends only wait for the final swap
+        with self._locked(exclusive=True, name=COMPACT_LOCK_FILE):
+            return self._compact(documents)
+
+    def _compact_in_background(self):
+        """Start one compaction thread per process; other processes' compactions are not waited for"""
+        with self._lock:
+            if self._compaction_thread is not None and self._compaction_thread.is_alive():
+                return
+            self._compaction_thread = threading.Thread(
+                target=self._auto_compact, name='vector-index-compaction', daemon=True
+            )
+            self._compaction_thread.start()
+
+    def _auto_compact(self):
+        try:
+            with self._locked(exclusive=True, name=COMPACT_LOCK_FILE, blocking=False):
+                # Another process may have compacted while we waited to start
+                version = self._read_manifest()['version']
+                if self._delta_rows(self._file(f"delta-{version}.bin")) > self.max_delta_rows:
+                    self._compact(None)
+        except BlockingIOError:
+            pass
+        except Exception as e:
+            print(f"Vector index compaction error: {e}")
+
+    def _compact(self, documents):
+        np = optional_import('numpy')
+        manifest = self._read_manifest()
+        version = manifest['version']
+        delta_path = self._file(f"delta-{version}.bin")
+        delta_rows = self._delta_rows(delta_path)
+
+        centroids = None
+        if documents is None:
+            keys, vectors = self._live_rows(version, delta_path, delta_rows)
+            if version and self._partition_count(len(keys)) == self.nlist:
+                # Partitioning is already at full size; reassign rows to the trained centroids
+                centroids = np.load(self._file(f"main-{version}.centroids.npy"))
+                if centroids.shape != (self.nlist, self.dim):
+                    centroids = None
+        else:
+            chunks = list(documents)
+            keys = np.concatenate([chunk_keys for chunk_keys, _ in chunks]) if chunks else np.zeros(0, dtype=np.int64)
+            vectors = np.concatenate([chunk for _, chunk in chunks]) if chunks else np.zeros((0, self.dim), dtype=np.float32)
+
+        new_version = version + 1
+        count = self._write_main(new_version, keys, vectors, centroids)
+
+        with self._locked(exclusive=True):
+            # Records appended while we were building move to the new delta
+            tail = b''
+            if os.path.exists(delta_path):
+                with open(delta_path, 'rb') as handle:
+                    handle.seek(delta_rows * self._record_dtype().itemsize)
+                    tail = handle.read()
+            with open(self._file(f"delta-{new_version}.bin"), 'wb') as handle:
+                handle.write(tail)
+            self._write_manifest({'version': new_version, 'dim': self.dim, 'count': count})
+
+        self._remove_version(version)
+        return count
+
+    def _delta_rows(self, delta_path):
+        try:
+            return os.path.getsize(delta_path) // self._record_dtype().itemsize
+        except FileNotFoundError:
+            return 0
+
+    def _live_rows(self, version, delta_path, delta_rows):
+        """Latest vector per key across main and delta, without deletions"""
+        np = optional_import('numpy')
+        key_parts = []
+        vector_parts = []
+        if version:
+            key_parts.append(np.load(self._file(f"main-{version}.keys.npy")))
+            vector_parts.append(np.load(self._file(f"main-{version}.vectors.npy")))
+        if delta_rows:
+            delta = np.memmap(delta_path, dtype=self._record_dtype(), mode='r', shape=(delta_rows,))
+            key_parts.append(np.array(delta['key']))
+            vector_parts.append(np.array(delta['vector']))
+        if not key_parts:
+            return np.zeros(0, dtype=np.int64), np.zeros((0, self.dim), dtype=np.float32)
+
+        keys = np.concatenate(key_parts)
+        vectors = np.concatenate(vector_parts)
+        # Keep the last occurrence of every key
+        _, reversed_first = np.unique(keys[::-1], return_index=True)
+        latest = np.sort(len(keys) - 1 - reversed_first)
+        keys, vectors = keys[latest], vectors[latest]
+        live = np.any(vectors != 0, axis=1)
+        return keys[live], vectors[live]
+
+    def _partition_count(self, count):
+        return max(1, min(self.nlist, count // 64))
+
+    def _write_main(self, version, keys, vectors, centroids=None):
+        """Partition rows (with spherical k-means unless centroids are given) and save them grouped by partition"""
+        np = optional_import('numpy')
+        count = len(keys)
+        if centroids is None:
+            nlist = self._partition_count(count)
+            centroids = self._train_centroids(vectors, nlist) if count else np.zeros((1, self.dim), dtype=np.float32)
+
+        assignments = np.zeros(count, dtype=np.int64)
+        for start in range(0, count, 65536):
+            assignments[start:start + 65536] = np.argmax(vectors[start:start + 65536] @ centroids.T, axis=1)
+        order = np.argsort(assignments, kind='stable')
+        offsets = np.searchsorted(assignments[order], np.arange(len(centroids) + 1))
+
+        for name, array in [
+            ('vectors', np.ascontiguousarray(vectors[order], dtype=np.float32)),
+            ('keys', keys[order].astype(np.int64)),
+            ('offsets', offsets.astype(np.int64)),
+            ('centroids', centroids.astype(np.float32)),
+        ]:
+            temp = self._file(f"main-{version}.{name}.tmp.npy")
+            np.save(temp, array)
+            os.replace(temp, self._file(f"main-{version}.{name}.npy"))
+        return count
+
+    def _train_centroids(self, vectors, nlist, iterations=10):
+        np = optional_import('numpy')
+        rng = np.random.default_rng(0)
+        sample = vectors[rng.choice(len(vectors), size=min(len(vectors), nlist * 64), replace=False)]
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+        for _ in range(iterations):
+            assignments = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, sample)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            # Empty partitions keep their previous centroid
+            centroids = np.where(norms > 0, sums / np.maximum(norms, 1e-12), centroids)
+        return centroids.astype(np.float32)
+
+    def _remove_version(self, version):
+        names = [f"delta-{version}.bin"]
+        if version:
+            names += [f"main-{version}.{name}.npy" for name in ('vectors', 'keys', 'offsets', 'centroids')]
+        for name in names:
+            try:
+                os.remove(self._file(name))
+            except OSError:
+                # Still mapped by a reader on platforms that forbid it; the next compaction retries
+                pass
+
+    # --- reading ----------------------------------------------------------
+
+    def _current(self):
+        """Memory-mapped arrays for the current version, reloaded after a compaction"""
+        np = optional_import('numpy')
+        try:
+            mtime = os.stat(self._file(MANIFEST)).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+
+        with self._lock:
+            if self._state is None or mtime != self._manifest_mtime:
+                manifest = self._read_manifest()
+                version = manifest['version']
+                state = {'version': version, 'main': None}
+                if version:
+                    state['main'] = {
+                        name: np.load(self._file(f"main-{version}.{name}.npy"), mmap_mode='r')
+                        for name in ('vectors', 'keys', 'offsets', 'centroids')
+                    }
+                self._state = state
+                self._manifest_mtime = mtime
+            return self._state
+
+    def search(self, vector, k=10, kinds=None):
+        """Return up to k (kind, object_id, score) hits, best first"""
+        np = optional_import('numpy')
+        state = self._current()
+        allowed = {KINDS[kind] for kind in kinds} if kinds else None
+        candidate_keys = []
+        candidate_scores = []
+
+        # The delta is bounded by MAX_DELTA_ROWS and searched exhaustively; its keys supersede main rows
+        delta_path = self._file(f"delta-{state['version']}.bin")
+        delta_rows = self._delta_rows(delta_path)
+        superseded = None
+        if delta_rows:
+            delta = np.memmap(delta_path, dtype=self._record_dtype(), mode='r', shape=(delta_rows,))
+            delta_keys = np.array(delta['key'])
+            _, reversed_first = np.unique(delta_keys[::-1], return_index=True)
+            latest = len(delta_keys) - 1 - reversed_first
+            candidate_keys.append(delta_keys[latest])
+            candidate_scores.append(delta['vector'][latest] @ vector)
+            superseded = delta_keys[latest]
+
+        main = state['main']
+        if main is not None:
+            offsets = main['offsets']
+            probes = np.argsort(main['centroids'] @ vector)[::-1][:self.nprobe]
+            for partition in probes:
+                start, end = int(offsets[partition]), int(offsets[partition + 1])
+                if start == end:
+                    continue
+                keys = main['keys'][start:end]
+                scores = main['vectors'][start:end] @ vector
+                if superseded is not None:
+                    keep = ~np.isin(keys, superseded)
+                    keys, scores = keys[keep], scores[keep]
+                candidate_keys.append(np.asarray(keys))
+                candidate_scores.append(scores)
+
+        if not candidate_keys:
+            return []
+        keys = np.concatenate(candidate_keys)
+        scores = np.concatenate(candidate_scores)
+        mask = scores >= max(self.min_score, 1e-6)
+        if allowed is not None:
+            mask &= np.isin(keys % 2, list(allowed))
+        keys, scores = keys[mask], scores[mask]
+
+        top = np.argsort(scores)[::-1][:k] if len(scores) > k else np.argsort(scores)[::-1]
+        return [(*split_key(int(keys[i])), float(scores[i])) for i in top]
+
+    def stats(self):
+        state = self._current()
+        main = state['main']
+        return {
+            'version': state['version'],
+            'main_rows': int(len(main['keys'])) if main is not None else 0,
+            'partitions': int(len(main['centroids'])) if main is not None else 0,
+            'delta_rows': self._delta_rows(self._file(f"delta-{state['version']}.bin")),
+            'dim': self.dim,
+        }
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = VectorIndex()
+        return _index
+
+
+def index_tasks(tasks):
+    """Append (or, for closed tasks, remove) task vectors"""
+    from .scoring import OPEN_STATUSES
+
+    if not _enabled():
+        return
+    tasks = list(tasks)
+    index = get_index()
+    live = [task for task in tasks if task.status in OPEN_STATUSES]
+    dead = [task for task in tasks if task.status not in OPEN_STATUSES]
+    if live:
+        index.add([make_key('task', task.id) for task in live], embed([task_document(task) for task in live], index.dim))
+    if dead:
+        index.remove([make_key('task', task.id) for task in dead])
+
+
+def index_context_entries(entries):
+    if not _enabled():
+        return
+    entries = list(entries)
+    index = get_index()
+    index.add(
+        [make_key('context', entry.id) for entry in entries],
+        embed([entry.content for entry in entries], index.dim)
+    )
+
+
+def remove(kind, object_ids):
+    if _enabled() and object_ids:
+        get_index().remove([make_key(kind, object_id) for object_id in object_ids])
+
+
+def search(query, k=10, kinds=None):
+    index = get_index()
+    vector = embed([query], index.dim)[0]
+    if not vector.any():
+        return []
+    return index.search(vector, k, kinds)
+
+
+def _enabled():
+    return get_config()['ENABLED'] and optional_import('numpy') is not None
@@ -2,7 +2,9 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from .services import ai_service
-from context.models import ContextEntry
+from .dedupe import find_duplicates
+from .window_analysis import analyze_window
+from context.models import ContextEntry, ContextSnapshot
 from tasks.models import Task
 
 class AITaskSuggestionsView(APIView):
@@ -10,6 +12,7 @@ class AITaskSuggestionsView(APIView):
         """Get AI-powered task suggestions based on context"""
         context_data = request.data.get('context', '')
         user_preferences = request.data.get('preferences', {})
+        exclude_duplicates = request.data.get('exclude_duplicates', False)
         
         try:
             # Create temporary context entry for analysis
@@ -21,13 +24,26 @@ class AITaskSuggestionsView(APIView):
             
             # Enhanced suggestions with AI
             enhanced_suggestions = []
-            for suggestion in task_suggestions[:5]:  # Limit to top 5
+            for suggestion in task_suggestions:
+                if len(enhanced_suggestions) >= 5:  # Limit to top 5
+                    break
+                
+                # Flag suggestions that match an existing open task
+                duplicates = find_duplicates(suggestion)
+                if duplicates and exclude_duplicates:
+                    continue
+                
+                hits = ai_service.scan_keywords(suggestion)
+                suggested_categories = ai_service.suggest_categories(suggestion, '', hits)
                 enhanced_suggestion = {
                     'title': suggestion,
-                    'suggested_category': ai_service.suggest_categories(suggestion, '')[0] if ai_service.suggest_categories(suggestion, '') else 'general',
+                    'suggested_category': suggested_categories[0] if suggested_categories else 'general',
                     'estimated_priority': 'medium',
                     'suggested_deadline': ai_service.suggest_deadline(suggestion, '', insights).isoformat(),
-                    'complexity_score': ai_service._assess_task_complexity(suggestion, '')
+                    'complexity_score': ai_service._assess_task_complexity(suggestion, '', hits),
+                    'possible_duplicates': [
+                        {'id': task_id, 'similarity': round(score, 3)} for task_id, score in duplicates
+                    ]
                 }
                 enhanced_suggestions.append(enhanced_suggestion)
             
@@ -55,23 +71,22 @@ class AITaskAnalysisView(APIView):
             tasks = Task.objects.filter(id__in=task_ids)
             
             # Get recent context for analysis
-            recent_context = ContextEntry.objects.filter(processed=True).order_by('-timestamp')[:10]
-            context_data = None
-            if recent_context:
-                context_data = ai_service.analyze_context(recent_context)
+            context_data = ContextSnapshot.get_insights(10)
             
             # Analyze tasks
             analysis_results = []
             priority_scores = ai_service.prioritize_tasks(tasks, context_data)
             
             for task in tasks:
+                # One keyword scan serves both category and complexity
+                hits = ai_service.scan_keywords(f"{task.title} {task.description}")
                 analysis = {
                     'task_id': task.id,
                     'title': task.title,
                     'current_priority': task.priority,
                     'ai_priority_score': priority_scores.get(task.id, 0.5),
-                    'suggested_categories': ai_service.suggest_categories(task.title, task.description),
-                    'complexity_assessment': ai_service._assess_task_complexity(task.title, task.description),
+                    'suggested_categories': ai_service.suggest_categories(task.title, task.description, hits),
+                    'complexity_assessment': ai_service._assess_task_complexity(task.title, task.description, hits),
                     'deadline_suggestion': ai_service.suggest_deadline(task.title, task.description, context_data).isoformat() if not task.deadline else None,
                     'enhancement_available': len(task.ai_enhanced_description or '') == 0
                 }
@@ -97,6 +112,10 @@ class AIContextAnalysisView(APIView):
         """Analyze context entries and extract insights"""
         days = request.data.get('days', 7)
         source_types = request.data.get('source_types', [])
+        sample = request.data.get('sample', True)
+        if isinstance(sample, str):
+            # Form posts send booleans as text
+            sample = sample.lower() not in ('false', '0', 'no', 'off')
         
         try:
             from django.utils import timezone
@@ -109,14 +128,16 @@ class AIContextAnalysisView(APIView):
             if source_types:
                 entries = entries.filter(source_type__in=source_types)
             
-            # Analyze context
-            insights = ai_service.analyze_context(entries)
+            # Analyze context entry by entry with bounded memory
+            insights, window = analyze_window(entries, ai_service, sample=sample)
             
             # Generate comprehensive analysis
             analysis = {
                 'period_summary': {
                     'days_analyzed': days,
-                    'total_entries': entries.count(),
+                    'total_entries': window['total_entries'],
+                    'entries_analyzed': window['entries_analyzed'],
+                    'sample_rate': window['sample_rate'],
                     'average_sentiment': insights.get('sentiment', 0),
                     'dominant_themes': insights.get('keywords', [])[:5]
                 },
@@ -155,3 +176,72 @@ class AIContextAnalysisView(APIView):
                 {'error': f'Failed to analyze context: {str(e)}'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+
+class AICacheStatsView(APIView):
+    def get(self, request):
+        """Report hit/miss counters of the context insight cache"""
+        return Response(ai_service.insight_cache.stats())
+
+class AIProviderStatsView(APIView):
+    def get(self, request):
+        """Report circuit breaker state and rolling latency per AI provider"""
+        return Response({
+            'available_providers': ai_service.available_providers(),
+            'providers': ai_service.provider_router.snapshot(),
+            'concurrency': {
+                provider: limiter.snapshot() for provider, limiter in ai_service.limiters.items()
+            }
+        })
+
+class AISearchView(APIView):
+    def get(self, request):
+        """Semantic search over open tasks and context entries using the local vector index"""
+        from . import vector_index
+        
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({'error': 'Query parameter q is required'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            k = min(int(request.query_params.get('k', 10)), 50)
+        except ValueError:
+            return Response({'error': 'k must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        kinds = [kind for kind in request.query_params.get('type', '').split(',') if kind in vector_index.KINDS]
+        
+        try:
+            hits = vector_index.search(query, k, kinds or None)
+        except Exception as e:
+            return Response(
+                {'error': f'Search failed: {str(e)}'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+        
+        # Hydrate hits in one query per kind; rows deleted since indexing are skipped
+        task_ids = [object_id for kind, object_id, _ in hits if kind == 'task']
+        entry_ids = [object_id for kind, object_id, _ in hits if kind == 'context']
+        tasks = Task.objects.in_bulk(task_ids) if task_ids else {}
+        entries = ContextEntry.objects.in_bulk(entry_ids) if entry_ids else {}
+        
+        results = []
+        for kind, object_id, score in hits:
+            if kind == 'task' and object_id in tasks:
+                task = tasks[object_id]
+                results.append({
+                    'type': 'task',
+                    'id': task.id,
+                    'score': round(score, 4),
+                    'title': task.title,
+                    'status': task.status,
+                    'priority': task.priority
+                })
+            elif kind == 'context' and object_id in entries:
+                entry = entries[object_id]
+                results.append({
+                    'type': 'context',
+                    'id': entry.id,
+                    'score': round(score, 4),
+                    'content': entry.content[:200],
+                    'source_type': entry.source_type
+                })
+        
+        return Response({'query': query, 'results': results})
@@ -0,0 +1,185 @@
+"""
+Bounded-memory analysis of a window of context entries.
+
+AIContextAnalysisView used to join every entry in the window into one string
+and analyze it at once. analyze_window() streams entry contents from the
+database in chunks instead. It folds each entry into a ContextAggregate of
+mergeable running totals:
+- keyword frequencies in a Misra-Gries heavy-hitters sketch
+- a sentiment sum
+- urgency term counts
+- the first few task suggestions and time indicators
+Memory stays flat however many entries the window holds. Above MAX_ENTRIES
+the window is sampled on a multiplicative hash of the id, so the cost is
+bounded as well.
+"""
+
+import heapq
+import math
+from collections import Counter
+from django.conf import settings
+from django.db.models import F
+from . import artifacts
+
+# Knuth's multiplicative hash over the low 31 bits of the id. The product stays
+# below 2**63, so it never overflows a 64-bit integer column.
+HASH_MULTIPLIER = 2654435761
+HASH_RANGE = 2 ** 31
+
+
+def get_config():
+    config = getattr(settings, 'AI_CONTEXT_ANALYSIS', {})
+    return {
+        'CHUNK_SIZE': config.get('CHUNK_SIZE', 500),
+        'MAX_ENTRIES': config.get('MAX_ENTRIES', 5000),
+        'KEYWORD_CAPACITY': config.get('KEYWORD_CAPACITY', 256),
+        'MAX_TIME_INDICATORS': config.get('MAX_TIME_INDICATORS', 20),
+    }
+
+
+class HeavyHitters:
+    """Misra-Gries summary keeping at most `capacity` counters.
+
+    Any item whose true count exceeds total / (capacity + 1) is retained, and
+    every kept count is low by at most `error`. Two summaries merge into one
+    with the same guarantee, so partial aggregates can be combined.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.counts = Counter()
+        self.error = 0
+
+    def update(self, counts):
+        self.counts.update(counts)
+        if len(self.counts) > self.capacity:
+            # Subtract the (capacity + 1)-th largest count from every counter
+            threshold = heapq.nlargest(self.capacity + 1, self.counts.values())[-1]
+            self.counts = Counter({
+                item: count - threshold for item, count in self.counts.items() if count > threshold
+            })
+            self.error += threshold
+
+    def merge(self, other):
+        self.error += other.error
+        self.update(other.counts)
+
+    def most_common(self, n):
+        return self.counts.most_common(n)
+
+
+class ContextAggregate:
+    """Running insight totals over a stream of context texts"""
+
+    # Same limit as AITaskManager._suggest_tasks_from_context, per pattern
+    SUGGESTIONS_PER_PATTERN = 3
+    # Word counts are buffered exactly and folded into the sketch this often
+    FLUSH_EVERY = 256
+
+    def __init__(self, keyword_capacity=256, max_time_indicators=20):
+        self.entries = 0
+        self.sentiment_sum = 0.0
+        self.keywords = HeavyHitters(keyword_capacity)
+        self.urgency = Counter()
+        self.task_suggestions = {}
+        self.time_indicators = []
+        self.max_time_indicators = max_time_indicators
+        self._pending = Counter()
+        self._pending_entries = 0
+
+    def add(self, text, manager):
+        """Fold one entry's text into the totals using manager's analysis passes"""
+        from .services import TASK_PATTERNS, WORD_PATTERN
+
+        text_lower = text.lower()
+        hits = manager.scan_keywords(text_lower)
+        self.sentiment_sum += manager._analyze_sentiment(text, hits)
+        self.urgency.update(hits['urgency']['urgent'])
+
+        stopwords = artifacts.stopwords()
+        self._pending.update(
+            word for word in WORD_PATTERN.findall(text_lower) if word not in stopwords and len(word) > 3
+        )
+
+        for index, pattern in enumerate(TASK_PATTERNS):
+            kept = self.task_suggestions.setdefault(index, [])
+            if len(kept) < self.SUGGESTIONS_PER_PATTERN:
+                kept.extend(pattern.findall(text)[:self.SUGGESTIONS_PER_PATTERN - len(kept)])
+
+        if len(self.time_indicators) < self.max_time_indicators:
+            found = manager._extract_time_indicators(text)
+            self.time_indicators.extend(found[:self.max_time_indicators - len(self.time_indicators)])
+
+        self.entries += 1
+        self._pending_entries += 1
+        if self._pending_entries >= self.FLUSH_EVERY:
+            self._flush()
+
+    def merge(self, other):
+        """Combine another aggregate (e.g. from a separate chunk) into this one"""
+        self._flush()
+        other._flush()
+        self.entries += other.entries
+        self.sentiment_sum += other.sentiment_sum
+        self.keywords.merge(other.keywords)
+        self.urgency.update(other.urgency)
+        for index, suggestions in other.task_suggestions.items():
+            kept = self.task_suggestions.setdefault(index, [])
+            kept.extend(suggestions[:self.SUGGESTIONS_PER_PATTERN - len(kept)])
+        room = self.max_time_indicators - len(self.time_indicators)
+        self.time_indicators.extend(other.time_indicators[:max(room, 0)])
+
+    def _flush(self):
+        if self._pending:
+            self.keywords.update(self._pending)
+            self._pending = Counter()
+        self._pending_entries = 0
+
+    def insights(self):
+        """The totals in the shape returned by AITaskManager.analyze_context"""
+        self._flush()
+        return {
+            'sentiment': self.sentiment_sum / self.entries if self.entries else 0,
+            'keywords': [word for word, _ in self.keywords.most_common(10)],
+            'urgency_indicators': [term for term, _ in self.urgency.most_common()],
+            'urgency_counts': dict(self.urgency),
+            'task_suggestions': [
+                suggestion for index in sorted(self.task_suggestions)
+                for suggestion in self.task_suggestions[index]
+            ],
+            'time_indicators': self.time_indicators,
+        }
+
+
+def analyze_window(entries, manager=None, sample=True):
+    """Stream the ContextEntry queryset through a ContextAggregate.
+
+    Returns (insights, summary) where summary reports the window size, how
+    many entries were analyzed and the sampling rate applied.
+    """
+    if manager is None:
+        from .services import ai_service as manager
+    config = get_config()
+
+    total = entries.count()
+    step = 1
+    if sample and config['MAX_ENTRIES'] and total > config['MAX_ENTRIES']:
+        # About one id in `step`, repeatable between requests. Keeping the ids whose
+        # hash falls in the lowest 1/step of its range mixes every bit of the id,
+        # unlike id % step, which can select none of the ids left by a filter when
+        # they all share one residue.
+        step = math.ceil(total / config['MAX_ENTRIES'])
+        entries = entries.annotate(
+            sample_hash=F('id') % HASH_RANGE * HASH_MULTIPLIER % HASH_RANGE
+        ).filter(sample_hash__lt=HASH_RANGE // step)
+
+    aggregate = ContextAggregate(config['KEYWORD_CAPACITY'], config['MAX_TIME_INDICATORS'])
+    for content in entries.values_list('content', flat=True).iterator(chunk_size=config['CHUNK_SIZE']):
+        aggregate.add(content, manager)
+
+    summary = {
+        'total_entries': total,
+        'entries_analyzed': aggregate.entries,
+        'sample_rate': 1 / step,
+    }
+    return aggregate.insights(), summary
@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand, CommandError
+from context import processing
+from context.models import ContextProcessingJob
+
+class Command(BaseCommand):
+    help = 'Analyze unprocessed context entries in parallel, resuming any unfinished job'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--job',
+            type=int,
+            help='Resume this job even if it is marked running'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            help='Analysis processes (defaults to AI_CONTEXT_PROCESSING WORKERS or the CPU count)'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            help='Entries analyzed and written back per chunk'
+        )
+
+    def handle(self, *args, **options):
+        if options['job']:
+            try:
+                job = ContextProcessingJob.objects.get(id=options['job'])
+            except ContextProcessingJob.DoesNotExist:
+                raise CommandError(f"Context processing job {options['job']} does not exist")
+            if job.status == 'completed':
+                raise CommandError(f'Job {job.id} is already completed')
+            claimed = processing.claim_job(job, force=True)
+        else:
+            job, _ = processing.get_or_create_job()
+            claimed = processing.claim_job(job)
+
+        if not claimed:
+            raise CommandError(f'Job {job.id} is being run by another worker; pass --job {job.id} to take it over')
+
+        self.stdout.write(f'Job {job.id}: {job.total_entries} entries, resuming after id {job.last_entry_id}')
+        job = processing.run_job(
+            job,
+            workers=options['workers'],
+            chunk_size=options['chunk_size'],
+            progress=lambda job: self.stdout.write(
+                f'  {job.processed_count + job.failed_count}/{job.total_entries} entries (up to id {job.last_entry_id})'
+            )
+        )
+
+        if job.status == 'failed':
+            raise CommandError(f'Job {job.id} failed: {job.error}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Job {job.id} processed {job.processed_count} entries ({job.failed_count} failed)'
+        ))
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.5 on 2026-10-17 03:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('context', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContextSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('window', models.PositiveIntegerField(unique=True)),
+                ('entry_ids', models.JSONField(blank=True, default=list)),
+                ('oldest_timestamp', models.DateTimeField(blank=True, null=True)),
+                ('insights', models.JSONField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-17 04:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('context', '0003_contextprocessingjob'),
+        ('tasks', '0005_task_priority_keyset_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contextentry',
+            index=models.Index(fields=['-timestamp', '-id'], name='context_timestamp_keyset_idx'),
+        ),
+    ]
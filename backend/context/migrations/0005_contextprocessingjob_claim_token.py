@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-17 04:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('context', '0004_contextentry_timestamp_keyset_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contextprocessingjob',
+            name='claim_token',
+            field=models.UUIDField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 
 class ContextEntry(models.Model):
@@ -22,9 +22,145 @@ class ContextEntry(models.Model):
     
     class Meta:
         ordering = ['-timestamp']
+        indexes = [
+            # Serves the list ordering and its keyset page seeks (smart_todo.pagination)
+            models.Index(fields=['-timestamp', '-id'], name='context_timestamp_keyset_idx'),
+        ]
     
     def __str__(self):
         return f"{self.source_type} - {self.timestamp.strftime('%Y-%m-%d %H:%M')}"
+    
+    def apply_insights(self, insights):
+        """Store AI insights on the entry and mark it processed (does not save)"""
+        self.insights = insights
+        self.sentiment_score = insights.get('sentiment', 0)
+        self.keywords = insights.get('keywords', [])
+        self.urgency_indicators = insights.get('urgency_indicators', [])
+        self.processed = True
+
+class ContextSnapshot(models.Model):
+    """Materialized insights over the most recent processed context entries.
+    
+    One row per window size. Rows are refreshed when an entry inside (or newly
+    entering) the window is saved or deleted, so readers get the aggregate
+    insights with a single lookup instead of re-analyzing the entries. The
+    refresh runs after the write commits and off the request thread (see
+    context.processing.schedule_snapshot_refresh), with changes that arrive
+    together folded into one refresh per window.
+    """
+    WINDOWS = [5, 10]
+    
+    window = models.PositiveIntegerField(unique=True)
+    entry_ids = models.JSONField(default=list, blank=True)
+    oldest_timestamp = models.DateTimeField(null=True, blank=True)
+    insights = models.JSONField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"Context snapshot (last {self.window} entries)"
+    
+    @classmethod
+    def get_insights(cls, window):
+        """Return insights for the last `window` processed entries, or None if there are none"""
+        snapshot = cls.objects.filter(window=window).first()
+        if snapshot is None:
+            snapshot = cls.refresh(window)
+        return snapshot.insights
+    
+    @classmethod
+    def stored_insights(cls, window):
+        """Return the stored insights for `window` without ever refreshing, or None if there is no snapshot yet"""
+        return cls.objects.filter(window=window).values_list('insights', flat=True).first()
+    
+    @classmethod
+    def refresh(cls, window):
+        """Recompute the snapshot for one window from the current entries"""
+        entries = list(ContextEntry.objects.filter(processed=True).order_by('-timestamp')[:window])
+        
+        insights = None
+        if entries:
+            from ai_module.services import ai_service
+            insights = ai_service.analyze_context(entries)
+        
+        snapshot, _ = cls.objects.update_or_create(
+            window=window,
+            defaults={
+                'entry_ids': [entry.id for entry in entries],
+                'oldest_timestamp': entries[-1].timestamp if entries else None,
+                'insights': insights,
+            }
+        )
+        return snapshot
+    
+    @classmethod
+    def refresh_all(cls):
+        for window in cls.WINDOWS:
+            cls.refresh(window)
+    
+    @classmethod
+    def entry_changed(cls, entry, deleted=False):
+        """Schedule a refresh of only the snapshots whose window is affected by this entry"""
+        from .processing import schedule_snapshot_refresh
+        
+        snapshots = {snapshot.window: snapshot for snapshot in cls.objects.all()}
+        affected_windows = []
+        
+        for window in cls.WINDOWS:
+            snapshot = snapshots.get(window)
+            
+            if snapshot is not None and entry.id in snapshot.entry_ids:
+                affected = True
+            elif deleted or not entry.processed:
+                affected = False
+            elif snapshot is None:
+                affected = True
+            else:
+                affected = (
+                    len(snapshot.entry_ids) < window or
+                    snapshot.oldest_timestamp is None or
+                    entry.timestamp >= snapshot.oldest_timestamp
+                )
+            
+            if affected:
+                affected_windows.append(window)
+        
+        if affected_windows:
+            transaction.on_commit(lambda: schedule_snapshot_refresh(affected_windows))
+
+class ContextProcessingJob(models.Model):
+    """A resumable bulk analysis run over unprocessed context entries.
+    
+    Entries are processed in id order up to max_entry_id. last_entry_id is
+    committed together with each written chunk, so an interrupted job picks up
+    after the last chunk it finished (see context.processing). claim_token
+    identifies the runner that currently owns the job; checkpoints from any
+    other runner are refused.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    max_entry_id = models.BigIntegerField(default=0)
+    last_entry_id = models.BigIntegerField(default=0)
+    total_entries = models.PositiveIntegerField(default=0)
+    processed_count = models.PositiveIntegerField(default=0)
+    failed_count = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    claim_token = models.UUIDField(null=True, blank=True, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"Context processing job {self.id} ({self.status})"
 
 class UserPreference(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
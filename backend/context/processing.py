@@ -0,0 +1,345 @@
+"""
+Parallel, resumable bulk processing of context entries.
+
+A ContextProcessingJob covers the unprocessed entries that exist when it is
+created. run_job() reads their ids and contents in keyset-paginated chunks
+and analyzes the chunks in a process pool, because the analysis (regexes,
+TextBlob) is CPU bound and holds the GIL. Each chunk is written back with one
+bulk_update. The job's checkpoint is advanced in the same transaction, so
+rerunning an interrupted job continues after the last chunk it wrote.
+
+Claiming a job stores a fresh claim token on it, and every checkpoint UPDATE
+matches on that token. When a slow runner is taken over as stale, its next
+chunk is rolled back and it stops, so the two runners never both count work.
+
+AI_CONTEXT_PROCESSING['BACKEND'] selects who runs jobs started from the API:
+  'thread' - a background thread in the web process, once the request commits
+  'worker' - only the process_context_entries management command
+  'sync'   - inline in the request
+
+ContextSnapshot refreshes triggered by single entry writes use the same
+background thread, except with the 'sync' backend, where they run inline
+once the write commits.
+"""
+
+import multiprocessing
+import os
+import threading
+import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import timedelta
+from types import SimpleNamespace
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+
+PROCESSED_FIELDS = ['insights', 'sentiment_score', 'keywords', 'urgency_indicators', 'processed']
+
+_executors = {}
+_executor_lock = threading.Lock()
+
+# Snapshot windows waiting for the refresh thread; writes arriving together share one refresh
+_pending_windows = set()
+_pending_lock = threading.Lock()
+
+
+class JobTakenOver(Exception):
+    """Another runner claimed the job; this runner must stop without writing"""
+
+
+def get_config():
+    config = getattr(settings, 'AI_CONTEXT_PROCESSING', {})
+    return {
+        'BACKEND': config.get('BACKEND', 'thread'),
+        'WORKERS': config.get('WORKERS') or os.cpu_count() or 1,
+        'CHUNK_SIZE': config.get('CHUNK_SIZE', 500),
+        'STALE_AFTER': config.get('STALE_AFTER', 600),
+    }
+
+
+def get_or_create_job():
+    """Return (job, created): the unfinished job, or a new one covering the current backlog"""
+    from .models import ContextEntry, ContextProcessingJob
+
+    job = ContextProcessingJob.objects.exclude(status='completed').first()
+    if job is not None:
+        return job, False
+    backlog = ContextEntry.objects.filter(processed=False)
+    job = ContextProcessingJob.objects.create(
+        total_entries=backlog.count(),
+        max_entry_id=backlog.aggregate(max_id=Max('id'))['max_id'] or 0,
+    )
+    return job, True
+
+
+def start_job():
+    """Get or create the job (see get_or_create_job) and schedule it per the configured backend.
+
+    A failed job, or a running one that stopped checkpointing more than
+    STALE_AFTER seconds ago, is resumed rather than replaced.
+    """
+    job, created = get_or_create_job()
+
+    if job.status != 'running' or _is_stale(job):
+        backend = get_config()['BACKEND']
+        if backend == 'sync':
+            if claim_job(job):
+                run_job(job)
+        elif backend == 'thread':
+            transaction.on_commit(lambda: _get_executor().submit(_run_in_thread, job.id))
+    return job, created
+
+
+def claim_job(job, force=False):
+    """Atomically mark a job as running; False when another runner owns it"""
+    from .models import ContextProcessingJob
+
+    claimable = Q(status__in=['pending', 'failed'])
+    if force:
+        claimable |= Q(status='running')
+    else:
+        stale_before = timezone.now() - timedelta(seconds=get_config()['STALE_AFTER'])
+        claimable |= Q(status='running', updated_at__lt=stale_before)
+
+    now = timezone.now()
+    claimed = ContextProcessingJob.objects.filter(claimable, id=job.id).update(
+        status='running', error='', claim_token=uuid.uuid4(), started_at=now, updated_at=now
+    )
+    if claimed:
+        job.refresh_from_db()
+    return bool(claimed)
+
+
+def run_job(job, workers=None, chunk_size=None, progress=None):
+    """Process a claimed job from its checkpoint and record the outcome.
+
+    progress(job) is called after every chunk is written.
+    """
+    from .models import ContextSnapshot
+
+    config = get_config()
+    workers = workers or config['WORKERS']
+    chunk_size = chunk_size or config['CHUNK_SIZE']
+
+    try:
+        chunks = _read_chunks(job, chunk_size)
+        for chunk, results in _analyze_chunks(chunks, workers):
+            _write_chunk(job, chunk, results)
+            if progress is not None:
+                progress(job)
+    except JobTakenOver:
+        print(f"Context processing job {job.id} was taken over by another runner")
+        return job
+    except Exception as e:
+        print(f"Error in context processing job {job.id}: {e}")
+        job.status = 'failed'
+        job.error = str(e)
+        _save_if_owned(job, status='failed', error=job.error)
+        return job
+
+    job.status = 'completed'
+    job.finished_at = timezone.now()
+    if not _save_if_owned(job, status='completed', finished_at=job.finished_at):
+        print(f"Context processing job {job.id} was taken over by another runner")
+        return job
+
+    # bulk_update skips the post_save signal, so refresh the snapshots once here
+    if job.processed_count:
+        ContextSnapshot.refresh_all()
+    return job
+
+
+def analyze_chunk(chunk):
+    """Analyze [(entry_id, content)] and return [(entry_id, insights or None)].
+
+    The chunk goes through AITaskManager.analyze_context_batch in one call; if
+    that fails, entries are retried one at a time so a bad entry only fails
+    itself.
+
+    Runs in pool worker processes, which never touch the database: _init_worker
+    swaps a 'django' insight cache, which may be database-backed, for a
+    process-local one.
+    """
+    from ai_module.services import ai_service
+
+    entries = [SimpleNamespace(content=content) for _, content in chunk]
+    try:
+        return list(zip([entry_id for entry_id, _ in chunk], ai_service.analyze_context_batch(entries)))
+    except Exception as e:
+        print(f"Error processing chunk, retrying its entries one by one: {e}")
+
+    results = []
+    for (entry_id, _), entry in zip(chunk, entries):
+        try:
+            insights = ai_service.analyze_context_batch([entry])[0]
+        except Exception as e:
+            print(f"Error processing entry {entry_id}: {e}")
+            insights = None
+        results.append((entry_id, insights))
+    return results
+
+
+def _read_chunks(job, chunk_size):
+    """Yield [(id, content)] chunks of the job's remaining entries in id order"""
+    from .models import ContextEntry
+
+    cursor = job.last_entry_id
+    while True:
+        # Keyset pagination: one short query per chunk and no long-lived cursor
+        chunk = list(
+            ContextEntry.objects.filter(processed=False, id__gt=cursor, id__lte=job.max_entry_id)
+            .order_by('id')
+            .values_list('id', 'content')[:chunk_size]
+        )
+        if not chunk:
+            return
+        cursor = chunk[-1][0]
+        yield chunk
+
+
+def _analyze_chunks(chunks, workers):
+    """Yield (chunk, results) in input order, keeping at most 2 * workers chunks in flight"""
+    if workers <= 1:
+        for chunk in chunks:
+            yield chunk, analyze_chunk(chunk)
+        return
+
+    # Fresh interpreters rather than fork: the parent may be a threaded web
+    # server holding open database connections
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker) as pool:
+        in_flight = deque()
+        for chunk in chunks:
+            in_flight.append((chunk, pool.submit(analyze_chunk, chunk)))
+            if len(in_flight) >= workers * 2:
+                chunk, future = in_flight.popleft()
+                yield chunk, future.result()
+        while in_flight:
+            chunk, future = in_flight.popleft()
+            yield chunk, future.result()
+
+
+def _init_worker():
+    import django
+    django.setup()
+
+    from ai_module.cache import InsightCache
+    from ai_module.services import ai_service
+
+    cache = ai_service.insight_cache
+    if cache.backend != 'local':
+        ai_service.insight_cache = InsightCache(backend='local', max_entries=cache.max_entries, ttl=cache.ttl)
+
+
+def _write_chunk(job, chunk, results):
+    """Write one analyzed chunk and advance the job's checkpoint atomically"""
+    from ai_module.text_index import link_related_tasks
+    from .models import ContextEntry
+
+    contents = dict(chunk)
+    entries = []
+    failed = 0
+    for entry_id, insights in results:
+        if insights is None:
+            failed += 1
+            continue
+        entry = ContextEntry(id=entry_id, content=contents[entry_id])
+        entry.apply_insights(insights)
+        entries.append(entry)
+
+    with transaction.atomic():
+        # Advance the checkpoint first: if the job changed hands, nothing is written
+        owned = _save_if_owned(
+            job,
+            last_entry_id=chunk[-1][0],
+            processed_count=job.processed_count + len(entries),
+            failed_count=job.failed_count + failed,
+        )
+        if not owned:
+            raise JobTakenOver()
+        ContextEntry.objects.bulk_update(entries, PROCESSED_FIELDS)
+        job.last_entry_id = chunk[-1][0]
+        job.processed_count += len(entries)
+        job.failed_count += failed
+
+    try:
+        link_related_tasks(entries)
+    except Exception as e:
+        print(f"Error linking related tasks: {e}")
+
+
+def _save_if_owned(job, **fields):
+    """Write fields to the job only while it still carries this runner's claim token"""
+    from .models import ContextProcessingJob
+
+    return bool(ContextProcessingJob.objects.filter(
+        id=job.id, status='running', claim_token=job.claim_token
+    ).update(updated_at=timezone.now(), **fields))
+
+
+def schedule_snapshot_refresh(windows):
+    """Refresh the given ContextSnapshot windows; call only once the triggering write has committed"""
+    from .models import ContextSnapshot
+
+    if get_config()['BACKEND'] == 'sync':
+        for window in windows:
+            ContextSnapshot.refresh(window)
+        return
+
+    with _pending_lock:
+        idle = not _pending_windows
+        _pending_windows.update(windows)
+    if idle:
+        _get_refresh_executor().submit(_refresh_snapshots_in_thread)
+
+
+def _refresh_snapshots_in_thread():
+    from .models import ContextSnapshot
+
+    close_old_connections()
+    try:
+        with _pending_lock:
+            windows = sorted(_pending_windows)
+            _pending_windows.clear()
+        for window in windows:
+            ContextSnapshot.refresh(window)
+    except Exception as e:
+        print(f"Error refreshing context snapshots: {e}")
+    finally:
+        close_old_connections()
+
+
+def _is_stale(job):
+    return job.updated_at < timezone.now() - timedelta(seconds=get_config()['STALE_AFTER'])
+
+
+def _get_executor():
+    return _named_executor('context-processing')
+
+
+def _get_refresh_executor():
+    # Separate from the job thread so snapshots stay fresh while a bulk job runs
+    return _named_executor('context-snapshots')
+
+
+def _named_executor(name):
+    with _executor_lock:
+        if name not in _executors:
+            _executors[name] = ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+        return _executors[name]
+
+
+def _run_in_thread(job_id):
+    from .models import ContextProcessingJob
+
+    close_old_connections()
+    try:
+        job = ContextProcessingJob.objects.get(id=job_id)
+        if claim_job(job):
+            run_job(job)
+    except Exception as e:
+        print(f"Error running context processing job {job_id}: {e}")
+    finally:
+        close_old_connections()
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import ContextEntry, UserPreference
+from .models import ContextEntry, ContextProcessingJob, UserPreference
 
 class ContextEntrySerializer(serializers.ModelSerializer):
     processed_insights = serializers.SerializerMethodField()
@@ -9,8 +9,9 @@ class ContextEntrySerializer(serializers.ModelSerializer):
         fields = [
             'id', 'content', 'source_type', 'timestamp', 'processed',
             'insights', 'sentiment_score', 'keywords', 'urgency_indicators',
-            'processed_insights'
+            'related_tasks', 'processed_insights'
         ]
+        read_only_fields = ['related_tasks']
     
     def get_processed_insights(self, obj):
         if obj.processed and obj.insights:
@@ -38,12 +39,15 @@ class ContextEntryCreateSerializer(serializers.ModelSerializer):
             # Process context with AI
             insights = ai_service.analyze_context([context_entry])
             
-            context_entry.insights = insights
-            context_entry.sentiment_score = insights.get('sentiment', 0)
-            context_entry.keywords = insights.get('keywords', [])
-            context_entry.urgency_indicators = insights.get('urgency_indicators', [])
-            context_entry.processed = True
+            context_entry.apply_insights(insights)
             context_entry.save()
+            
+            # Link the entry to the open tasks it talks about
+            try:
+                from ai_module.text_index import link_related_tasks
+                link_related_tasks([context_entry])
+            except Exception as e:
+                print(f"Error linking related tasks: {e}")
         
         return context_entry
 
@@ -51,3 +55,21 @@ class UserPreferenceSerializer(serializers.ModelSerializer):
     class Meta:
         model = UserPreference
         exclude = ['user']
+
+class ContextProcessingJobSerializer(serializers.ModelSerializer):
+    progress = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = ContextProcessingJob
+        fields = [
+            'id', 'status', 'total_entries', 'processed_count', 'failed_count',
+            'progress', 'last_entry_id', 'error', 'created_at', 'started_at', 'finished_at'
+        ]
+        read_only_fields = fields
+    
+    def get_progress(self, obj):
+        if obj.status == 'completed':
+            return 1.0
+        if not obj.total_entries:
+            return 0.0
+        return round(min(1.0, (obj.processed_count + obj.failed_count) / obj.total_entries), 4)
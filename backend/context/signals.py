@@ -0,0 +1,27 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import ContextEntry, ContextSnapshot
+
+@receiver(post_save, sender=ContextEntry)
+def refresh_snapshot_on_save(sender, instance, **kwargs):
+    ContextSnapshot.entry_changed(instance)
+
+@receiver(post_save, sender=ContextEntry)
+def update_vector_index(sender, instance, created=False, update_fields=None, **kwargs):
+    from ai_module import vector_index
+    
+    if created or update_fields is None or 'content' in update_fields:
+        # The index lives on disk, outside the transaction; only record committed changes
+        transaction.on_commit(lambda: vector_index.index_context_entries([instance]))
+
+@receiver(post_delete, sender=ContextEntry)
+def refresh_snapshot_on_delete(sender, instance, **kwargs):
+    ContextSnapshot.entry_changed(instance, deleted=True)
+
+@receiver(post_delete, sender=ContextEntry)
+def remove_from_vector_index(sender, instance, **kwargs):
+    from ai_module import vector_index
+    
+    entry_id = instance.id
+    transaction.on_commit(lambda: vector_index.remove('context', [entry_id]))
@@ -1,3 +1,194 @@
-from django.test import TestCase
+from unittest import mock
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from ai_module.services import ai_service
+from ai_module.text_index import find_related_tasks
+from tasks.models import Task
+from tasks.tests import QueryBudgetMixin, top_up
+from . import processing
+from .models import ContextEntry, ContextProcessingJob, ContextSnapshot, UserPreference
 
-# Create your tests here.
+
+class ContextEndpointQueryBudgetTests(QueryBudgetMixin, TestCase):
+    def test_entry_list(self):
+        task = Task.objects.create(title='Prepare slides')
+
+        def make_rows(rows):
+            top_up(ContextEntry, rows, lambda i: ContextEntry(content=f'Note {i}', source_type='notes'))
+            Link = ContextEntry.related_tasks.through
+            Link.objects.bulk_create(
+                [Link(contextentry_id=entry_id, task_id=task.id) for entry_id in ContextEntry.objects.values_list('id', flat=True)],
+                ignore_conflicts=True
+            )
+        self.assertQueryBudget('/api/v1/context/entries/', 3, make_rows)
+
+    def test_preference_list(self):
+        def make_rows(rows):
+            top_up(User, rows, lambda i: User(username=f'user{i}'))
+            existing = set(UserPreference.objects.values_list('user_id', flat=True))
+            UserPreference.objects.bulk_create([
+                UserPreference(user_id=user_id)
+                for user_id in User.objects.values_list('id', flat=True) if user_id not in existing
+            ])
+        self.assertQueryBudget('/api/v1/context/preferences/', 2, make_rows)
+
+    def test_processing_job_list(self):
+        def make_rows(rows):
+            top_up(ContextProcessingJob, rows, lambda i: ContextProcessingJob(status='completed'))
+        self.assertQueryBudget('/api/v1/context/processing-jobs/', 2, make_rows)
+
+
+@override_settings(AI_CONTEXT_PROCESSING={'BACKEND': 'sync'})
+class ContextSnapshotRefreshTests(TestCase):
+    def test_refresh_waits_for_commit(self):
+        ContextSnapshot.refresh_all()
+        with mock.patch.object(ContextSnapshot, 'refresh', wraps=ContextSnapshot.refresh) as refresh:
+            with self.captureOnCommitCallbacks() as callbacks:
+                for i in range(3):
+                    ContextEntry.objects.create(content=f'Deadline note {i}', source_type='notes', processed=True)
+                refresh.assert_not_called()
+            for callback in callbacks:
+                callback()
+
+        # Inline 'sync' refreshes run per committed write; nothing ran inside the transaction
+        self.assertEqual(refresh.call_count, 3 * len(ContextSnapshot.WINDOWS))
+        snapshot = ContextSnapshot.objects.get(window=5)
+        self.assertEqual(len(snapshot.entry_ids), 3)
+
+    def test_threaded_refreshes_coalesce(self):
+        ContextSnapshot.refresh_all()
+        with mock.patch.object(processing, 'get_config', return_value={'BACKEND': 'thread'}), \
+                mock.patch.object(processing, '_get_executor') as get_executor, \
+                mock.patch.object(processing, '_get_refresh_executor') as get_refresh_executor:
+            processing.schedule_snapshot_refresh([5])
+            processing.schedule_snapshot_refresh([5, 10])
+
+        # The second call found a refresh already queued and folded its windows into it
+        get_refresh_executor.return_value.submit.assert_called_once_with(processing._refresh_snapshots_in_thread)
+        # Refreshes never queue behind a processing job
+        get_executor.assert_not_called()
+        with mock.patch.object(ContextSnapshot, 'refresh') as refresh, \
+                mock.patch.object(processing, 'close_old_connections'):
+            processing._refresh_snapshots_in_thread()
+        self.assertEqual([call.args[0] for call in refresh.call_args_list], [5, 10])
+
+
+class ContextProcessingJobTests(TestCase):
+    def setUp(self):
+        ContextEntry.objects.bulk_create([
+            ContextEntry(content=f'Urgent: send report {i} by Friday', source_type='notes') for i in range(6)
+        ])
+        self.entry_ids = list(ContextEntry.objects.order_by('id').values_list('id', flat=True))
+
+    def claimed_job(self):
+        job, _ = processing.get_or_create_job()
+        self.assertTrue(processing.claim_job(job))
+        return job
+
+    def test_resume_after_interrupt(self):
+        job = self.claimed_job()
+
+        def interrupt(job):
+            raise RuntimeError('worker killed')
+        processing.run_job(job, workers=1, chunk_size=2, progress=interrupt)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+        self.assertEqual(job.last_entry_id, self.entry_ids[1])
+        self.assertEqual(job.processed_count, 2)
+
+        with mock.patch.object(processing, 'analyze_chunk', wraps=processing.analyze_chunk) as analyze:
+            self.assertTrue(processing.claim_job(job))
+            processing.run_job(job, workers=1, chunk_size=2)
+
+        # Only the entries after the checkpoint were analyzed again
+        analyzed = [entry_id for call in analyze.call_args_list for entry_id, _ in call.args[0]]
+        self.assertEqual(analyzed, self.entry_ids[2:])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.processed_count, job.failed_count), ('completed', 6, 0))
+        self.assertFalse(ContextEntry.objects.filter(processed=False).exists())
+
+    def test_failed_entries_are_counted_and_left_unprocessed(self):
+        bad_id = self.entry_ids[3]
+        ContextEntry.objects.filter(id=bad_id).update(content='unparseable')
+        analyze_context_batch = ai_service.analyze_context_batch
+
+        def flaky(entries):
+            if any(entry.content == 'unparseable' for entry in entries):
+                raise ValueError('bad entry')
+            return analyze_context_batch(entries)
+
+        job = self.claimed_job()
+        with mock.patch.object(ai_service, 'analyze_context_batch', side_effect=flaky):
+            processing.run_job(job, workers=1, chunk_size=4)
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.processed_count, job.failed_count), ('completed', 5, 1))
+        self.assertEqual(list(ContextEntry.objects.filter(processed=False).values_list('id', flat=True)), [bad_id])
+
+    def test_runner_that_lost_its_claim_stops_without_writing(self):
+        job = self.claimed_job()
+        takeover = ContextProcessingJob.objects.get(id=job.id)
+        self.assertTrue(processing.claim_job(takeover, force=True))
+
+        processing.run_job(job, workers=1, chunk_size=2)
+
+        takeover.refresh_from_db()
+        self.assertEqual((takeover.status, takeover.processed_count, takeover.last_entry_id), ('running', 0, 0))
+        self.assertFalse(ContextEntry.objects.filter(processed=True).exists())
+
+        processing.run_job(takeover, workers=1, chunk_size=2)
+        takeover.refresh_from_db()
+        self.assertEqual((takeover.status, takeover.processed_count), ('completed', 6))
+
+    @override_settings(AI_CONTEXT_PROCESSING={'BACKEND': 'worker'})
+    def test_bulk_process_queues_a_job(self):
+        response = self.client.post('/api/v1/context/entries/bulk_process/')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['job']['status'], 'pending')
+        self.assertEqual(response.data['job']['total_entries'], 6)
+
+        response = self.client.post('/api/v1/context/entries/bulk_process/')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['message'], 'Resumed unfinished processing job')
+        self.assertEqual(ContextProcessingJob.objects.count(), 1)
+
+    @override_settings(AI_CONTEXT_PROCESSING={'BACKEND': 'sync', 'WORKERS': 1})
+    def test_bulk_process_sync_backend_runs_the_job(self):
+        response = self.client.post('/api/v1/context/entries/bulk_process/')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['job']['status'], 'completed')
+        self.assertEqual(response.data['processed_count'], 6)
+
+
+@override_settings(AI_RELATED_TASKS={'MIN_SCORE': 0.15})
+class RelatedTaskLinkingTests(TestCase):
+    def setUp(self):
+        self.report = Task.objects.create(title='Send quarterly report to the client', description='Include the revenue numbers')
+        self.draft = Task.objects.create(title='Review report draft', status='in_progress')
+        self.closed = Task.objects.create(title='Send quarterly report', description='to the client', status='completed')
+        # Shares only "send", scoring about 0.11
+        self.offsite = Task.objects.create(
+            title='Plan team offsite',
+            description='Book venue, order catering, arrange transport, send invitations to the whole team'
+        )
+        Task.objects.create(title='Buy groceries')
+        self.entry = ContextEntry.objects.create(
+            content='Urgent: send the quarterly report to the client by Friday', source_type='email'
+        )
+
+    def test_processing_links_open_tasks_in_rank_order(self):
+        job, _ = processing.get_or_create_job()
+        self.assertTrue(processing.claim_job(job))
+        processing.run_job(job, workers=1)
+
+        Link = ContextEntry.related_tasks.through
+        linked = list(Link.objects.filter(contextentry_id=self.entry.id).order_by('id').values_list('task_id', flat=True))
+        self.assertEqual(linked, [self.report.id, self.draft.id])
+
+    def test_closed_and_weak_matches_are_not_related(self):
+        [related] = find_related_tasks([self.entry.content], min_score=0)
+        self.assertEqual([task_id for task_id, _ in related], [self.report.id, self.draft.id, self.offsite.id])
+        [related] = find_related_tasks([self.entry.content])
+        self.assertEqual([task_id for task_id, _ in related], [self.report.id, self.draft.id])
+        self.assertNotIn(self.closed.id, [task_id for task_id, _ in related])
@@ -1,10 +1,11 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import ContextEntryViewSet, UserPreferenceViewSet
+from .views import ContextEntryViewSet, ContextProcessingJobViewSet, UserPreferenceViewSet
 
 router = DefaultRouter()
 router.register(r'entries', ContextEntryViewSet)
 router.register(r'preferences', UserPreferenceViewSet)
+router.register(r'processing-jobs', ContextProcessingJobViewSet)
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -3,12 +3,17 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.utils import timezone
 from datetime import timedelta
-from .models import ContextEntry, UserPreference
-from .serializers import ContextEntrySerializer, ContextEntryCreateSerializer, UserPreferenceSerializer
+from .models import ContextEntry, ContextProcessingJob, UserPreference
+from .serializers import (
+    ContextEntrySerializer, ContextEntryCreateSerializer, ContextProcessingJobSerializer, UserPreferenceSerializer
+)
 from ai_module.services import ai_service
+from .processing import start_job
+from smart_todo.pagination import KeysetPagination
 
 class ContextEntryViewSet(viewsets.ModelViewSet):
     queryset = ContextEntry.objects.all()
+    pagination_class = KeysetPagination
     
     def get_serializer_class(self):
         if self.action == 'create':
@@ -16,7 +21,7 @@ class ContextEntryViewSet(viewsets.ModelViewSet):
         return ContextEntrySerializer
     
     def get_queryset(self):
-        queryset = ContextEntry.objects.all()
+        queryset = ContextEntry.objects.prefetch_related('related_tasks')
         
         # Filter by date range
         days = self.request.query_params.get('days', 7)
@@ -67,27 +72,15 @@ class ContextEntryViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['post'])
     def bulk_process(self, request):
-        """Process multiple context entries with AI"""
-        unprocessed_entries = ContextEntry.objects.filter(processed=False)
-        
-        processed_count = 0
-        for entry in unprocessed_entries:
-            try:
-                insights = ai_service.analyze_context([entry])
-                entry.insights = insights
-                entry.sentiment_score = insights.get('sentiment', 0)
-                entry.keywords = insights.get('keywords', [])
-                entry.urgency_indicators = insights.get('urgency_indicators', [])
-                entry.processed = True
-                entry.save()
-                processed_count += 1
-            except Exception as e:
-                print(f"Error processing entry {entry.id}: {e}")
+        """Start (or resume) a background job that processes every unprocessed entry"""
+        job, created = start_job()
+        job.refresh_from_db()
         
         return Response({
-            'message': f'Processed {processed_count} context entries',
-            'processed_count': processed_count
-        })
+            'message': f'Processing {job.total_entries} context entries' if created else 'Resumed unfinished processing job',
+            'job': ContextProcessingJobSerializer(job).data,
+            'processed_count': job.processed_count
+        }, status=status.HTTP_202_ACCEPTED)
     
     @action(detail=False, methods=['get'])
     def analytics(self, request):
@@ -147,6 +140,11 @@ class ContextEntryViewSet(viewsets.ModelViewSet):
         
         return dict(sorted(day_counts.items(), key=lambda x: x[1], reverse=True))
 
+class ContextProcessingJobViewSet(viewsets.ReadOnlyModelViewSet):
+    """Progress of bulk processing jobs started by entries/bulk_process"""
+    queryset = ContextProcessingJob.objects.all()
+    serializer_class = ContextProcessingJobSerializer
+
 class UserPreferenceViewSet(viewsets.ModelViewSet):
     queryset = UserPreference.objects.all()
     serializer_class = UserPreferenceSerializer
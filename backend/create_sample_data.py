@@ -18,6 +18,7 @@ django.setup()
 from django.contrib.auth.models import User
 from tasks.models import Task, Category
 from context.models import ContextEntry, UserPreference
+from ai_module.routing import ProviderUnavailable
 from ai_module.services import ai_service
 
 def create_sample_categories():
@@ -249,10 +250,14 @@ def create_sample_tasks(categories):
             if recent_context:
                 context_data = ai_service.analyze_context(recent_context)
             
-            # Enhance description
-            enhanced_description = ai_service.enhance_task_description(
-                task.title, task.description, context_data
-            )
+            # Enhance description, keeping the original text when no provider answers
+            try:
+                enhanced_description = ai_service.enhance_task_description(
+                    task.title, task.description, context_data
+                )
+            except ProviderUnavailable as e:
+                print(f"Error enhancing task description: {e}")
+                enhanced_description = task.description
             task.ai_enhanced_description = enhanced_description
             
             # Calculate priority score
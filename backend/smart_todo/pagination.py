@@ -0,0 +1,196 @@
+"""
+Keyset (cursor) pagination for long, frequently scrolled lists.
+
+A page is selected with a WHERE clause on the ordering columns of the row
+the client saw last, never with OFFSET. With a composite index matching the
+ordering, every page costs one short index range scan however deep the
+client has scrolled. The ordering comes from the queryset (or the model's
+Meta.ordering). Its fields must be non-null columns on the model itself. The
+primary key is appended as a tiebreaker, so rows with equal sort values are
+neither skipped nor repeated.
+
+A full COUNT(*) on every page would cost as much as OFFSET. ?count= (default
+KEYSET_PAGINATION['COUNT']) chooses what the response reports:
+  'exact'    - COUNT(*) over the whole filtered list
+  'estimate' - counts at most COUNT_CAP rows; longer lists report the
+               planner's row estimate on PostgreSQL and COUNT_CAP elsewhere,
+               with count_exact false
+  'none'     - no count
+"""
+
+import base64
+import binascii
+import json
+from functools import reduce
+from operator import or_
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured, ValidationError
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+COUNT_MODES = ('exact', 'estimate', 'none')
+
+
+def get_config():
+    config = getattr(settings, 'KEYSET_PAGINATION', {})
+    return {
+        'COUNT': config.get('COUNT', 'estimate'),
+        'COUNT_CAP': config.get('COUNT_CAP', 1000),
+        'MAX_PAGE_SIZE': config.get('MAX_PAGE_SIZE', 100),
+    }
+
+
+class KeysetPagination(BasePagination):
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    count_query_param = 'count'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        config = get_config()
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request, config)
+        self.fields = self.get_ordering_fields(queryset)
+        position, reverse = self.decode_cursor(request)
+
+        self.count, self.count_exact = self.get_count(queryset, request, config)
+
+        ordering = [(field, descending != reverse) for field, descending in self.fields]
+        queryset = queryset.order_by(*[f"{'-' if descending else ''}{field.name}" for field, descending in ordering])
+        if position is not None:
+            queryset = queryset.filter(_after(ordering, position))
+
+        # One extra row tells whether another page follows
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        self.has_next = position is not None if reverse else has_more
+        self.has_previous = has_more if reverse else position is not None
+        self.first_position = self.get_position(rows[0]) if rows else position
+        self.last_position = self.get_position(rows[-1]) if rows else position
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response({
+            'count': self.count,
+            'count_exact': self.count_exact,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data
+        })
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(self.last_position, reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        return self.encode_cursor(self.first_position, reverse=True)
+
+    def get_page_size(self, request, config):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return api_settings.PAGE_SIZE or config['MAX_PAGE_SIZE']
+        return max(1, min(page_size, config['MAX_PAGE_SIZE']))
+
+    def get_ordering_fields(self, queryset):
+        """[(field, descending)] for the queryset's ordering, ending with the primary key"""
+        model = queryset.model
+        ordering = queryset.query.order_by or model._meta.ordering
+        fields = []
+        for name in ordering:
+            if not isinstance(name, str):
+                raise ImproperlyConfigured(f"Keyset pagination cannot order by expression {name!r}")
+            try:
+                field = model._meta.get_field(name.lstrip('-'))
+            except FieldDoesNotExist:
+                raise ImproperlyConfigured(f"Keyset pagination needs model fields; cannot order by {name!r}")
+            if field.null:
+                raise ImproperlyConfigured(f"Keyset pagination cannot order by nullable field {name!r}")
+            fields.append((field, name.startswith('-')))
+        if not any(field.primary_key for field, _ in fields):
+            fields.append((model._meta.pk, fields[-1][1] if fields else True))
+        return fields
+
+    def get_position(self, obj):
+        return [field.value_to_string(obj) for field, _ in self.fields]
+
+    def get_count(self, queryset, request, config):
+        """(count or None, whether the count is exact)"""
+        mode = request.query_params.get(self.count_query_param, config['COUNT'])
+        if mode not in COUNT_MODES:
+            mode = config['COUNT']
+        if mode == 'none':
+            return None, False
+        queryset = queryset.order_by()
+        if mode == 'exact':
+            return queryset.count(), True
+
+        cap = config['COUNT_CAP']
+        # COUNT over a LIMITed subquery reads at most cap + 1 rows
+        count = queryset[:cap + 1].count()
+        if count <= cap:
+            return count, True
+        return max(cap, _planner_estimate(queryset) or 0), False
+
+    def decode_cursor(self, request):
+        """(position or None, reverse) from the request's cursor"""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            padding = '=' * (-len(encoded) % 4)
+            cursor = json.loads(base64.urlsafe_b64decode(encoded + padding))
+            values = cursor['p']
+            if len(values) != len(self.fields):
+                raise ValueError('cursor does not match the ordering')
+            position = [field.to_python(value) for (field, _), value in zip(self.fields, values)]
+            return position, bool(cursor.get('r'))
+        except (TypeError, ValueError, KeyError, binascii.Error, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, position, reverse):
+        cursor = {'p': [str(value) for value in position]}
+        if reverse:
+            cursor['r'] = 1
+        encoded = base64.urlsafe_b64encode(json.dumps(cursor, separators=(',', ':')).encode()).decode().rstrip('=')
+        url = remove_query_param(self.base_url, self.cursor_query_param)
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+
+def _after(ordering, position):
+    """Rows strictly after position in [(field, descending)] order"""
+    clauses = []
+    equal = Q()
+    for (field, descending), value in zip(ordering, position):
+        lookup = 'lt' if descending else 'gt'
+        clauses.append(equal & Q(**{f'{field.name}__{lookup}': value}))
+        equal &= Q(**{field.name: value})
+
+    # The redundant bound on the leading column lets the database start an index range scan
+    (first, descending), value = ordering[0], position[0]
+    return Q(**{f"{first.name}__{'lte' if descending else 'gte'}": value}) & reduce(or_, clauses)
+
+
+def _planner_estimate(queryset):
+    """PostgreSQL's row estimate for queryset, or None on other databases"""
+    if connections[queryset.db].vendor != 'postgresql':
+        return None
+    try:
+        plan = json.loads(queryset.explain(format='json'))
+        return int(plan[0]['Plan']['Plan Rows'])
+    except Exception as e:
+        print(f"Row estimate error: {e}")
+        return None
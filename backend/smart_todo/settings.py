@@ -74,6 +74,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'smart_todo.wsgi.application'
+ASGI_APPLICATION = 'smart_todo.asgi.application'
 
 
 # Database
@@ -129,6 +130,9 @@ STATICFILES_DIRS = [
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Keeps the vector index, AI snapshot and category model written by tests out of var/
+TEST_RUNNER = 'smart_todo.test_runner.TestRunner'
+
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
@@ -157,3 +161,153 @@ CORS_ALLOW_ALL_ORIGINS = True  # For development only
 OPENAI_API_KEY = 'your-openai-api-key-here'
 ANTHROPIC_API_KEY = 'your-anthropic-api-key-here'
 LM_STUDIO_BASE_URL = 'http://localhost:1234'
+
+# Outbound AI provider HTTP: pooled keep-alive clients and per-provider
+# concurrency caps. Time spent queued for a slot counts against the request's
+# timeout, and a full queue is not treated as a provider failure.
+AI_HTTP = {
+    'POOL_SIZE': 10,  # keep-alive connections per provider client
+    'CONCURRENCY': {'openai': 16, 'anthropic': 16, 'lm_studio': 2},  # max in-flight requests
+    'QUEUE_TIMEOUT': 30.0,  # seconds a request may wait for a free slot
+}
+
+# Provider routing for task enhancement: providers are ranked by rolling error
+# rate and latency, a provider's circuit opens after FAILURE_THRESHOLD
+# consecutive failures for RESET_TIMEOUT seconds, and every request must finish
+# within DEADLINE seconds. Set HEDGE_AFTER (seconds) to race a second provider
+# against a slow first one.
+AI_PROVIDER_ROUTER = {
+    'ORDER': ['openai', 'anthropic', 'lm_studio'],
+    'DEADLINE': 30.0,
+    'HEDGE_AFTER': None,
+    'FAILURE_THRESHOLD': 3,
+    'RESET_TIMEOUT': 60.0,
+}
+
+# Context insight cache: 'local' keeps a per-process LRU, 'django' shares
+# entries through the cache named by CACHE_ALIAS. TTL is in seconds.
+AI_INSIGHT_CACHE = {
+    'BACKEND': 'local',
+    'MAX_ENTRIES': 1024,
+    'TTL': None,
+    'CACHE_ALIAS': 'default',
+}
+
+# Background enhancement of task descriptions: 'thread' drains the DB-backed
+# queue in-process, 'worker' leaves it to `manage.py process_enhancements`,
+# 'sync' enhances inside the request.
+AI_ENHANCEMENT_BACKEND = 'thread'
+AI_ENHANCEMENT_WORKERS = 2
+
+# Queued enhancements are packed into multi-task prompts. Token counts are
+# estimated at ~4 characters per token; a batch closes when the prompt budget,
+# MAX_OUTPUT_TOKENS // OUTPUT_TOKENS_PER_TASK or MAX_TASKS is reached.
+AI_BATCH_ENHANCEMENT = {
+    'PROMPT_TOKEN_BUDGET': 3000,
+    'OUTPUT_TOKENS_PER_TASK': 200,
+    'MAX_OUTPUT_TOKENS': 4000,
+    'MAX_TASKS': 20,
+}
+
+# Persistent cache of LLM completions (ai_module.LLMResponse), LRU-bounded.
+# Clear entries for a retired model with `manage.py clear_llm_cache --model <name>`.
+AI_LLM_CACHE = {
+    'ENABLED': True,
+    'MAX_ENTRIES': 5000,
+}
+
+# TF-IDF matching of processed context entries to open tasks (ai_module.text_index).
+# Rebuild the index (and the dedupe index) with `manage.py rebuild_task_index`.
+AI_RELATED_TASKS = {
+    'TOP_K': 5,
+    'MIN_SCORE': 0.1,
+    'MAX_QUERY_TERMS': 20,
+}
+
+# Near-duplicate detection over task titles and descriptions (ai_module.dedupe).
+# THRESHOLD is the estimated Jaccard similarity at which tasks count as duplicates.
+AI_DEDUPE = {
+    'THRESHOLD': 0.7,
+    'MAX_CANDIDATES': 200,
+}
+
+# Local semantic search (ai_module.vector_index): hashed embeddings in a
+# memory-mapped float32 index shared by all workers. Saves append to a delta,
+# which is compacted in the background once it holds MAX_DELTA_ROWS records;
+# `manage.py build_vector_index` compacts on demand (--rebuild to re-embed
+# everything from the database).
+AI_VECTOR_INDEX = {
+    'PATH': BASE_DIR / 'var' / 'vector_index',
+    'DIM': 256,
+    'NLIST': 1024,
+    'NPROBE': 8,
+    'MIN_SCORE': 0.1,
+    'MAX_DELTA_ROWS': 20000,
+    'ENABLED': True,
+}
+
+# Naive Bayes category classifier used by suggest_categories (ai_module.classifier).
+# Train with `manage.py train_category_model` (add --incremental to add only tasks categorized since);
+# until a model exists the keyword rules are used.
+AI_CATEGORY_MODEL = {
+    'PATH': BASE_DIR / 'var' / 'category_model.npz',
+    'FEATURES': 2 ** 15,
+    'ALPHA': 1.0,
+    'MIN_PROBABILITY': 0.2,
+    'CHECK_INTERVAL': 5,
+}
+
+# Shared analyzer snapshot (ai_module.artifacts): keyword vocabularies, stopwords and
+# category model weights in one memory-mapped file. Publish with
+# `manage.py publish_ai_snapshot`; workers pick up a new snapshot within CHECK_INTERVAL seconds.
+AI_SNAPSHOT = {
+    'PATH': BASE_DIR / 'var' / 'ai_snapshot',
+    'CHECK_INTERVAL': 5,
+    'KEEP': 3,
+    'ENABLED': True,
+}
+
+# Streaming analysis of context windows (ai_module.window_analysis). Entries are read
+# CHUNK_SIZE at a time; windows larger than MAX_ENTRIES are sampled uniformly
+# (None analyzes everything). KEYWORD_CAPACITY bounds the heavy-hitters sketch.
+AI_CONTEXT_ANALYSIS = {
+    'CHUNK_SIZE': 500,
+    'MAX_ENTRIES': 5000,
+    'KEYWORD_CAPACITY': 256,
+    'MAX_TIME_INDICATORS': 20,
+}
+
+# Bulk processing of context entries (context.processing). 'thread' runs jobs started
+# from entries/bulk_process in the web process, 'worker' leaves them to
+# `manage.py process_context_entries`, 'sync' runs them inside the request.
+# WORKERS analysis processes (None = CPU count) handle CHUNK_SIZE entries at a time.
+AI_CONTEXT_PROCESSING = {
+    'BACKEND': 'thread',
+    'WORKERS': None,
+    'CHUNK_SIZE': 500,
+    'STALE_AFTER': 600,  # seconds without a checkpoint before a running job may be taken over
+}
+
+# Cached dashboard statistics (tasks.stats). Task and Category saves retire the
+# snapshot; TIMEOUT bounds its age. Point CACHE_ALIAS at a shared cache when
+# running several workers.
+DASHBOARD_STATS = {
+    'CACHE_ALIAS': 'default',
+    'TIMEOUT': 300,
+}
+
+# Full-text task search (tasks.search). BACKEND None picks FTS5 on SQLite and a
+# GIN-indexed tsvector on PostgreSQL; MAX_TERMS caps the words matched per query.
+TASK_SEARCH = {
+    'BACKEND': None,
+    'MAX_TERMS': 8,
+}
+
+# Keyset pagination for the task and context entry lists (smart_todo.pagination).
+# COUNT is the default ?count= mode: 'exact', 'estimate' (exact up to COUNT_CAP
+# rows, then the PostgreSQL planner's estimate) or 'none'.
+KEYSET_PAGINATION = {
+    'COUNT': 'estimate',
+    'COUNT_CAP': 1000,
+    'MAX_PAGE_SIZE': 100,
+}
@@ -0,0 +1,31 @@
+import shutil
+import tempfile
+from pathlib import Path
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+# Settings whose PATH points at on-disk AI artifacts under var/
+ARTIFACT_SETTINGS = {
+    'AI_VECTOR_INDEX': 'vector_index',
+    'AI_SNAPSHOT': 'ai_snapshot',
+    'AI_CATEGORY_MODEL': 'category_model.npz',
+}
+
+
+class TestRunner(DiscoverRunner):
+    """Runs the suite with every AI artifact in a throwaway directory instead of var/"""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.artifact_dir = Path(tempfile.mkdtemp(prefix='smart-todo-tests-'))
+        self.artifact_settings = override_settings(**{
+            name: {**getattr(settings, name, {}), 'PATH': self.artifact_dir / filename}
+            for name, filename in ARTIFACT_SETTINGS.items()
+        })
+        self.artifact_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.artifact_settings.disable()
+        shutil.rmtree(self.artifact_dir, ignore_errors=True)
+        super().teardown_test_environment(**kwargs)
@@ -1,6 +1,20 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class TasksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tasks'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        post_migrate.connect(ensure_search_index, sender=self)
+
+
+def ensure_search_index(using='default', **kwargs):
+    # SQLite rebuilds tasks_task for some schema changes, dropping the FTS triggers
+    from django.db import connections
+    from .search import get_backend
+    
+    connection = connections[using]
+    get_backend(connection).ensure_installed(connection)
@@ -0,0 +1,45 @@
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from ai_module import jobs
+
+class Command(BaseCommand):
+    help = 'Run the AI enhancement worker that drains pending task enhancements'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Drain the current queue and exit'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=2.0,
+            help='Seconds to wait when the queue is empty'
+        )
+        parser.add_argument(
+            '--stale-after',
+            type=int,
+            default=10,
+            help='Minutes after which a task stuck in processing is requeued'
+        )
+
+    def handle(self, *args, **options):
+        stale_after = timedelta(minutes=options['stale_after'])
+
+        while True:
+            requeued = jobs.requeue_stale_enhancements(stale_after)
+            if requeued:
+                self.stdout.write(f'Requeued {requeued} stale enhancements')
+
+            processed = jobs.process_pending_enhancements()
+            if processed:
+                self.stdout.write(f'Enhanced {processed} tasks')
+
+            if options['once']:
+                break
+            if not processed:
+                time.sleep(options['poll_interval'])
+
+        self.stdout.write(self.style.SUCCESS('Enhancement queue drained'))
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from tasks.models import Task
+from context.models import ContextSnapshot
+from ai_module import scoring
+from ai_module.services import ai_service
+
+class Command(BaseCommand):
+    help = 'Recompute priority scores for all open tasks'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--mode',
+            choices=['db', 'python'],
+            default='db',
+            help='db: one UPDATE evaluated by the database; python: load rows and score them in-process'
+        )
+        parser.add_argument(
+            '--no-context',
+            action='store_true',
+            help='Ignore recent context keywords when scoring'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Rows per bulk_update in python mode'
+        )
+
+    def handle(self, *args, **options):
+        context_data = None if options['no_context'] else ContextSnapshot.get_insights(10)
+        context_keywords = context_data.get('keywords', []) if context_data else []
+        open_tasks = Task.objects.filter(status__in=scoring.OPEN_STATUSES)
+        now = timezone.now()
+
+        if options['mode'] == 'db':
+            updated = scoring.recompute_priority_scores(open_tasks, context_keywords=context_keywords, now=now)
+        else:
+            priority_scores = ai_service.prioritize_tasks(open_tasks, context_data)
+            tasks = [Task(id=task_id, priority_score=score) for task_id, score in priority_scores.items()]
+            Task.objects.bulk_update(tasks, ['priority_score'], batch_size=options['batch_size'])
+            updated = len(tasks)
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Recomputed priority scores for {updated} open tasks')
+        )
@@ -0,0 +1,73 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db.models import Min
+from django.utils import timezone
+from tasks.models import Task
+from context.models import ContextSnapshot
+from ai_module.scoring import OPEN_STATUSES
+from ai_module.services import ai_service
+
+class Command(BaseCommand):
+    help = 'Re-score open tasks whose time-based priority terms have changed, then sleep until the next change'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Process the currently due tasks and exit'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Tasks re-scored per batch'
+        )
+        parser.add_argument(
+            '--max-sleep',
+            type=float,
+            default=60.0,
+            help='Upper bound in seconds between checks, so newly created tasks are picked up'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            rescored = self.rescore_due_tasks(options['batch_size'])
+            next_change = Task.objects.filter(
+                status__in=OPEN_STATUSES,
+                priority_rescore_at__isnull=False
+            ).aggregate(next_change=Min('priority_rescore_at'))['next_change']
+
+            if rescored:
+                self.stdout.write(f'Re-scored {rescored} tasks')
+
+            if options['once']:
+                break
+
+            sleep_for = options['max_sleep']
+            if next_change is not None:
+                sleep_for = min(sleep_for, max(0.0, (next_change - timezone.now()).total_seconds()))
+            time.sleep(sleep_for)
+
+        self.stdout.write(self.style.SUCCESS('Priority scores are up to date'))
+
+    def rescore_due_tasks(self, batch_size):
+        """Re-score every open task whose next change time has passed"""
+        context_data = ContextSnapshot.get_insights(10)
+        rescored = 0
+
+        while True:
+            now = timezone.now()
+            due_tasks = list(
+                Task.objects.filter(status__in=OPEN_STATUSES, priority_rescore_at__lte=now)
+                .order_by('priority_rescore_at')[:batch_size]
+            )
+            if not due_tasks:
+                return rescored
+
+            priority_scores = ai_service.prioritize_tasks(due_tasks, context_data)
+            for task in due_tasks:
+                task.priority_score = priority_scores[task.id]
+                task.priority_rescore_at = task.next_priority_change(now)
+
+            Task.objects.bulk_update(due_tasks, ['priority_score', 'priority_rescore_at'])
+            rescored += len(due_tasks)
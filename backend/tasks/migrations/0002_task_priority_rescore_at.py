@@ -0,0 +1,26 @@
+# Generated by Django 5.2.5 on 2026-10-17 04:03
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def schedule_open_tasks(apps, schema_editor):
+    # Make every open task due so the first rescore_tasks run computes its real schedule
+    Task = apps.get_model('tasks', 'Task')
+    Task.objects.filter(status__in=['pending', 'in_progress']).update(priority_rescore_at=timezone.now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='priority_rescore_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.RunPython(schedule_open_tasks, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.5 on 2026-10-17 04:04
+
+from django.db import migrations, models
+
+
+def mark_enhanced_tasks(apps, schema_editor):
+    Task = apps.get_model('tasks', 'Task')
+    Task.objects.exclude(ai_enhanced_description='').update(enhancement_status='completed')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0002_task_priority_rescore_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='enhancement_status',
+            field=models.CharField(choices=[('not_requested', 'Not Requested'), ('pending', 'Pending'), ('processing', 'Processing'), ('completed', 'Completed'), ('failed', 'Failed')], db_index=True, default='not_requested', max_length=15),
+        ),
+        migrations.RunPython(mark_enhanced_tasks, migrations.RunPython.noop),
+    ]
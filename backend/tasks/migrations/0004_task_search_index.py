@@ -0,0 +1,22 @@
+from django.db import migrations
+
+
+def install_search_index(apps, schema_editor):
+    from tasks.search import get_backend
+    get_backend(schema_editor.connection).install(schema_editor)
+
+
+def remove_search_index(apps, schema_editor):
+    from tasks.search import get_backend
+    get_backend(schema_editor.connection).uninstall(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0003_task_enhancement_status'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search_index, remove_search_index),
+    ]
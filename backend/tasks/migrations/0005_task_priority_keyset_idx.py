@@ -0,0 +1,17 @@
+# Generated by Django 5.2.5 on 2026-10-17 04:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0004_task_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['-priority_score', '-created_at', '-id'], name='task_priority_keyset_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.5 on 2026-10-17 04:52
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_categorized_at(apps, schema_editor):
+    # The real assignment time is unknown; creation time orders existing tasks before any new ones
+    Task = apps.get_model('tasks', 'Task')
+    Task.objects.filter(category__isnull=False).update(categorized_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0005_task_priority_keyset_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='categorized_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.RunPython(backfill_categorized_at, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,4 @@
+import copy
 from django.db import models
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
@@ -29,6 +30,14 @@ class Task(models.Model):
         ('cancelled', 'Cancelled'),
     ]
     
+    ENHANCEMENT_STATUS_CHOICES = [
+        ('not_requested', 'Not Requested'),
+        ('pending', 'Pending'),
+        ('processing', 'Processing'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    
     title = models.CharField(max_length=200)
     description = models.TextField(blank=True)
     category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, blank=True)
@@ -42,17 +51,134 @@ class Task(models.Model):
     estimated_duration = models.IntegerField(null=True, blank=True, help_text="Duration in minutes")
     tags = models.JSONField(default=list, blank=True)
     ai_enhanced_description = models.TextField(blank=True)
+    enhancement_status = models.CharField(
+        max_length=15, choices=ENHANCEMENT_STATUS_CHOICES, default='not_requested', db_index=True
+    )
     context_insights = models.JSONField(default=dict, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     completed_at = models.DateTimeField(null=True, blank=True)
+    # When category was last set; the category model's incremental training watermark
+    categorized_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    # Next time the time-based part of priority_score changes (None when closed or settled)
+    priority_rescore_at = models.DateTimeField(null=True, blank=True, db_index=True)
     
     class Meta:
         ordering = ['-priority_score', '-created_at']
+        indexes = [
+            # Serves the list ordering and its keyset page seeks (smart_todo.pagination)
+            models.Index(fields=['-priority_score', '-created_at', '-id'], name='task_priority_keyset_idx'),
+        ]
+    
+    # Fields priority_score is computed from (see ai_module.scoring)
+    SCORE_INPUT_FIELDS = ('title', 'description', 'priority', 'status', 'deadline')
+    # Fields whose stored values are remembered, so saves can tell what they change (see tasks.signals)
+    TRACKED_FIELDS = ('title', 'description', 'status', 'tags', 'category_id')
     
     def __str__(self):
         return self.title
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._saved_score_state = instance._score_state()
+        instance._saved_values = instance._tracked_values()
+        return instance
+    
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        self._changed_fields = self._changed_tracked_fields(update_fields)
+        changed = ['priority_rescore_at']
+        if self.fields_changed(['category_id']):
+            from django.utils import timezone
+            self.categorized_at = timezone.now() if self.category_id is not None else None
+            changed.append('categorized_at')
+        if self.score_inputs_changed(update_fields):
+            self.priority_score = self.current_priority_score()
+            changed.append('priority_score')
+        self.priority_rescore_at = self.next_priority_change()
+        if update_fields is not None:
+            kwargs['update_fields'] = list(update_fields) + [name for name in changed if name not in update_fields]
+        super().save(*args, **kwargs)
+        self._saved_score_state = self._score_state()
+        self._saved_values = self._tracked_values()
+    
+    def _score_state(self):
+        # Only loaded fields; reading a deferred one here would cost a query
+        return {
+            name: self.__dict__[name]
+            for name in self.SCORE_INPUT_FIELDS + ('priority_score',) if name in self.__dict__
+        }
+    
+    def _tracked_values(self):
+        # Shallow copies of lists, so in-place edits (e.g. tags.append) still read as changes
+        values = {name: self.__dict__[name] for name in self.TRACKED_FIELDS if name in self.__dict__}
+        for name, value in values.items():
+            if isinstance(value, (list, dict)):
+                values[name] = copy.copy(value)
+        return values
+    
+    def _changed_tracked_fields(self, update_fields=None):
+        saved = getattr(self, '_saved_values', None)
+        if saved is None:
+            return None
+        names = self.TRACKED_FIELDS
+        if update_fields is not None:
+            names = [name for name in names if name in update_fields or name.removesuffix('_id') in update_fields]
+        return frozenset(
+            name for name in names
+            if name in self.__dict__ and (name not in saved or self.__dict__[name] != saved[name])
+        )
+    
+    def fields_changed(self, fields):
+        """Whether the current (or just finished) save changes any of the tracked `fields`.
+        
+        True when the stored values are unknown, e.g. for a new task.
+        """
+        changed = getattr(self, '_changed_fields', None)
+        return changed is None or bool(changed.intersection(fields))
+    
+    def score_inputs_changed(self, update_fields=None):
+        """Whether this save changes a score input of an open task without setting priority_score itself"""
+        from ai_module.scoring import OPEN_STATUSES
+        
+        if self.status not in OPEN_STATUSES:
+            return False
+        saved = getattr(self, '_saved_score_state', None)
+        if saved is None:
+            return True
+        current = self._score_state()
+        if current.get('priority_score') != saved.get('priority_score'):
+            # An explicitly assigned score wins
+            return False
+        fields = self.SCORE_INPUT_FIELDS if update_fields is None else set(self.SCORE_INPUT_FIELDS).intersection(update_fields)
+        return any(name in current and (name not in saved or current[name] != saved[name]) for name in fields)
+    
+    def current_priority_score(self, context_data=None):
+        """priority_score from the task's current fields and the recent context (as rescore_tasks computes it)"""
+        from django.utils import timezone
+        from ai_module.services import ai_service
+        from context.models import ContextSnapshot
+        
+        if context_data is None:
+            # Never analyze context inside a save; a missing snapshot just means no context yet
+            context_data = ContextSnapshot.stored_insights(10)
+        if self.created_at is None:
+            # Not inserted yet; auto_now_add re-stamps it a moment later, and the age term is 0 either way
+            self.created_at = timezone.now()
+        return ai_service.prioritize_tasks([self], context_data)[self.id]
+    
+    def next_priority_change(self, now=None):
+        """When priority_score next needs recomputing, or None for closed tasks"""
+        from django.utils import timezone
+        from ai_module.scoring import OPEN_STATUSES, next_score_change
+        
+        if self.status not in OPEN_STATUSES:
+            return None
+        
+        now = now or timezone.now()
+        return next_score_change(self.deadline, self.created_at or now, now)
+    
     @property
     def is_overdue(self):
         if self.deadline and self.status != 'completed':
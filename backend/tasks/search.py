@@ -0,0 +1,207 @@
+"""
+Full-text search over task titles, descriptions and tags.
+
+The backend follows the database in use (TASK_SEARCH['BACKEND'] may name
+another class):
+- SQLite: an FTS5 table over tasks_task, kept in sync by triggers. Results
+  are ranked with bm25.
+- PostgreSQL: a GIN index on a weighted tsvector expression, which
+  PostgreSQL maintains itself. Results are ranked with ts_rank.
+- Anything else: the previous icontains filter.
+
+Every search term is matched as a prefix, so results update as the user
+types. The full-text backends annotate each task with search_rank and with
+search_title / search_snippet, in which the database brackets matched words
+with private-use sentinel characters. render_highlight() HTML-escapes that
+text and only then turns the sentinels into <mark> tags, so user-entered
+markup is never passed through.
+"""
+
+import html
+import re
+from django.conf import settings
+from django.db import connections
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+TERM_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+# Placeholders the database puts around matches; render_highlight() swaps them for tags
+HIGHLIGHT_START = '\ue000'
+HIGHLIGHT_STOP = '\ue001'
+
+FTS_TABLE = 'tasks_task_fts'
+
+# Weighted document for PostgreSQL. The GIN index is built on exactly this
+# expression, so queries must use it verbatim to be served by the index.
+PG_VECTOR_SQL = (
+    "setweight(to_tsvector('simple'::regconfig, coalesce(tasks_task.title, '')), 'A') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(tasks_task.description, '')), 'B') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(tasks_task.tags::text, '')), 'C')"
+)
+PG_INDEX = 'tasks_task_search_gin'
+
+
+def get_config():
+    config = getattr(settings, 'TASK_SEARCH', {})
+    return {
+        'BACKEND': config.get('BACKEND'),
+        'MAX_TERMS': config.get('MAX_TERMS', 8),
+    }
+
+
+def search_terms(text, max_terms=8):
+    return [term.lower() for term in TERM_PATTERN.findall(text or '')][:max_terms]
+
+
+def render_highlight(text):
+    """HTML-escape highlighted text from the database and mark its matches with <mark> tags"""
+    if text is None:
+        return None
+    escaped = html.escape(text)
+    return escaped.replace(HIGHLIGHT_START, '<mark>').replace(HIGHLIGHT_STOP, '</mark>')
+
+
+class LikeSearch:
+    """Unindexed substring matching, for databases without a full-text backend"""
+
+    def search(self, queryset, text):
+        return queryset.filter(
+            Q(title__icontains=text) |
+            Q(description__icontains=text) |
+            Q(tags__icontains=text)
+        ).order_by('-priority_score', '-created_at')
+
+    def install(self, schema_editor):
+        pass
+
+    def uninstall(self, schema_editor):
+        pass
+
+    def ensure_installed(self, connection):
+        pass
+
+
+class SQLiteFTSSearch(LikeSearch):
+    """FTS5 external-content index over tasks_task"""
+
+    # bm25 column weights for title, description and tags
+    WEIGHTS = (10.0, 4.0, 2.0)
+    TRIGGERS = {
+        f'{FTS_TABLE}_ai': f"""
+            CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON tasks_task BEGIN
+                INSERT INTO {FTS_TABLE}(rowid, title, description, tags)
+                VALUES (new.id, new.title, new.description, new.tags);
+            END""",
+        f'{FTS_TABLE}_ad': f"""
+            CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON tasks_task BEGIN
+                INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description, tags)
+                VALUES ('delete', old.id, old.title, old.description, old.tags);
+            END""",
+        f'{FTS_TABLE}_au': f"""
+            CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF title, description, tags ON tasks_task BEGIN
+                INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description, tags)
+                VALUES ('delete', old.id, old.title, old.description, old.tags);
+                INSERT INTO {FTS_TABLE}(rowid, title, description, tags)
+                VALUES (new.id, new.title, new.description, new.tags);
+            END""",
+    }
+
+    def search(self, queryset, text):
+        terms = search_terms(text, get_config()['MAX_TERMS'])
+        if not terms:
+            return super().search(queryset, text)
+        # Quoted so user input is never parsed as FTS5 syntax; * makes each term a prefix
+        match = ' '.join(f'"{term}"*' for term in terms)
+        weights = ', '.join(str(weight) for weight in self.WEIGHTS)
+        return queryset.extra(
+            select={
+                'search_rank': f"-bm25({FTS_TABLE}, {weights})",
+                'search_title': f"highlight({FTS_TABLE}, 0, %s, %s)",
+                'search_snippet': f"snippet({FTS_TABLE}, 1, %s, %s, '…', 16)",
+            },
+            select_params=[HIGHLIGHT_START, HIGHLIGHT_STOP, HIGHLIGHT_START, HIGHLIGHT_STOP],
+            tables=[FTS_TABLE],
+            where=[f"{FTS_TABLE}.rowid = tasks_task.id", f"{FTS_TABLE} MATCH %s"],
+            params=[match],
+        ).order_by('-search_rank', '-priority_score', '-created_at')
+
+    def install(self, schema_editor):
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            "title, description, tags, content='tasks_task', content_rowid='id', "
+            "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        )
+        for sql in self.TRIGGERS.values():
+            schema_editor.execute(sql)
+        schema_editor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+    def uninstall(self, schema_editor):
+        for name in self.TRIGGERS:
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+    def ensure_installed(self, connection):
+        """Recreate triggers lost when a migration rebuilt tasks_task, then reindex"""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT type, name FROM sqlite_master WHERE name = %s OR name IN (%s, %s, %s)",
+                [FTS_TABLE, *self.TRIGGERS]
+            )
+            existing = {name for _, name in cursor.fetchall()}
+            if FTS_TABLE not in existing or existing.issuperset(self.TRIGGERS):
+                return
+            for sql in self.TRIGGERS.values():
+                cursor.execute(sql)
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+class PostgresSearch(LikeSearch):
+    """tsvector matching served by a GIN expression index"""
+
+    def search(self, queryset, text):
+        terms = search_terms(text, get_config()['MAX_TERMS'])
+        if not terms:
+            return super().search(queryset, text)
+        tsquery = ' & '.join(f"'{term}':*" for term in terms)
+        query_sql = "to_tsquery('simple'::regconfig, %s)"
+        options = f'StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}'
+        return queryset.extra(
+            select={
+                'search_rank': f"ts_rank({PG_VECTOR_SQL}, {query_sql})",
+                'search_title': f"ts_headline('simple'::regconfig, tasks_task.title, {query_sql}, %s)",
+                'search_snippet': f"ts_headline('simple'::regconfig, tasks_task.description, {query_sql}, %s)",
+            },
+            select_params=[
+                tsquery,
+                tsquery, f'{options}, HighlightAll=true',
+                tsquery, f'{options}, MaxFragments=1, MaxWords=16, MinWords=6',
+            ],
+            where=[f"({PG_VECTOR_SQL}) @@ {query_sql}"],
+            params=[tsquery],
+        ).order_by('-search_rank', '-priority_score', '-created_at')
+
+    def install(self, schema_editor):
+        schema_editor.execute(f"CREATE INDEX IF NOT EXISTS {PG_INDEX} ON tasks_task USING GIN (({PG_VECTOR_SQL}))")
+
+    def uninstall(self, schema_editor):
+        schema_editor.execute(f"DROP INDEX IF EXISTS {PG_INDEX}")
+
+
+BACKENDS = {
+    'sqlite': SQLiteFTSSearch,
+    'postgresql': PostgresSearch,
+}
+
+
+def get_backend(connection=None):
+    connection = connection or connections['default']
+    backend = get_config()['BACKEND']
+    if backend:
+        return import_string(backend)()
+    return BACKENDS.get(connection.vendor, LikeSearch)()
+
+
+def search_tasks(queryset, text):
+    """Filter a Task queryset to matches for text, most relevant first"""
+    return get_backend(connections[queryset.db]).search(queryset, text)
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import Task, Category, TaskDependency
+from .search import render_highlight
 from context.models import ContextEntry
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -10,22 +11,28 @@ class CategorySerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'color', 'usage_frequency', 'task_count', 'created_at']
     
     def get_task_count(self, obj):
-        return obj.task_set.count()
+        # CategoryViewSet annotates task_count; only unannotated instances cost a query
+        task_count = getattr(obj, 'task_count', None)
+        if task_count is None:
+            task_count = obj.task_set.count()
+        return task_count
 
 class TaskSerializer(serializers.ModelSerializer):
     category_name = serializers.CharField(source='category.name', read_only=True)
     category_color = serializers.CharField(source='category.color', read_only=True)
     is_overdue = serializers.ReadOnlyField()
     ai_suggestions = serializers.SerializerMethodField()
+    search_highlight = serializers.SerializerMethodField()
     
     class Meta:
         model = Task
         fields = [
             'id', 'title', 'description', 'category', 'category_name', 'category_color',
             'priority', 'priority_score', 'status', 'deadline', 'estimated_duration',
-            'tags', 'ai_enhanced_description', 'context_insights', 'is_overdue',
-            'ai_suggestions', 'created_at', 'updated_at', 'completed_at'
+            'tags', 'ai_enhanced_description', 'enhancement_status', 'context_insights', 'is_overdue',
+            'ai_suggestions', 'search_highlight', 'created_at', 'updated_at', 'completed_at'
         ]
+        read_only_fields = ['enhancement_status']
     
     def get_ai_suggestions(self, obj):
         # Return AI-generated suggestions for this task
@@ -34,40 +41,62 @@ class TaskSerializer(serializers.ModelSerializer):
             'complexity_score': obj.context_insights.get('complexity_score', 0.5),
             'recommended_duration': obj.context_insights.get('recommended_duration', 60)
         }
+    
+    def get_search_highlight(self, obj):
+        # Only set on results of a full-text search (see tasks.search)
+        if not hasattr(obj, 'search_rank'):
+            return None
+        return {
+            'title': render_highlight(obj.search_title),
+            'description': render_highlight(obj.search_snippet),
+            'rank': round(obj.search_rank, 4)
+        }
 
 class TaskCreateSerializer(serializers.ModelSerializer):
     enhance_with_ai = serializers.BooleanField(default=True, write_only=True)
     context_data = serializers.JSONField(required=False, write_only=True)
+    merge_duplicates = serializers.BooleanField(default=False, write_only=True)
+    possible_duplicates = serializers.SerializerMethodField()
     
     class Meta:
         model = Task
         fields = [
             'id', 'title', 'description', 'category', 'priority', 'deadline',
-            'estimated_duration', 'tags', 'enhance_with_ai', 'context_data'
+            'estimated_duration', 'tags', 'enhance_with_ai', 'context_data',
+            'merge_duplicates', 'enhancement_status', 'possible_duplicates'
         ]
+        read_only_fields = ['enhancement_status']
+    
+    def get_possible_duplicates(self, obj):
+        return obj.context_insights.get('possible_duplicates', [])
     
     def create(self, validated_data):
+        from ai_module.dedupe import find_duplicates
+        
         enhance_with_ai = validated_data.pop('enhance_with_ai', True)
         context_data = validated_data.pop('context_data', None)
+        merge_duplicates = validated_data.pop('merge_duplicates', False)
+        
+        # Look for open tasks that already say the same thing
+        duplicates = find_duplicates(validated_data['title'], validated_data.get('description', ''))
+        if merge_duplicates and duplicates:
+            return Task.objects.get(id=duplicates[0][0])
+        possible_duplicates = [
+            {'id': task_id, 'similarity': round(score, 3)} for task_id, score in duplicates
+        ]
+        
+        if possible_duplicates:
+            validated_data['context_insights'] = {'possible_duplicates': possible_duplicates}
         
         task = Task.objects.create(**validated_data)
         
         if enhance_with_ai:
             from ai_module.services import ai_service
-            
-            # Enhance description with AI
-            enhanced_description = ai_service.enhance_task_description(
-                task.title, task.description, context_data
-            )
-            task.ai_enhanced_description = enhanced_description
+            from ai_module.jobs import enqueue_enhancement
             
             # Suggest categories
             suggested_categories = ai_service.suggest_categories(task.title, task.description)
             
-            # Calculate priority score
-            priority_scores = ai_service.prioritize_tasks([task], context_data)
-            task.priority_score = priority_scores.get(task.id, 0.5)
-            
             # Suggest deadline if not provided
             if not task.deadline:
                 suggested_deadline = ai_service.suggest_deadline(
@@ -75,14 +104,22 @@ class TaskCreateSerializer(serializers.ModelSerializer):
                 )
                 task.deadline = suggested_deadline
             
+            # Calculate priority score (after the deadline, which it depends on)
+            priority_scores = ai_service.prioritize_tasks([task], context_data)
+            task.priority_score = priority_scores.get(task.id, 0.5)
+            
             # Store AI insights
             task.context_insights = {
                 'suggested_categories': suggested_categories,
                 'ai_enhanced': True,
-                'context_used': bool(context_data)
+                'context_used': bool(context_data),
+                'possible_duplicates': possible_duplicates
             }
             
             task.save()
+            
+            # The LLM description is generated in the background; clients poll enhancement_status
+            enqueue_enhancement(task, context_data)
         
         return task
 
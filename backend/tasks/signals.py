@@ -0,0 +1,59 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import Category, Task
+from . import stats
+
+@receiver(post_save, sender=Task)
+def update_text_index(sender, instance, update_fields=None, **kwargs):
+    from ai_module.text_index import INDEXED_FIELDS, index_tasks
+    
+    if not instance.fields_changed(INDEXED_FIELDS):
+        return
+    index_tasks([instance])
+
+@receiver(post_save, sender=Task)
+def update_duplicate_index(sender, instance, update_fields=None, **kwargs):
+    from ai_module.dedupe import INDEXED_FIELDS, index_tasks
+    
+    if not instance.fields_changed(INDEXED_FIELDS):
+        return
+    index_tasks([instance])
+
+@receiver(post_save, sender=Task)
+def update_vector_index(sender, instance, update_fields=None, **kwargs):
+    from ai_module import vector_index
+    
+    if not instance.fields_changed(vector_index.TASK_FIELDS):
+        return
+    # The index lives on disk, outside the transaction; only record committed changes
+    transaction.on_commit(lambda: vector_index.index_tasks([instance]))
+
+@receiver(post_delete, sender=Task)
+def remove_from_vector_index(sender, instance, **kwargs):
+    from ai_module import vector_index
+    
+    task_id = instance.id
+    transaction.on_commit(lambda: vector_index.remove('task', [task_id]))
+
+@receiver(post_save, sender=Task)
+def invalidate_dashboard_stats(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not stats.STATS_FIELDS.intersection(update_fields):
+        return
+    stats.invalidate('tasks')
+
+@receiver(post_delete, sender=Task)
+def invalidate_dashboard_stats_on_delete(sender, instance, **kwargs):
+    stats.invalidate('tasks')
+
+@receiver(post_save, sender=Category)
+def invalidate_dashboard_categories(sender, instance, created=False, update_fields=None, **kwargs):
+    if update_fields is not None and not stats.CATEGORY_FIELDS.intersection(update_fields):
+        return
+    stats.invalidate('categories')
+
+@receiver(post_delete, sender=Category)
+def invalidate_dashboard_categories_on_delete(sender, instance, **kwargs):
+    # Deleting a category nulls its tasks' category with a plain UPDATE
+    stats.invalidate('categories')
+    stats.invalidate('tasks')
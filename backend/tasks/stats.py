@@ -0,0 +1,152 @@
+"""
+Cached dashboard statistics.
+
+Every count, together with each category's name and color, comes from one
+conditional-aggregate query grouped by category; categories without tasks
+are appended to it with UNION ALL. The snapshot lives in the Django cache
+named by DASHBOARD_STATS['CACHE_ALIAS'], keyed by two random version tokens,
+one for tasks and one for categories. Task and Category signals replace
+their token once the writing transaction commits, so a snapshot computed
+from uncommitted data can never be served. Use a shared cache (Redis,
+Memcached) when running several workers.
+
+Overdue counts also change as time passes. The task snapshot therefore
+expires when the next open task's deadline goes by, or after TIMEOUT
+seconds, whichever comes first.
+"""
+
+import math
+import uuid
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Count, DateTimeField, F, IntegerField, Min, Q, Value
+from django.utils import timezone
+
+# Task fields the statistics depend on; saves that touch none of them keep the snapshot
+STATS_FIELDS = frozenset(['status', 'priority', 'deadline', 'category', 'category_id'])
+CATEGORY_FIELDS = frozenset(['name', 'color'])
+
+OPEN_STATUSES = ['pending', 'in_progress']
+
+
+def get_config():
+    config = getattr(settings, 'DASHBOARD_STATS', {})
+    return {
+        'CACHE_ALIAS': config.get('CACHE_ALIAS', 'default'),
+        'TIMEOUT': config.get('TIMEOUT', 300),
+        'KEY_PREFIX': config.get('KEY_PREFIX', 'dashboard-stats'),
+    }
+
+
+def dashboard_stats():
+    """The dashboard statistics, from the cache when nothing relevant changed"""
+    snapshot = _cached(_compute_snapshot)
+
+    totals = snapshot['totals']
+    total_tasks = totals['total']
+    return {
+        'total_tasks': total_tasks,
+        'completed_tasks': totals['completed'],
+        'pending_tasks': totals['pending'],
+        'overdue_tasks': totals['overdue'],
+        'completion_rate': round((totals['completed'] / total_tasks) * 100, 1) if total_tasks > 0 else 0,
+        'priority_distribution': snapshot['priorities'],
+        'category_distribution': snapshot['categories'],
+    }
+
+
+def invalidate(part):
+    """Retire the cached snapshot for changes to `part` ('tasks' or 'categories') once the current transaction commits"""
+    config = get_config()
+    cache = caches[config['CACHE_ALIAS']]
+    transaction.on_commit(
+        lambda: cache.set(f"{config['KEY_PREFIX']}:{part}:version", uuid.uuid4().hex, None)
+    )
+
+
+def _version(cache, config, part):
+    version_key = f"{config['KEY_PREFIX']}:{part}:version"
+    version = cache.get(version_key)
+    if version is None:
+        cache.add(version_key, uuid.uuid4().hex, None)
+        version = cache.get(version_key)
+    return version
+
+
+def _cached(compute):
+    config = get_config()
+    cache = caches[config['CACHE_ALIAS']]
+    versions = [_version(cache, config, part) for part in ('tasks', 'categories')]
+    key = f"{config['KEY_PREFIX']}:{':'.join(versions)}"
+
+    snapshot = cache.get(key)
+    if snapshot is None:
+        snapshot, timeout = compute(config['TIMEOUT'])
+        cache.set(key, snapshot, timeout)
+    return snapshot
+
+
+def _compute_snapshot(timeout):
+    """One query for every count and category; returns (snapshot, cache timeout)"""
+    from .models import Category, Task
+
+    now = timezone.now()
+    open_tasks = Q(status__in=OPEN_STATUSES)
+    priorities = [priority for priority, _ in Task.PRIORITY_CHOICES]
+    counts = {
+        'total': Count('id'),
+        'completed': Count('id', filter=Q(status='completed')),
+        'pending': Count('id', filter=Q(status='pending')),
+        'overdue': Count('id', filter=open_tasks & Q(deadline__lt=now)),
+        **{f'priority_{priority}': Count('id', filter=Q(priority=priority)) for priority in priorities},
+    }
+    rows = (
+        Task.objects.order_by()
+        .values('category_id')
+        .annotate(
+            category_name=F('category__name'),
+            category_color=F('category__color'),
+            next_overdue=Min('deadline', filter=open_tasks & Q(deadline__gte=now)),
+            **counts
+        )
+    )
+    # Same columns, in the same order, for categories that have no tasks
+    empty_categories = (
+        Category.objects.order_by()
+        .filter(task__isnull=True)
+        .values('id')
+        .annotate(
+            category_name=F('name'),
+            category_color=F('color'),
+            next_overdue=Value(None, output_field=DateTimeField()),
+            **{name: Value(0, output_field=IntegerField()) for name in counts}
+        )
+    )
+
+    totals = {'total': 0, 'completed': 0, 'pending': 0, 'overdue': 0}
+    priority_counts = {priority: 0 for priority in priorities}
+    categories = []
+    next_overdue = None
+    for row in rows.union(empty_categories, all=True):
+        for name in totals:
+            totals[name] += row[name]
+        for priority in priorities:
+            priority_counts[priority] += row[f'priority_{priority}']
+        if row['category_id'] is not None:
+            categories.append((row['category_id'], {
+                'name': row['category_name'],
+                'count': row['total'],
+                'color': row['category_color'],
+            }))
+        if row['next_overdue'] is not None and (next_overdue is None or row['next_overdue'] < next_overdue):
+            next_overdue = row['next_overdue']
+
+    if next_overdue is not None:
+        timeout = max(1, min(timeout, math.ceil((next_overdue - now).total_seconds())))
+    snapshot = {
+        'totals': totals,
+        'priorities': priority_counts,
+        'categories': [category for _, category in sorted(categories, key=lambda item: item[0])],
+    }
+    return snapshot, timeout
@@ -1,3 +1,327 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from context.models import ContextEntry, ContextSnapshot
+from . import stats
+from .models import Task, Category, TaskDependency
 
-# Create your tests here.
+# Table sizes every query budget is checked at
+BUDGET_ROW_COUNTS = [1, 10, 1000]
+
+
+class QueryBudgetMixin:
+    """Assert that an endpoint stays within a fixed query budget as its table grows.
+
+    make_rows(n) tops the endpoint's data up to n rows. The endpoint is called
+    once at every size in BUDGET_ROW_COUNTS. Each call must stay within the
+    budget and use the same number of queries, so an N+1 fails even while it
+    still fits under the budget.
+    """
+
+    def assertQueryBudget(self, url, budget, make_rows, method='get', data=None):
+        client = APIClient()
+        counts = {}
+        for rows in BUDGET_ROW_COUNTS:
+            make_rows(rows)
+            with CaptureQueriesContext(connection) as queries:
+                response = getattr(client, method)(url, data, format='json')
+            self.assertLess(response.status_code, 300, f"{url} returned {response.status_code}")
+            counts[rows] = len(queries)
+            self.assertLessEqual(
+                len(queries), budget,
+                f"{url} ran {len(queries)} queries with {rows} rows (budget {budget}):\n" +
+                "\n".join(query['sql'] for query in queries.captured_queries)
+            )
+        self.assertEqual(len(set(counts.values())), 1, f"{url} query count grows with rows: {counts}")
+
+
+def top_up(model, rows, build):
+    """Bulk-create build(i) instances until model has `rows` rows"""
+    existing = model.objects.count()
+    model.objects.bulk_create([build(i) for i in range(existing, rows)], batch_size=500)
+
+
+class TaskEndpointQueryBudgetTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name='Work')
+
+    def make_tasks(self, rows, **fields):
+        top_up(Task, rows, lambda i: Task(title=f'Task {i}', category=self.category, **fields))
+
+    def test_task_list(self):
+        self.assertQueryBudget('/api/v1/tasks/tasks/', 2, self.make_tasks)
+
+    def test_upcoming_tasks(self):
+        deadline = timezone.now() + timedelta(days=2)
+        self.assertQueryBudget(
+            '/api/v1/tasks/tasks/upcoming/', 1, lambda rows: self.make_tasks(rows, deadline=deadline)
+        )
+
+    def test_overdue_tasks(self):
+        deadline = timezone.now() - timedelta(days=2)
+        self.assertQueryBudget(
+            '/api/v1/tasks/tasks/overdue/', 1, lambda rows: self.make_tasks(rows, deadline=deadline)
+        )
+
+    def test_dashboard_stats_uncached(self):
+        def make_rows(rows):
+            self.make_tasks(rows)
+            caches['default'].clear()
+        self.assertQueryBudget('/api/v1/tasks/tasks/dashboard_stats/', 1, make_rows)
+
+    def test_category_list(self):
+        def make_rows(rows):
+            top_up(Category, rows, lambda i: Category(name=f'Category {i}'))
+            self.make_tasks(rows)
+        self.assertQueryBudget('/api/v1/tasks/categories/', 2, make_rows)
+
+    def test_popular_categories(self):
+        def make_rows(rows):
+            top_up(Category, rows, lambda i: Category(name=f'Category {i}'))
+        self.assertQueryBudget('/api/v1/tasks/categories/popular/', 1, make_rows)
+
+    def test_dependency_list(self):
+        def make_rows(rows):
+            self.make_tasks(rows * 2)
+            ids = list(Task.objects.order_by('id').values_list('id', flat=True))
+            top_up(TaskDependency, rows, lambda i: TaskDependency(task_id=ids[2 * i], depends_on_id=ids[2 * i + 1]))
+        self.assertQueryBudget('/api/v1/tasks/dependencies/', 2, make_rows)
+
+
+class TaskPriorityScoreTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+    
+    def test_editing_a_deadline_rescores_the_task(self):
+        task = Task.objects.create(title='File taxes')
+        self.assertEqual(task.priority_score, 0.5)
+        # Past the age cap, so no time step is pending that would rescore it later
+        Task.objects.filter(id=task.id).update(created_at=timezone.now() - timedelta(days=20))
+        
+        deadline = timezone.now() + timedelta(hours=12)
+        response = self.client.patch(f'/api/v1/tasks/tasks/{task.id}/', {'deadline': deadline.isoformat()}, format='json')
+        self.assertAlmostEqual(response.data['priority_score'], 0.5 + 0.3 + 0.1)
+        task.refresh_from_db()
+        self.assertIsNone(task.priority_rescore_at)
+        
+        response = self.client.patch(f'/api/v1/tasks/tasks/{task.id}/', {'priority': 'low'}, format='json')
+        self.assertAlmostEqual(response.data['priority_score'], 0.5 + 0.3 - 0.1 + 0.1)
+    
+    def test_save_scores_from_the_stored_snapshot_without_refreshing_it(self):
+        ContextEntry.objects.create(content='Urgent: file taxes by Friday', source_type='notes', processed=True)
+        with mock.patch.object(ContextSnapshot, 'refresh') as refresh:
+            task = Task.objects.create(title='File taxes')
+        refresh.assert_not_called()
+        self.assertEqual(task.priority_score, 0.5)
+        
+        ContextSnapshot.refresh(10)
+        context_data = ContextSnapshot.get_insights(10)
+        task.title = 'File taxes today'
+        with mock.patch.object(ContextSnapshot, 'refresh') as refresh:
+            task.save()
+        refresh.assert_not_called()
+        self.assertEqual(task.priority_score, task.current_priority_score(context_data))
+    
+    def test_create_without_ai_scores_the_task(self):
+        deadline = timezone.now() + timedelta(days=5)
+        response = self.client.post('/api/v1/tasks/tasks/', {
+            'title': 'Renew passport', 'priority': 'high', 'deadline': deadline.isoformat(), 'enhance_with_ai': False
+        }, format='json')
+        self.assertAlmostEqual(Task.objects.get(id=response.data['id']).priority_score, 0.5 + 0.1 + 0.2)
+    
+    def test_explicit_score_and_unrelated_fields_are_kept(self):
+        task = Task.objects.create(title='Book flights', priority='urgent')
+        task.priority_score = 0.25
+        task.save()
+        task.ai_enhanced_description = 'Compare fares first'
+        task.save()
+        task.refresh_from_db()
+        self.assertEqual(task.priority_score, 0.25)
+
+
+class DashboardStatsCacheTests(TestCase):
+    url = '/api/v1/tasks/tasks/dashboard_stats/'
+
+    def setUp(self):
+        caches['default'].clear()
+        self.client = APIClient()
+        self.category = Category.objects.create(name='Work')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.task = Task.objects.create(title='Write report', category=self.category)
+            Task.objects.create(title='Old task', status='completed')
+
+    def test_cached_snapshot_needs_no_queries(self):
+        first = self.client.get(self.url).data
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url).data
+        self.assertEqual(first, second)
+        self.assertEqual(first['total_tasks'], 2)
+        self.assertEqual(first['category_distribution'], [{'name': 'Work', 'count': 1, 'color': '#3B82F6'}])
+
+    def test_task_save_invalidates_counts(self):
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.task.status = 'completed'
+            self.task.save()
+        with self.assertNumQueries(1):
+            stats = self.client.get(self.url).data
+        self.assertEqual(stats['completed_tasks'], 2)
+        self.assertEqual(stats['completion_rate'], 100.0)
+
+    def test_unrelated_task_save_keeps_snapshot(self):
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.task.ai_enhanced_description = 'More detail'
+            self.task.save(update_fields=['ai_enhanced_description'])
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+    def test_category_changes_invalidate_distribution(self):
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(name='Home', color='#06B6D4')
+        with self.assertNumQueries(1):
+            stats = self.client.get(self.url).data
+        self.assertEqual(stats['category_distribution'][-1], {'name': 'Home', 'count': 0, 'color': '#06B6D4'})
+
+    def test_cold_snapshot_counts_all_tasks_in_one_query(self):
+        Task.objects.bulk_create([Task(title=f'Bulk {i}', priority='high') for i in range(50)])
+        caches['default'].clear()
+        # One aggregate for every task count and category
+        with self.assertNumQueries(1):
+            stats = self.client.get(self.url).data
+        self.assertEqual(stats['total_tasks'], 52)
+        self.assertEqual(stats['priority_distribution']['high'], 50)
+
+    def test_snapshot_expires_when_an_open_deadline_passes(self):
+        self.task.deadline = timezone.now() + timedelta(minutes=2)
+        self.task.save()
+        snapshot, timeout = stats._compute_snapshot(300)
+        self.assertEqual(snapshot['totals']['overdue'], 0)
+        self.assertIn(timeout, (119, 120))
+
+    def test_category_delete_invalidates_task_counts(self):
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.category.delete()
+        stats = self.client.get(self.url).data
+        self.assertEqual(stats['category_distribution'], [])
+        self.assertEqual(stats['total_tasks'], 2)
+
+
+class TaskSearchTests(TestCase):
+    url = '/api/v1/tasks/tasks/'
+
+    def setUp(self):
+        self.client = APIClient()
+        self.report = Task.objects.create(title='Quarterly report', description='Send the finance summary')
+        Task.objects.create(title='Buy milk', description='Check the report on dairy prices')
+
+    def search(self, text):
+        return self.client.get(self.url, {'search': text}).data['results']
+
+    def test_prefix_matches_are_ranked_and_highlighted(self):
+        results = self.search('repo')
+        self.assertEqual([task['title'] for task in results], ['Quarterly report', 'Buy milk'])
+        self.assertEqual(results[0]['search_highlight']['title'], 'Quarterly <mark>report</mark>')
+        self.assertIn('<mark>report</mark>', results[1]['search_highlight']['description'])
+
+    def test_highlights_escape_task_text(self):
+        Task.objects.create(title='<img src=x onerror=alert(1)> invoice', description='<b>Pay</b> the invoice')
+        highlight = self.search('invoice')[0]['search_highlight']
+        self.assertEqual(highlight['title'], '&lt;img src=x onerror=alert(1)&gt; <mark>invoice</mark>')
+        self.assertEqual(highlight['description'], '&lt;b&gt;Pay&lt;/b&gt; the <mark>invoice</mark>')
+    
+    def test_query_syntax_is_treated_as_text(self):
+        self.assertEqual(self.search('"fin* OR NEAR('), [])
+        self.assertEqual(len(self.search('fin sum')), 1)
+
+    def test_index_follows_updates_and_deletes(self):
+        self.report.title = 'Annual review'
+        self.report.save()
+        self.assertEqual([task['title'] for task in self.search('annu')], ['Annual review'])
+        self.assertEqual([task['title'] for task in self.search('quarterly')], [])
+        self.report.delete()
+        self.assertEqual(self.search('annual'), [])
+
+@override_settings(KEYSET_PAGINATION={'COUNT_CAP': 5})
+class TaskKeysetPaginationTests(TestCase):
+    url = '/api/v1/tasks/tasks/'
+
+    def setUp(self):
+        self.client = APIClient()
+        # Equal scores and creation times, so only the id tiebreaker orders most rows
+        created_at = timezone.now()
+        Task.objects.bulk_create([
+            Task(title=f'Task {i}', priority_score=0.9 if i % 3 == 0 else 0.5) for i in range(12)
+        ])
+        Task.objects.update(created_at=created_at)
+        self.expected = list(
+            Task.objects.order_by('-priority_score', '-created_at', '-id').values_list('id', flat=True)
+        )
+
+    def walk(self, url, data=None, link='next'):
+        ids, pages = [], 0
+        while url:
+            response = self.client.get(url, data)
+            self.assertEqual(response.status_code, 200)
+            ids.extend(task['id'] for task in response.data['results'])
+            url, data, pages = response.data[link], None, pages + 1
+            last = response.data
+        return ids, pages, last
+
+    def test_pages_cover_every_row_once_in_order(self):
+        ids, pages, _ = self.walk(self.url, {'page_size': 5})
+        self.assertEqual(ids, self.expected)
+        self.assertEqual(pages, 3)
+
+    def test_previous_links_walk_back(self):
+        _, _, last = self.walk(self.url, {'page_size': 5})
+        ids, _, _ = self.walk(last['previous'], link='previous')
+        self.assertEqual(ids, self.expected[5:10] + self.expected[:5])
+
+    def test_rows_inserted_ahead_do_not_shift_later_pages(self):
+        first = self.client.get(self.url, {'page_size': 5}).data
+        Task.objects.create(title='New urgent task', priority_score=1.0)
+        second = self.client.get(first['next']).data
+        self.assertEqual([task['id'] for task in second['results']], self.expected[5:10])
+
+    def test_count_modes(self):
+        data = self.client.get(self.url).data
+        self.assertEqual((data['count'], data['count_exact']), (5, False))
+        data = self.client.get(self.url, {'count': 'exact'}).data
+        self.assertEqual((data['count'], data['count_exact']), (12, True))
+        with self.assertNumQueries(1):
+            data = self.client.get(self.url, {'count': 'none'}).data
+        self.assertIsNone(data['count'])
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.client.get(self.url, {'cursor': 'bm9wZQ'}).status_code, 404)
+
+
+class TaskIndexUpdateTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.task = Task.objects.create(title='Draft release notes', description='Summarize the changelog')
+    
+    def test_full_save_without_text_changes_skips_reindexing(self):
+        with mock.patch('ai_module.text_index.index_tasks') as index_tasks:
+            response = self.client.patch(f'/api/v1/tasks/tasks/{self.task.id}/', {'priority': 'high'}, format='json')
+            self.assertEqual(response.status_code, 200)
+            index_tasks.assert_not_called()
+            
+            response = self.client.patch(f'/api/v1/tasks/tasks/{self.task.id}/', {'title': 'Publish release notes'}, format='json')
+            self.assertEqual(response.status_code, 200)
+            index_tasks.assert_called_once()
+    
+    def test_in_place_tag_edits_count_as_changes(self):
+        task = Task.objects.get(id=self.task.id)
+        task.tags.append('docs')
+        task.save()
+        self.assertTrue(task.fields_changed(['tags']))
+        self.assertFalse(task.fields_changed(['title', 'description']))
@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import TaskViewSet, CategoryViewSet, TaskDependencyViewSet
+from .views import TaskViewSet, CategoryViewSet, TaskDependencyViewSet, enhance_description_stream
 
 router = DefaultRouter()
 router.register(r'tasks', TaskViewSet)
@@ -8,5 +8,6 @@ router.register(r'categories', CategoryViewSet)
 router.register(r'dependencies', TaskDependencyViewSet)
 
 urlpatterns = [
+    path('tasks/<int:pk>/enhance_description/stream/', enhance_description_stream, name='task-enhance-description-stream'),
     path('', include(router.urls)),
 ]
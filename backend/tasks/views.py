@@ -1,12 +1,22 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
 from django.utils import timezone
-from django.db.models import Q, Count
+from django.http import Http404, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+from asgiref.sync import sync_to_async
+from django.db.models import Count
 from .models import Task, Category, TaskDependency
 from .serializers import TaskSerializer, TaskCreateSerializer, CategorySerializer, TaskDependencySerializer
-from context.models import ContextEntry
+from .search import search_tasks
+from .stats import dashboard_stats
+from context.models import ContextSnapshot
+from ai_module.routing import ProviderUnavailable
 from ai_module.services import ai_service
+from ai_module.streaming import format_event, stream_enhancement
+from smart_todo.pagination import KeysetPagination
 
 class CategoryViewSet(viewsets.ModelViewSet):
     queryset = Category.objects.all()
@@ -19,20 +29,28 @@ class CategoryViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def popular(self, request):
         """Get most popular categories"""
-        popular_categories = Category.objects.order_by('-usage_frequency')[:10]
+        popular_categories = Category.objects.annotate(task_count=Count('task')).order_by('-usage_frequency')[:10]
         serializer = self.get_serializer(popular_categories, many=True)
         return Response(serializer.data)
 
 class TaskViewSet(viewsets.ModelViewSet):
     queryset = Task.objects.all()
     
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            # Relevance-ranked search results have no keyset to seek on, so they are paged by number
+            search = self.request is not None and self.request.query_params.get('search')
+            self._paginator = PageNumberPagination() if search else KeysetPagination()
+        return self._paginator
+    
     def get_serializer_class(self):
         if self.action == 'create':
             return TaskCreateSerializer
         return TaskSerializer
     
     def get_queryset(self):
-        queryset = Task.objects.select_related('category').prefetch_related('dependencies')
+        queryset = Task.objects.select_related('category')
         
         # Filter by status
         status_filter = self.request.query_params.get('status')
@@ -49,58 +67,23 @@ class TaskViewSet(viewsets.ModelViewSet):
         if category_filter:
             queryset = queryset.filter(category_id=category_filter)
         
-        # Search functionality
+        # Full-text search, ranked by relevance (see tasks.search)
         search = self.request.query_params.get('search')
         if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) | 
-                Q(description__icontains=search) |
-                Q(tags__icontains=search)
-            )
+            return search_tasks(queryset, search)
         
         # Sort by priority score by default
         return queryset.order_by('-priority_score', '-created_at')
     
     @action(detail=False, methods=['get'])
     def dashboard_stats(self, request):
-        """Get dashboard statistics"""
-        total_tasks = Task.objects.count()
-        completed_tasks = Task.objects.filter(status='completed').count()
-        pending_tasks = Task.objects.filter(status='pending').count()
-        overdue_tasks = Task.objects.filter(
-            deadline__lt=timezone.now(),
-            status__in=['pending', 'in_progress']
-        ).count()
-        
-        # Tasks by priority
-        priority_stats = {}
-        for priority, _ in Task.PRIORITY_CHOICES:
-            priority_stats[priority] = Task.objects.filter(priority=priority).count()
-        
-        # Tasks by category
-        category_stats = []
-        categories = Category.objects.annotate(task_count=Count('task'))
-        for category in categories:
-            category_stats.append({
-                'name': category.name,
-                'count': category.task_count,
-                'color': category.color
-            })
-        
-        return Response({
-            'total_tasks': total_tasks,
-            'completed_tasks': completed_tasks,
-            'pending_tasks': pending_tasks,
-            'overdue_tasks': overdue_tasks,
-            'completion_rate': round((completed_tasks / total_tasks) * 100, 1) if total_tasks > 0 else 0,
-            'priority_distribution': priority_stats,
-            'category_distribution': category_stats
-        })
+        """Get dashboard statistics (cached until a task or category changes)"""
+        return Response(dashboard_stats())
     
     @action(detail=False, methods=['get'])
     def upcoming(self, request):
         """Get upcoming tasks (next 7 days)"""
-        upcoming_tasks = Task.objects.filter(
+        upcoming_tasks = Task.objects.select_related('category').filter(
             deadline__gte=timezone.now(),
             deadline__lte=timezone.now() + timezone.timedelta(days=7),
             status__in=['pending', 'in_progress']
@@ -112,7 +95,7 @@ class TaskViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def overdue(self, request):
         """Get overdue tasks"""
-        overdue_tasks = Task.objects.filter(
+        overdue_tasks = Task.objects.select_related('category').filter(
             deadline__lt=timezone.now(),
             status__in=['pending', 'in_progress']
         ).order_by('deadline')
@@ -135,15 +118,12 @@ class TaskViewSet(viewsets.ModelViewSet):
     def bulk_prioritize(self, request):
         """Bulk prioritize tasks using AI"""
         task_ids = request.data.get('task_ids', [])
-        context_entries = ContextEntry.objects.filter(processed=True).order_by('-timestamp')[:10]
         
-        # Get context data
-        context_data = None
-        if context_entries:
-            context_data = ai_service.analyze_context(context_entries)
+        # Get context data from the last 10 processed entries
+        context_data = ContextSnapshot.get_insights(10)
         
         # Get tasks and prioritize
-        tasks = Task.objects.filter(id__in=task_ids)
+        tasks = list(Task.objects.filter(id__in=task_ids).select_related('category'))
         priority_scores = ai_service.prioritize_tasks(tasks, context_data)
         
         # Update priority scores
@@ -151,8 +131,8 @@ class TaskViewSet(viewsets.ModelViewSet):
         for task in tasks:
             if task.id in priority_scores:
                 task.priority_score = priority_scores[task.id]
-                task.save()
                 updated_tasks.append(task)
+        Task.objects.bulk_update(updated_tasks, ['priority_score'])
         
         serializer = self.get_serializer(updated_tasks, many=True)
         return Response({
@@ -165,29 +145,106 @@ class TaskViewSet(viewsets.ModelViewSet):
         """Enhance task description with AI"""
         task = self.get_object()
         
-        # Get recent context
-        context_entries = ContextEntry.objects.filter(processed=True).order_by('-timestamp')[:5]
-        context_data = None
-        if context_entries:
-            context_data = ai_service.analyze_context(context_entries)
-        
-        # Enhance description
-        enhanced_description = ai_service.enhance_task_description(
-            task.title, task.description, context_data
-        )
+        # Get recent context from the last 5 processed entries
+        context_data = ContextSnapshot.get_insights(5)
         
-        task.ai_enhanced_description = enhanced_description
+        # Enhance description, keeping the original text when no provider answers
+        try:
+            task.ai_enhanced_description = ai_service.enhance_task_description(
+                task.title, task.description, context_data
+            )
+            task.enhancement_status = 'completed'
+        except ProviderUnavailable as e:
+            print(f"Error enhancing task description: {e}")
+            task.ai_enhanced_description = task.description
+            task.enhancement_status = 'failed'
         task.save()
         
         serializer = self.get_serializer(task)
         return Response(serializer.data)
+    
+    @action(detail=False, methods=['post'])
+    def bulk_enhance(self, request):
+        """Queue AI enhancement for many tasks, sent to the LLM in packed batches"""
+        from ai_module.jobs import enqueue_enhancements
+        
+        task_ids = request.data.get('task_ids', [])
+        missing_only = request.data.get('missing_only', False)
+        
+        if task_ids:
+            tasks = Task.objects.filter(id__in=task_ids)
+        elif missing_only:
+            tasks = Task.objects.filter(ai_enhanced_description='')
+        else:
+            return Response(
+                {'error': 'Provide task_ids or set missing_only'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Get recent context from the last 5 processed entries
+        context_data = ContextSnapshot.get_insights(5)
+        queued = enqueue_enhancements(tasks, context_data)
+        
+        return Response({
+            'message': f'Queued {queued} tasks for enhancement',
+            'queued': queued
+        }, status=status.HTTP_202_ACCEPTED)
+
+@csrf_exempt
+@require_http_methods(['POST'])
+async def enhance_description_stream(request, pk):
+    """Stream an AI-enhanced task description as server-sent events
+    
+    Emits `token` events as text arrives and a final `done` event once the
+    full text has been saved to ai_enhanced_description. When no provider
+    answers it emits an `error` event and records the enhancement as failed,
+    like enhance_description. Serve it through smart_todo.asgi; under WSGI
+    Django buffers the whole stream.
+    """
+    task = await Task.objects.filter(pk=pk).afirst()
+    if task is None:
+        raise Http404('Task not found')
+    
+    # Get recent context from the last 5 processed entries
+    context_data = await sync_to_async(ContextSnapshot.get_insights)(5)
+    
+    async def events():
+        chunks = []
+        try:
+            async for chunk in stream_enhancement(task.title, task.description, context_data):
+                chunks.append(chunk)
+                yield format_event('token', {'text': chunk})
+        except Exception as e:
+            print(f"Error streaming task enhancement: {e}")
+            if isinstance(e, ProviderUnavailable):
+                # Keep the original text, as enhance_description does
+                task.ai_enhanced_description = task.description
+            task.enhancement_status = 'failed'
+            await task.asave(update_fields=['ai_enhanced_description', 'enhancement_status'])
+            yield format_event('error', {'error': 'Enhancement stream failed'})
+            return
+        
+        task.ai_enhanced_description = ''.join(chunks)
+        task.enhancement_status = 'completed'
+        await task.asave(update_fields=['ai_enhanced_description', 'enhancement_status'])
+        yield format_event('done', {
+            'id': task.id,
+            'ai_enhanced_description': task.ai_enhanced_description
+        })
+    
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
 
 class TaskDependencyViewSet(viewsets.ModelViewSet):
     queryset = TaskDependency.objects.all()
     serializer_class = TaskDependencySerializer
     
     def get_queryset(self):
+        # The serializer reads both tasks' titles
+        queryset = TaskDependency.objects.select_related('task', 'depends_on')
         task_id = self.request.query_params.get('task')
         if task_id:
-            return TaskDependency.objects.filter(task_id=task_id)
-        return TaskDependency.objects.all()
+            return queryset.filter(task_id=task_id)
+        return queryset